@@ -6,7 +6,7 @@ SCHEDULE="${SCHEDULE:-0 3 * * 0}"
 
 # Run initial update
 echo "Running initial relay data update..."
-python scripts/update_relais.py -o "${OUTPUT_DIR}/relais.json"
+python scripts/update_relais.py -o "${OUTPUT_DIR}/relais.json" --export-dir "${OUTPUT_DIR}/exports"
 
 # If running in one-shot mode, exit
 if [ "${ONE_SHOT}" = "true" ]; then
@@ -18,7 +18,7 @@ fi
 echo "Setting up scheduled updates: ${SCHEDULE}"
 
 # Create cron entry
-echo "${SCHEDULE} cd /app && python scripts/update_relais.py -o ${OUTPUT_DIR}/relais.json >> /var/log/updater.log 2>&1" > /etc/crontabs/root
+echo "${SCHEDULE} cd /app && python scripts/update_relais.py -o ${OUTPUT_DIR}/relais.json --export-dir ${OUTPUT_DIR}/exports >> /var/log/updater.log 2>&1" > /etc/crontabs/root
 
 # Start cron in foreground
 echo "Starting cron daemon..."
@@ -0,0 +1,236 @@
+"""
+Incremental Build Graph
+
+Runs the updater stages as a dependency graph of named nodes. Every node
+gets a fingerprint from its own key (configuration, code version) and the
+fingerprints of its inputs; a node whose fingerprint matches the last
+successful run, and whose output files still exist, is not run again.
+
+- Source nodes (always=True) run every time; the digest of their result,
+  e.g. the hash of a downloaded payload, becomes their fingerprint.
+- Nodes with persist=True keep their result as a pickle in the cache
+  directory, so dependents that do have to run can load it.
+- Nodes whose dependencies are done run in parallel on a thread pool.
+- A failed node fails its dependents, unless they set allow_failed=True
+  and run with the inputs that are available.
+
+The fingerprints of the last run are kept in <cache_dir>/state.json.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+STATE_NAME = "state.json"
+
+RAN = "ran"
+CACHED = "cached"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+def file_fingerprint(*paths: Path) -> str:
+    """Hash of file contents, e.g. to tie a node's key to its code."""
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(Path(path).read_bytes())
+    return h.hexdigest()
+
+
+@dataclass
+class Node:
+    """One stage of the build."""
+    name: str
+    run: Callable[[dict[str, Any]], Any]  # Called with {dependency name: result}
+    deps: tuple[str, ...] = ()
+    key: str = ""
+    outputs: tuple[Path, ...] = ()
+    always: bool = False
+    digest: Optional[Callable[[Any], str]] = None  # Fingerprint of an always-node's result
+    persist: bool = False
+    allow_failed: bool = False
+
+
+@dataclass
+class NodeResult:
+    name: str
+    status: str
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class BuildReport:
+    results: dict[str, NodeResult] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    def by_status(self, status: str) -> list[str]:
+        return [name for name, r in self.results.items() if r.status == status]
+
+    def ok(self, name: str) -> bool:
+        result = self.results.get(name)
+        return result is not None and result.status in (RAN, CACHED)
+
+    def summary(self) -> str:
+        counts = {status: len(self.by_status(status)) for status in (RAN, CACHED, FAILED, SKIPPED)}
+        parts = [f"{count} {status}" for status, count in counts.items() if count]
+        return f"{len(self.results)} nodes in {self.seconds:.2f}s: {', '.join(parts)}"
+
+
+class _Cached:
+    """Result of a cached node, loaded from disk only when a dependent runs."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._value = None
+
+    def load(self) -> Any:
+        # Dependents run on several threads but share one loaded copy
+        with self._lock:
+            if not self._loaded:
+                with open(self.path, "rb") as f:
+                    self._value = pickle.load(f)
+                self._loaded = True
+            return self._value
+
+
+class BuildGraph:
+    """Dependency graph of build nodes with fingerprint based caching."""
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+        self.nodes: dict[str, Node] = {}
+
+    def add(self, node: Node) -> Node:
+        missing = [dep for dep in node.deps if dep not in self.nodes]
+        if missing:
+            raise ValueError(f"{node.name}: unknown dependencies {', '.join(missing)}")
+        self.nodes[node.name] = node
+        return node
+
+    def _result_path(self, name: str) -> Path:
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+        return self.cache_dir / f"{safe}.pickle"
+
+    def _load_state(self) -> dict[str, str]:
+        try:
+            with open(self.cache_dir / STATE_NAME, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save_state(self, state: dict[str, str]) -> None:
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{STATE_NAME}.", dir=self.cache_dir)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+        os.replace(tmp_name, self.cache_dir / STATE_NAME)
+
+    def _persist(self, name: str, value: Any) -> None:
+        path = self._result_path(name)
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=self.cache_dir)
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_name, path)
+
+    def _fingerprint(self, node: Node, fingerprints: dict[str, str], key: Optional[str] = None) -> str:
+        material = [
+            node.name,
+            node.key if key is None else key,
+            [(dep, fingerprints.get(dep)) for dep in node.deps],
+        ]
+        return hashlib.sha256(json.dumps(material).encode("utf-8")).hexdigest()
+
+    def _is_cached(self, node: Node, fingerprint: str, state: dict[str, str]) -> bool:
+        if state.get(node.name) != fingerprint:
+            return False
+        outputs = list(node.outputs)
+        if node.persist:
+            outputs.append(self._result_path(node.name))
+        return all(path.exists() for path in outputs)
+
+    def run(self, max_workers: int = 4, force: bool = False) -> BuildReport:
+        """Run all nodes whose inputs changed. Returns a report per node."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        started = time.perf_counter()
+        state = {} if force else self._load_state()
+        new_state: dict[str, str] = {}
+        fingerprints: dict[str, str] = {}
+        values: dict[str, Any] = {}
+        report = BuildReport()
+
+        pending = dict(self.nodes)
+        running: dict[Future, tuple[Node, str, float]] = {}
+
+        def execute(node: Node, inputs: dict[str, Any]) -> Any:
+            inputs = {
+                dep: value.load() if isinstance(value, _Cached) else value
+                for dep, value in inputs.items()
+            }
+            value = node.run(inputs)
+            if node.persist:
+                self._persist(node.name, value)
+            return value
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while pending or running:
+                for name, node in list(pending.items()):
+                    # Nodes are added after their dependencies, so waiting
+                    # for finished dependencies keeps topological order
+                    if any(dep not in report.results for dep in node.deps):
+                        continue
+                    del pending[name]
+
+                    failed = [dep for dep in node.deps if not report.ok(dep)]
+                    if failed and not node.allow_failed:
+                        report.results[name] = NodeResult(
+                            name, SKIPPED, error=f"{', '.join(failed)} did not complete"
+                        )
+                        continue
+
+                    inputs = {dep: values[dep] for dep in node.deps if report.ok(dep)}
+                    fingerprint = self._fingerprint(node, fingerprints)
+                    if not node.always and self._is_cached(node, fingerprint, state):
+                        fingerprints[name] = new_state[name] = fingerprint
+                        values[name] = _Cached(self._result_path(name)) if node.persist else None
+                        report.results[name] = NodeResult(name, CACHED)
+                        continue
+
+                    future = pool.submit(execute, node, inputs)
+                    running[future] = (node, fingerprint, time.perf_counter())
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node, fingerprint, node_started = running.pop(future)
+                    seconds = time.perf_counter() - node_started
+                    try:
+                        value = future.result()
+                    except Exception as e:
+                        logger.error(f"{node.name} failed: {e}")
+                        report.results[node.name] = NodeResult(node.name, FAILED, seconds, str(e))
+                        continue
+
+                    if node.always and node.digest:
+                        fingerprint = self._fingerprint(node, fingerprints, key=node.digest(value))
+                    values[node.name] = value
+                    fingerprints[node.name] = new_state[node.name] = fingerprint
+                    report.results[node.name] = NodeResult(node.name, RAN, seconds)
+
+        self._save_state(new_state)
+        report.seconds = time.perf_counter() - started
+        return report
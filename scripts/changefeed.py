@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Relaisblick Change Feed
+
+Pushes changes of the published dataset to browsers over Server-Sent
+Events, so clients learn about an update seconds after the updater
+publishes it instead of re-downloading the full data.
+
+Endpoints:
+- GET /changes?since=<lastUpdate>  (text/event-stream)
+- GET /health
+
+The service watches relais-index.json (the records the web app holds) and
+diffs every new version against the previous one by id. Each diff is one
+"changes" event:
+
+    id: <lastUpdate of the new version>
+    event: changes
+    data: {"lastUpdate": ..., "added": [...], "changed": [...],
+           "removed": [ids], "details": [changed detail chunk numbers]}
+
+The last --buffer events are kept. A client resumes from the version it
+has, given as Last-Event-ID (sent by EventSource on reconnect) or as
+?since= on the first connection; if that version is no longer buffered it
+gets a "reset" event and reloads the data. Waiting subscribers share one
+asyncio event and hold no per-client buffers, so idle connections cost
+next to nothing.
+"""
+
+import asyncio
+import json
+import logging
+import argparse
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from detail_chunks import DETAILS_DIR, INDEX_NAME
+from httpserver import HTTPError, HTTPServer, Request, Response, json_response
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA = Path(__file__).parent.parent / "data" / INDEX_NAME
+HEARTBEAT_SECONDS = 30
+RETRY_MS = 10_000  # EventSource reconnect delay
+
+
+def sse_event(event: str, payload: dict, event_id: Optional[str] = None) -> bytes:
+    """Encode one Server-Sent Event; the JSON payload is a single data line."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(payload, ensure_ascii=False, separators=(',', ':'))}")
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+def diff_records(old: dict[str, dict], new: dict[str, dict]) -> tuple[list[dict], list[dict], list[str]]:
+    """(added, changed, removed ids) between two versions keyed by id."""
+    added = [r for key, r in new.items() if key not in old]
+    changed = [r for key, r in new.items() if key in old and old[key] != r]
+    removed = [key for key in old if key not in new]
+    return added, changed, removed
+
+
+@dataclass
+class Change:
+    """One buffered diff from version base to version id."""
+    base: str
+    id: str
+    data: bytes  # Encoded event
+
+
+@dataclass
+class Version:
+    """What was read from disk for one version of the dataset."""
+    last_update: Optional[str]
+    records: dict[str, dict]
+    chunk_mtimes: dict[str, int]
+    mtime_ns: int
+    size: int
+
+
+class ChangeFeed:
+    """Current version of the dataset and the recent diffs leading to it."""
+
+    def __init__(self, path: Path, buffer_size: int):
+        self.path = path
+        self.details_dir = path.parent / DETAILS_DIR
+        self.changes: deque[Change] = deque(maxlen=buffer_size)
+        self.version: Optional[Version] = None
+        self.current_id: Optional[str] = None
+        self.published = 0  # Changes published since start, for unique ids
+        self._published = asyncio.Event()
+
+    def _read(self) -> Optional[Version]:
+        """Load the file if its mtime or size changed; runs in a thread."""
+        try:
+            stat = self.path.stat()
+        except OSError as e:
+            logger.warning(f"Cannot stat {self.path}: {e}")
+            return None
+
+        current = self.version
+        if current and current.mtime_ns == stat.st_mtime_ns and current.size == stat.st_size:
+            return None
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            # Likely caught mid-write; try again on the next check
+            logger.warning(f"Could not load {self.path}: {e}")
+            return None
+
+        # Detail chunks are only rewritten when their content changed
+        chunk_mtimes = {p.stem: p.stat().st_mtime_ns for p in self.details_dir.glob("*.json")}
+        return Version(
+            last_update=data.get("lastUpdate"),
+            records={r["id"]: r for r in data.get("relais", [])},
+            chunk_mtimes=chunk_mtimes,
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+        )
+
+    async def reload_if_changed(self) -> bool:
+        """Read a changed file and publish its diff. Returns True if a change was published."""
+        version = await asyncio.to_thread(self._read)
+        if version is None:
+            return False
+
+        previous, self.version = self.version, version
+        if previous is None:
+            self.current_id = version.last_update
+            logger.info(f"Loaded {len(version.records)} relays from {self.path}")
+            return False
+
+        added, changed, removed = diff_records(previous.records, version.records)
+        details = sorted(
+            (int(stem) for stem, mtime in version.chunk_mtimes.items()
+             if previous.chunk_mtimes.get(stem) != mtime and stem.isdigit()),
+        )
+        if not (added or changed or removed or details):
+            return False
+
+        # A rewrite without a new lastUpdate still needs an id of its own
+        self.published += 1
+        event_id = version.last_update or ""
+        if version.last_update == previous.last_update:
+            event_id = f"{event_id}+{self.published}"
+
+        payload = {
+            "lastUpdate": version.last_update,
+            "added": added,
+            "changed": changed,
+            "removed": removed,
+            "details": details,
+        }
+        self.changes.append(Change(self.current_id, event_id, sse_event("changes", payload, event_id)))
+        self.current_id = event_id
+        logger.info(
+            f"Published {event_id}: {len(added)} added, {len(changed)} changed, "
+            f"{len(removed)} removed, {len(details)} detail chunks"
+        )
+
+        published, self._published = self._published, asyncio.Event()
+        published.set()
+        return True
+
+    async def watch(self, interval: float) -> None:
+        """Poll the data file for changes."""
+        while True:
+            await asyncio.sleep(interval)
+            await self.reload_if_changed()
+
+    def since(self, last_id: Optional[str]) -> list[Change]:
+        """The changes a client at version last_id is missing."""
+        if last_id is None or last_id == self.current_id:
+            return []
+        for i, change in enumerate(self.changes):
+            if change.base == last_id:
+                return list(self.changes)[i:]
+        # Unknown or no longer buffered: the client has to reload
+        reset = sse_event("reset", {"lastUpdate": self.version.last_update}, self.current_id)
+        return [Change(last_id, self.current_id, reset)]
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait for the next change; False on timeout."""
+        try:
+            await asyncio.wait_for(self._published.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+class ChangeFeedService:
+    """HTTP handlers on top of a ChangeFeed."""
+
+    def __init__(self, feed: ChangeFeed):
+        self.feed = feed
+
+    async def changes(self, request: Request) -> Response:
+        if self.feed.version is None:
+            raise HTTPError(503, "Dataset not loaded")
+        last_id = request.headers.get("last-event-id") or request.param("since")
+        return Response(
+            content_type="text/event-stream; charset=utf-8",
+            headers={
+                "Cache-Control": "no-cache",
+                "X-Accel-Buffering": "no",  # nginx: pass events through immediately
+            },
+            stream=self._stream(last_id),
+        )
+
+    async def _stream(self, last_id: Optional[str]) -> AsyncIterator[bytes]:
+        # Without a version to resume from, the client gets changes from now on
+        if last_id is None:
+            last_id = self.feed.current_id
+        yield f"retry: {RETRY_MS}\n\n".encode("ascii")
+        while True:
+            pending = self.feed.since(last_id)
+            for change in pending:
+                yield change.data
+                last_id = change.id
+            if not pending and not await self.feed.wait(HEARTBEAT_SECONDS):
+                # Comment line, keeps proxies from closing the idle connection
+                yield b": keepalive\n\n"
+
+    async def health(self, request: Request) -> Response:
+        version = self.feed.version
+        return json_response({
+            "status": "ok" if version else "loading",
+            "relais": len(version.records) if version else 0,
+            "lastUpdate": version.last_update if version else None,
+            "buffered": len(self.feed.changes),
+            "checked": datetime.now(timezone.utc).isoformat(),
+        }, status=200 if version else 503)
+
+
+async def run(data: Path, host: str, port: int, reload_interval: float, buffer_size: int) -> None:
+    feed = ChangeFeed(data, buffer_size)
+    await feed.reload_if_changed()
+
+    service = ChangeFeedService(feed)
+    server = HTTPServer()
+    server.route("/changes", service.changes)
+    server.route("/health", service.health)
+
+    watcher = asyncio.create_task(feed.watch(reload_interval))
+    try:
+        await server.serve(host, port)
+    finally:
+        watcher.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Push changes of the repeater data to browsers over Server-Sent Events"
+    )
+    parser.add_argument(
+        "-d", "--data",
+        type=Path,
+        default=DEFAULT_DATA,
+        help=f"Map index JSON file to watch (default: {DEFAULT_DATA})"
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Listen address (default: 127.0.0.1)"
+    )
+    parser.add_argument(
+        "-p", "--port",
+        type=int,
+        default=8083,
+        help="Listen port (default: 8083)"
+    )
+    parser.add_argument(
+        "--reload-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between checks for a changed data file (default: 5)"
+    )
+    parser.add_argument(
+        "--buffer",
+        type=int,
+        default=64,
+        help="Number of recent changes kept for resuming clients (default: 64)"
+    )
+
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run(args.data, args.host, args.port, args.reload_interval, args.buffer))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Route Corridor Query
+
+Finds the repeaters along a GPX track or route, e.g. to program a radio
+before a drive or hike. The route is streamed from the GPX file, thinned and
+simplified with Douglas-Peucker, and each remaining segment is matched
+against a grid index of the relays, so even tracks with hundreds of
+thousands of points only cost one bounding-box lookup per segment.
+
+Results are ordered by distance along the route to the point where the
+route passes closest to each repeater. Distances are computed in a local
+planar projection around the start of the route, which is accurate to well
+under a percent for routes within Austria. Separate track segments are
+joined in file order.
+
+Usage:
+    python corridor.py tour.gpx
+    python corridor.py tour.gpx --distance-km 10 --band 2m,70cm --chirp tour.csv
+"""
+
+import json
+import logging
+import math
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from lxml import etree
+
+from exports import ChirpCsvWriter
+from spatial import KM_PER_DEGREE, GridIndex, simplify
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA = Path(__file__).parent.parent / "data" / "relais.json"
+
+POINT_TAGS = ("{*}trkpt", "{*}rtept")
+
+
+def iter_gpx_points(path: Path) -> Iterator[tuple[float, float]]:
+    """Stream (lat, lng) of all track and route points in file order."""
+    for _, elem in etree.iterparse(str(path), events=("end",), tag=POINT_TAGS):
+        yield float(elem.get("lat")), float(elem.get("lon"))
+        # Drop parsed points so memory stays flat on long tracks
+        elem.clear(keep_tail=True)
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+
+class Route:
+    """Simplified route polyline in kilometres east/north of its start."""
+
+    def __init__(self, points: list[tuple[float, float]], lat0: float, lng0: float):
+        self.points = points
+        self.lat0 = lat0
+        self.lng0 = lng0
+        self.km_per_deg_lng = KM_PER_DEGREE * math.cos(math.radians(lat0))
+
+    @classmethod
+    def from_points(cls, points: Iterable[tuple[float, float]], tolerance_km: float = 0.1) -> "Route":
+        """
+        Build a route from (lat, lng) points.
+
+        Points closer than tolerance_km to the last kept one are dropped while
+        streaming; Douglas-Peucker then removes the rest of the detail.
+        """
+        it = iter(points)
+        first = next(it, None)
+        if first is None:
+            raise ValueError("Route has no track or route points")
+
+        route = cls([], *first)
+        last = end = (0.0, 0.0)
+        thinned = [last]
+        count = 1
+        for lat, lng in it:
+            count += 1
+            end = route.project(lat, lng)
+            if (end[0] - last[0]) ** 2 + (end[1] - last[1]) ** 2 >= tolerance_km ** 2:
+                thinned.append(end)
+                last = end
+        if end != last:
+            thinned.append(end)
+
+        route.points = simplify(thinned, tolerance_km)
+        if len(route.points) == 1:
+            route.points.append(route.points[0])
+        logger.info(
+            f"Route: {count} points, {len(thinned)} after thinning, "
+            f"{len(route.points)} after simplification, {route.length_km():.1f} km"
+        )
+        return route
+
+    def project(self, lat: float, lng: float) -> tuple[float, float]:
+        return ((lng - self.lng0) * self.km_per_deg_lng, (lat - self.lat0) * KM_PER_DEGREE)
+
+    def unproject(self, x: float, y: float) -> tuple[float, float]:
+        return (self.lat0 + y / KM_PER_DEGREE, self.lng0 + x / self.km_per_deg_lng)
+
+    def length_km(self) -> float:
+        return sum(math.dist(a, b) for a, b in zip(self.points, self.points[1:]))
+
+
+@dataclass
+class CorridorHit:
+    along_km: float  # Distance along the route to the closest approach
+    offset_km: float  # Distance between the route and the repeater
+    relais: dict
+
+
+def corridor_query(relais: Iterable[dict], route: Route, distance_km: float = 5.0) -> list[CorridorHit]:
+    """Repeaters within distance_km of the route, ordered along it."""
+    index = GridIndex.build(
+        (r for r in relais if r.get("koordinaten")),
+        key=lambda r: (r["koordinaten"]["lat"], r["koordinaten"]["lng"]),
+    )
+    best: dict[str, CorridorHit] = {}
+    along = 0.0
+
+    for (x1, y1), (x2, y2) in zip(route.points, route.points[1:]):
+        dx, dy = x2 - x1, y2 - y1
+        length_sq = dx * dx + dy * dy
+        south, west = route.unproject(min(x1, x2) - distance_km, min(y1, y2) - distance_km)
+        north, east = route.unproject(max(x1, x2) + distance_km, max(y1, y2) + distance_km)
+
+        for lat, lng, r in index.query_bbox(south, west, north, east):
+            px, py = route.project(lat, lng)
+            t = max(0.0, min(1.0, ((px - x1) * dx + (py - y1) * dy) / length_sq)) if length_sq else 0.0
+            offset = math.hypot(px - x1 - t * dx, py - y1 - t * dy)
+            if offset > distance_km:
+                continue
+            hit = best.get(r["id"])
+            if hit is None or offset < hit.offset_km:
+                best[r["id"]] = CorridorHit(along + t * math.sqrt(length_sq), offset, r)
+
+        along += math.sqrt(length_sq)
+
+    return sorted(best.values(), key=lambda h: (h.along_km, h.offset_km))
+
+
+def write_chirp(hits: list[CorridorHit], path: Path, title: str) -> None:
+    """Write the hits as CHIRP memory list, numbered in route order."""
+    writer = ChirpCsvWriter(path, title)
+    try:
+        for hit in hits:
+            writer.write(hit.relais)
+    except Exception:
+        writer.abort()
+        raise
+    writer.close()
+    logger.info(f"Saved {writer.count} channels to {path}")
+
+
+def _split(value: Optional[str]) -> Optional[set[str]]:
+    return {v.strip() for v in value.split(",") if v.strip()} if value else None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="List the repeaters along a GPX route"
+    )
+    parser.add_argument("gpx", type=Path, help="GPX file with a track or route")
+    parser.add_argument(
+        "-d", "--data",
+        type=Path,
+        default=DEFAULT_DATA,
+        help=f"Relay JSON file (default: {DEFAULT_DATA})"
+    )
+    parser.add_argument(
+        "--distance-km",
+        type=float,
+        default=5.0,
+        help="Maximum distance from the route, on either side (default: 5)"
+    )
+    parser.add_argument(
+        "--tolerance-m",
+        type=float,
+        default=100.0,
+        help="Simplification tolerance of the route in metres (default: 100)"
+    )
+    parser.add_argument("--band", help="Only these bands, comma-separated (e.g. 2m,70cm)")
+    parser.add_argument("--typ", help="Only these types, comma-separated (e.g. FM,DMR)")
+    parser.add_argument("--chirp", type=Path, help="Also write the repeaters as CHIRP CSV")
+
+    args = parser.parse_args()
+
+    with open(args.data, "r", encoding="utf-8") as f:
+        relais = json.load(f)["relais"]
+
+    bands, typen = _split(args.band), _split(args.typ)
+    relais = [
+        r for r in relais
+        if (bands is None or r["band"] in bands) and (typen is None or r["typ"] in typen)
+    ]
+
+    route = Route.from_points(iter_gpx_points(args.gpx), args.tolerance_m / 1000)
+    hits = corridor_query(relais, route, args.distance_km)
+
+    for hit in hits:
+        r = hit.relais
+        print(
+            f"{hit.along_km:7.1f} km {hit.offset_km:5.1f} km  {r['rufzeichen']:<9} "
+            f"{r['typ']:<6} {r['band']:<5} {r['txFrequenz']:9.4f}  {r['standort']}"
+        )
+    logger.info(f"{len(hits)} repeaters within {args.distance_km} km of the route")
+
+    if args.chirp:
+        write_chirp(hits, args.chirp, args.gpx.stem)
+
+
+if __name__ == "__main__":
+    main()
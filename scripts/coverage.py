@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Repeater Coverage Estimation
+
+Approximate coverage footprints from a local elevation model. For every
+relay, rays are cast in all directions from the antenna; along each ray the
+terrain is sampled at fixed steps and a point counts as visible when the
+line from the antenna to a receiver standing there clears all terrain in
+between (with 4/3 earth radius refraction). The farthest visible point of
+each ray becomes a vertex of the footprint polygon, which is then
+simplified with Douglas-Peucker.
+
+This is line of sight only: no path loss, antenna pattern or diffraction.
+
+DEM formats (north-up, WGS84 lat/lng grid):
+- .npz with arrays `elevation` (rows x cols, metres) and `bounds`
+  (west, south, east, north)
+- GeoTIFF in EPSG:4326, read with rasterio if installed
+
+Footprints are cached per relay, keyed by position, antenna height, the
+ray settings and the DEM version, so only new or moved relays are
+recomputed. NumPy is only needed for this stage.
+
+Usage:
+    python coverage.py --dem austria.npz
+    python coverage.py --dem austria.tif --max-km 80 --workers 8
+"""
+
+import hashlib
+import json
+import logging
+import math
+import multiprocessing
+import os
+import tempfile
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from spatial import KM_PER_DEGREE, simplify
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA = Path(__file__).parent.parent / "data" / "relais.json"
+DEFAULT_OUTPUT = Path(__file__).parent.parent / "data" / "coverage.geojson"
+DEFAULT_CACHE = Path(__file__).parent.parent / "cache" / "coverage.json"
+
+EARTH_RADIUS_M = 6371008.8
+REFRACTION_K = 4 / 3
+COORD_DIGITS = 5
+
+
+@dataclass(frozen=True)
+class CoverageSettings:
+    max_km: float = 60.0
+    rays: int = 360
+    step_m: float = 100.0
+    antenna_m: float = 10.0  # Antenna above ground (or above seehöhe)
+    receiver_m: float = 1.5
+    tolerance_m: float = 150.0  # Douglas-Peucker tolerance of the footprint
+
+
+class DEM:
+    """North-up elevation grid in WGS84 degrees."""
+
+    def __init__(self, elevation: np.ndarray, west: float, south: float, east: float, north: float):
+        self.elevation = elevation
+        self.west = west
+        self.north = north
+        self.rows, self.cols = elevation.shape
+        self.dlng = (east - west) / self.cols
+        self.dlat = (north - south) / self.rows
+
+    @classmethod
+    def load(cls, path: Path) -> "DEM":
+        if path.suffix.lower() == ".npz":
+            with np.load(path) as data:
+                elevation = data["elevation"].astype(np.float32)
+                west, south, east, north = (float(v) for v in data["bounds"])
+            return cls(elevation, west, south, east, north)
+
+        try:
+            import rasterio
+        except ImportError:
+            raise RuntimeError(f"Reading {path.suffix} DEMs needs rasterio; convert to .npz or install it")
+
+        with rasterio.open(path) as src:
+            if src.crs is None or src.crs.to_epsg() != 4326:
+                raise ValueError(f"{path}: DEM must be in EPSG:4326, got {src.crs}")
+            elevation = src.read(1, masked=True).astype(np.float32).filled(np.nan)
+            b = src.bounds
+            return cls(elevation, b.left, b.bottom, b.right, b.top)
+
+    def sample(self, lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+        """Nearest-cell elevation; NaN outside the grid or on nodata."""
+        row = np.floor((self.north - lat) / self.dlat).astype(np.int64)
+        col = np.floor((lng - self.west) / self.dlng).astype(np.int64)
+        inside = (row >= 0) & (row < self.rows) & (col >= 0) & (col < self.cols)
+        result = np.full(lat.shape, np.nan, dtype=np.float32)
+        result[inside] = self.elevation[row[inside], col[inside]]
+        return result
+
+
+def dem_version(path: Path) -> str:
+    """Cheap identity of a DEM file (name, size and mtime)."""
+    stat = path.stat()
+    return f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def footprint(dem: DEM, lat: float, lng: float, seehoehe: Optional[float], settings: CoverageSettings) -> list[list[float]]:
+    """Coverage polygon of one site as a closed GeoJSON ring of [lng, lat]."""
+    azimuths = np.linspace(0, 2 * np.pi, settings.rays, endpoint=False)
+    distances = np.arange(1, int(settings.max_km * 1000 / settings.step_m) + 1) * settings.step_m
+
+    # Local equirectangular projection is accurate enough within ~100 km
+    km_per_deg_lng = KM_PER_DEGREE * math.cos(math.radians(lat))
+    north_km = np.outer(np.cos(azimuths), distances / 1000)
+    east_km = np.outer(np.sin(azimuths), distances / 1000)
+    terrain = dem.sample(lat + north_km / KM_PER_DEGREE, lng + east_km / km_per_deg_lng)
+
+    ground = float(dem.sample(np.array([lat]), np.array([lng]))[0])
+    base = seehoehe if seehoehe is not None else ground
+    if math.isnan(base):
+        base = 0.0
+    antenna = max(base, 0.0 if math.isnan(ground) else ground) + settings.antenna_m
+
+    # Terrain seen from the antenna, lowered by the earth's curvature
+    drop = distances ** 2 / (2 * REFRACTION_K * EARTH_RADIUS_M)
+    outside = np.isnan(terrain)
+    terrain = np.where(outside, -1e6, terrain) - drop
+    terrain_slope = (terrain - antenna) / distances
+    target_slope = (terrain + settings.receiver_m - antenna) / distances
+
+    # Steepest terrain slope between the antenna and each sample
+    horizon = np.maximum.accumulate(terrain_slope, axis=1)
+    horizon = np.concatenate([np.full((settings.rays, 1), -np.inf), horizon[:, :-1]], axis=1)
+    visible = (target_slope >= horizon) & ~outside
+
+    # Farthest visible sample per ray (0 if nothing is visible)
+    last = np.where(visible.any(axis=1), visible.shape[1] - 1 - np.argmax(visible[:, ::-1], axis=1), -1)
+    reach = np.where(last >= 0, distances[np.maximum(last, 0)], 0.0)
+
+    # Simplify in local metres, then convert back to degrees
+    ring_m = list(zip(np.sin(azimuths) * reach, np.cos(azimuths) * reach))
+    ring_m = simplify(ring_m + ring_m[:1], settings.tolerance_m)
+    return [
+        [
+            round(lng + x / 1000 / km_per_deg_lng, COORD_DIGITS),
+            round(lat + y / 1000 / KM_PER_DEGREE, COORD_DIGITS),
+        ]
+        for x, y in ring_m
+    ]
+
+
+def site_key(lat: float, lng: float, seehoehe: Optional[float], settings: CoverageSettings, version: str) -> str:
+    material = json.dumps([lat, lng, seehoehe, asdict(settings), version])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+# Each worker process loads the DEM once
+_worker_dem: Optional[DEM] = None
+
+
+def _init_worker(path: str) -> None:
+    global _worker_dem
+    _worker_dem = DEM.load(Path(path))
+
+
+def _worker_footprint(args: tuple) -> list[list[float]]:
+    lat, lng, seehoehe, settings = args
+    return footprint(_worker_dem, lat, lng, seehoehe, settings)
+
+
+def _load_cache(path: Path) -> dict[str, list]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _write_json(path: Path, data) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.chmod(tmp_name, 0o644)
+    os.replace(tmp_name, path)
+
+
+def write_coverage(
+    relais: list[dict],
+    dem_path: Path,
+    output: Path,
+    cache_path: Path = DEFAULT_CACHE,
+    settings: CoverageSettings = CoverageSettings(),
+    workers: Optional[int] = None,
+) -> dict[str, int]:
+    """Compute footprints for all relays and write them as GeoJSON."""
+    version = dem_version(dem_path)
+    cache = _load_cache(cache_path)
+    used: dict[str, list] = {}
+    missing: dict[str, tuple] = {}
+    keys = []
+
+    for r in relais:
+        coords = r.get("koordinaten")
+        if not coords:
+            keys.append(None)
+            continue
+        seehoehe = r.get("seehöhe")
+        key = site_key(coords["lat"], coords["lng"], seehoehe, settings, version)
+        keys.append(key)
+        if key in cache:
+            used[key] = cache[key]
+        elif key not in missing:
+            missing[key] = (coords["lat"], coords["lng"], seehoehe, settings)
+
+    logger.info(f"Coverage: {len(used)} sites cached, {len(missing)} to compute")
+    if missing:
+        # Spawned rather than forked workers: the updater calls this from a build thread
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(str(dem_path),),
+        ) as pool:
+            results = pool.map(_worker_footprint, missing.values(), chunksize=4)
+            for key, ring in zip(missing, results):
+                used[key] = ring
+
+    features = [
+        {
+            "type": "Feature",
+            "properties": {
+                "id": r["id"],
+                "rufzeichen": r["rufzeichen"],
+                "typ": r["typ"],
+                "band": r["band"],
+            },
+            "geometry": {"type": "Polygon", "coordinates": [used[key]]},
+        }
+        for r, key in zip(relais, keys)
+        if key is not None
+    ]
+    _write_json(output, {"type": "FeatureCollection", "features": features})
+    _write_json(cache_path, used)  # Drops footprints of moved or removed relays
+    logger.info(f"Saved {len(features)} coverage polygons to {output}")
+    return {"cached": len(used) - len(missing), "computed": len(missing)}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Estimate line-of-sight coverage polygons from an elevation model"
+    )
+    parser.add_argument("--dem", type=Path, required=True, help="Elevation model (.npz or GeoTIFF)")
+    parser.add_argument(
+        "-d", "--data",
+        type=Path,
+        default=DEFAULT_DATA,
+        help=f"Relay JSON file (default: {DEFAULT_DATA})"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        type=Path,
+        default=DEFAULT_OUTPUT,
+        help=f"Output GeoJSON (default: {DEFAULT_OUTPUT})"
+    )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        default=DEFAULT_CACHE,
+        help=f"Footprint cache (default: {DEFAULT_CACHE})"
+    )
+    parser.add_argument("--max-km", type=float, default=CoverageSettings.max_km, help="Ray length in km (default: 60)")
+    parser.add_argument("--rays", type=int, default=CoverageSettings.rays, help="Rays per site (default: 360)")
+    parser.add_argument("--step-m", type=float, default=CoverageSettings.step_m, help="Sample spacing in m (default: 100)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+
+    args = parser.parse_args()
+
+    with open(args.data, "r", encoding="utf-8") as f:
+        relais = json.load(f)["relais"]
+
+    settings = CoverageSettings(max_km=args.max_km, rays=args.rays, step_m=args.step_m)
+    write_coverage(relais, args.dem, args.output, args.cache, settings, args.workers)
+
+
+if __name__ == "__main__":
+    main()
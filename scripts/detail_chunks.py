@@ -0,0 +1,131 @@
+"""
+Map Index and Detail Chunks
+
+Splits the merged records for the web client:
+- relais-index.json: minified, only the fields the map, list and filters
+  need (hot fields)
+- details/<n>.json: the popup-only fields (cold fields) of all relays whose
+  id hashes into bucket n, fetched when a popup opens
+
+Both outputs are produced in one pass over the records. The bucket of an
+id is FNV-1a (32 bit) of its UTF-8 bytes modulo the chunk count; the client
+in src/hooks/useRelaisDetails.ts uses the same function. It requests the
+chunks with ?v=<lastUpdate of the index>, so no cache hands out a chunk
+older than the index it has.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Iterable
+
+from exports import ExportWriter
+from jsonstream import write_relais_json
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "relais-index.json"
+DETAILS_DIR = "details"
+DETAIL_CHUNKS = 16
+
+HOT_FIELDS = (
+    "id",
+    "rufzeichen",
+    "standort",
+    "bundesland",
+    "koordinaten",
+    "typ",
+    "band",
+    "txFrequenz",
+    "shift",
+    "status",
+    "site",
+)
+
+
+def detail_bucket(relais_id: str, chunk_count: int = DETAIL_CHUNKS) -> int:
+    """FNV-1a hash of the id, modulo chunk_count."""
+    h = 0x811C9DC5
+    for byte in relais_id.encode("utf-8"):
+        h = ((h ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return h % chunk_count
+
+
+class DetailChunkWriter(ExportWriter):
+    """Writes {"<id>": {cold fields}, ...} incrementally."""
+
+    extension = "json"
+
+    def header(self) -> None:
+        self._emit("{")
+
+    def record(self, entry: tuple[str, dict]) -> None:
+        relais_id, details = entry
+        self._emit(
+            ("," if self.count > 1 else "")
+            + json.dumps(relais_id, ensure_ascii=False)
+            + ":"
+            + json.dumps(details, ensure_ascii=False, separators=(",", ":"))
+        )
+
+    def footer(self) -> None:
+        self._emit("}")
+
+
+def write_index_and_details(
+    relais: Iterable[dict],
+    output_dir: Path,
+    meta: dict,
+    chunk_count: int = DETAIL_CHUNKS,
+) -> int:
+    """
+    Write the hot-field index and the cold-field detail chunks.
+
+    The index is published last, so a reader that sees the new index finds
+    the details of all its ids in the chunks.
+    """
+    details_dir = output_dir / DETAILS_DIR
+    index_path = output_dir / INDEX_NAME
+    staged_path = output_dir / f".{INDEX_NAME}.staged"
+    writers: dict[int, DetailChunkWriter] = {}
+
+    def hot_records():
+        for r in relais:
+            bucket = detail_bucket(r["id"], chunk_count)
+            writer = writers.get(bucket)
+            if writer is None:
+                writer = writers[bucket] = DetailChunkWriter(
+                    details_dir / f"{bucket}.json", f"chunk {bucket}"
+                )
+            writer.write((r["id"], {k: v for k, v in r.items() if k not in HOT_FIELDS}))
+            yield {k: r[k] for k in HOT_FIELDS if k in r}
+
+    try:
+        count = write_relais_json(
+            staged_path,
+            hot_records(),
+            {**meta, "detailChunks": chunk_count},
+            compact=True,
+        )
+        changed = sum(writer.close() for writer in writers.values())
+    except BaseException:
+        for writer in writers.values():
+            writer.abort()
+        staged_path.unlink(missing_ok=True)
+        raise
+
+    os.replace(staged_path, index_path)
+
+    # Remove chunks of buckets that are now empty or out of range, once the
+    # index no longer refers to them
+    current = {writer.path for writer in writers.values()}
+    for path in details_dir.glob("*.json"):
+        if path not in current:
+            path.unlink()
+
+    logger.info(
+        f"Saved map index with {count} relays to {index_path} "
+        f"({changed} of {len(writers)} detail chunks changed)"
+    )
+    return count
@@ -0,0 +1,310 @@
+"""
+Relay Data Exports
+
+Writes the merged relay records as radio codeplug and GPS files:
+- CHIRP-compatible CSV
+- KML (Google Earth, most mapping apps)
+- GPX waypoints
+
+Records are streamed once; each writer appends to its own temporary file
+as records arrive, so memory use does not grow with the number of output
+files. A finished file only replaces the existing one when its content hash
+differs, which keeps unchanged exports (and their mtimes) untouched.
+"""
+
+import csv
+import hashlib
+import io
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterable, Optional
+from xml.sax.saxutils import escape
+
+from profiles import AT, RegionProfile
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "kml", "gpx")
+
+CHIRP_COLUMNS = [
+    "Location", "Name", "Frequency", "Duplex", "Offset", "Tone",
+    "rToneFreq", "cToneFreq", "DtcsCode", "DtcsPolarity", "Mode",
+    "TStep", "Skip", "Comment", "URCALL", "RPT1CALL", "RPT2CALL", "DVCODE",
+]
+
+# CHIRP mode names for our relay types
+CHIRP_MODES = {
+    "FM": "FM",
+    "DMR": "DMR",
+    "D-STAR": "DV",
+    "C4FM": "DN",
+    "TETRA": "DIG",
+    "ATV": "FM",
+    "Bake": "CW",
+}
+
+SLUG_REPLACEMENTS = str.maketrans({
+    "ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss",
+    "Ä": "ae", "Ö": "oe", "Ü": "ue", " ": "-", "/": "-",
+})
+
+
+def slugify(value: str) -> str:
+    """Turn a Bundesland/band/type name into a file name part."""
+    return value.translate(SLUG_REPLACEMENTS).lower()
+
+
+def describe(relais: dict) -> str:
+    """Short human readable summary used in comments and descriptions."""
+    parts = [relais["typ"], f"{relais['txFrequenz']:.4f} MHz"]
+    if relais.get("shift"):
+        parts.append(f"{relais['shift'] / 1000:+.3f} MHz")
+    if relais.get("ctcss"):
+        parts.append(f"CTCSS {relais['ctcss']:.1f}")
+    if relais.get("network"):
+        parts.append(relais["network"])
+    parts.append(relais["standort"])
+    return ", ".join(parts)
+
+
+def chirp_row(relais: dict, location: int) -> list[str]:
+    """Build one CHIRP memory row. Frequency is the repeater output."""
+    shift_khz = round(relais.get("shift") or 0)
+    if shift_khz < 0:
+        duplex = "-"
+    elif shift_khz > 0:
+        duplex = "+"
+    else:
+        duplex = ""
+
+    ctcss = relais.get("ctcss")
+    tone_freq = f"{ctcss:.1f}" if ctcss else "88.5"
+    mode = CHIRP_MODES.get(relais["typ"], "FM")
+    is_dstar = mode == "DV"
+
+    return [
+        str(location),
+        relais["rufzeichen"].replace(" ", "")[:8],
+        f"{relais['txFrequenz']:.6f}",
+        duplex,
+        f"{abs(shift_khz) / 1000:.6f}",
+        "Tone" if ctcss else "",
+        tone_freq,
+        tone_freq,
+        "023",
+        "NN",
+        mode,
+        "12.50",
+        "",
+        describe(relais),
+        "CQCQCQ" if is_dstar else "",
+        _dstar_rpt(relais, relais.get("dstarModule") or "B") if is_dstar else "",
+        _dstar_rpt(relais, "G") if is_dstar else "",
+        "",
+    ]
+
+
+def _dstar_rpt(relais: dict, module: str) -> str:
+    base = relais["rufzeichen"].split()[0]
+    return f"{base:<7}{module}"
+
+
+class ExportWriter:
+    """Incremental writer for one export file."""
+
+    extension = ""
+
+    def __init__(self, path: Path, title: str):
+        self.path = path
+        self.title = title
+        self.count = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+        self._tmp_path = Path(tmp_name)
+        self._file = os.fdopen(fd, "wb")
+        self._hash = hashlib.sha256()
+        self.header()
+
+    def _emit(self, text: str) -> None:
+        data = text.encode("utf-8")
+        self._hash.update(data)
+        self._file.write(data)
+
+    def header(self) -> None:
+        pass
+
+    def footer(self) -> None:
+        pass
+
+    def write(self, relais: dict) -> None:
+        self.count += 1
+        self.record(relais)
+
+    def record(self, relais: dict) -> None:
+        raise NotImplementedError
+
+    def close(self) -> bool:
+        """Finish the file. Returns True if the file on disk changed."""
+        self.footer()
+        self._file.close()
+
+        if self.path.exists() and file_sha256(self.path) == self._hash.hexdigest():
+            self._tmp_path.unlink()
+            return False
+
+        os.chmod(self._tmp_path, 0o644)
+        os.replace(self._tmp_path, self.path)
+        return True
+
+    def abort(self) -> None:
+        self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+
+class ChirpCsvWriter(ExportWriter):
+    extension = "csv"
+
+    def header(self) -> None:
+        self._buffer = io.StringIO()
+        self._csv = csv.writer(self._buffer, lineterminator="\r\n")
+        self._row(CHIRP_COLUMNS)
+
+    def _row(self, row: list[str]) -> None:
+        self._csv.writerow(row)
+        self._emit(self._buffer.getvalue())
+        self._buffer.seek(0)
+        self._buffer.truncate()
+
+    def record(self, relais: dict) -> None:
+        self._row(chirp_row(relais, self.count))
+
+
+class KmlWriter(ExportWriter):
+    extension = "kml"
+
+    def header(self) -> None:
+        self._emit(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<kml xmlns="http://www.opengis.net/kml/2.2">\n'
+            "<Document>\n"
+            f"<name>{escape(self.title)}</name>\n"
+        )
+
+    def record(self, relais: dict) -> None:
+        coords = relais["koordinaten"]
+        altitude = relais.get("seehöhe") or 0
+        self._emit(
+            "<Placemark>\n"
+            f"<name>{escape(relais['rufzeichen'])} ({escape(relais['typ'])} {escape(relais['band'])})</name>\n"
+            f"<description>{escape(describe(relais))}</description>\n"
+            f"<Point><coordinates>{coords['lng']:.6f},{coords['lat']:.6f},{altitude}</coordinates></Point>\n"
+            "</Placemark>\n"
+        )
+
+    def footer(self) -> None:
+        self._emit("</Document>\n</kml>\n")
+
+
+class GpxWriter(ExportWriter):
+    extension = "gpx"
+
+    def header(self) -> None:
+        self._emit(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<gpx version="1.1" creator="Relaisblick" xmlns="http://www.topografix.com/GPX/1/1">\n'
+            f"<metadata><name>{escape(self.title)}</name></metadata>\n"
+        )
+
+    def record(self, relais: dict) -> None:
+        coords = relais["koordinaten"]
+        ele = f"<ele>{relais['seehöhe']}</ele>" if relais.get("seehöhe") else ""
+        self._emit(
+            f'<wpt lat="{coords["lat"]:.6f}" lon="{coords["lng"]:.6f}">{ele}'
+            f"<name>{escape(relais['rufzeichen'])}</name>"
+            f"<desc>{escape(describe(relais))}</desc>"
+            f"<type>{escape(relais['typ'])}</type>"
+            "</wpt>\n"
+        )
+
+    def footer(self) -> None:
+        self._emit("</gpx>\n")
+
+
+WRITERS = {
+    "csv": ChirpCsvWriter,
+    "kml": KmlWriter,
+    "gpx": GpxWriter,
+}
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def export_groups(relais: dict, profile: RegionProfile = AT) -> list[tuple[str, str]]:
+    """Return (file stem, title) of every export a record belongs to."""
+    groups = [("alle", f"Relais {profile.name}")]
+    if relais.get("bundesland"):
+        groups.append((f"bundesland-{slugify(relais['bundesland'])}", f"Relais {relais['bundesland']}"))
+    groups.append((f"band-{slugify(relais['band'])}", f"Relais {relais['band']}"))
+    groups.append((f"typ-{slugify(relais['typ'])}", f"Relais {relais['typ']}"))
+    return groups
+
+
+def write_exports(
+    relais: Iterable[dict],
+    output_dir: Path,
+    formats: Optional[Iterable[str]] = None,
+    profile: RegionProfile = AT,
+) -> dict[str, int]:
+    """
+    Stream relay records into per-group CHIRP/KML/GPX files; the file of
+    all records is titled with the profile's name.
+
+    Returns counts of written and unchanged files.
+    """
+    formats = list(formats or FORMATS)
+    writers: dict[tuple[str, str], ExportWriter] = {}
+
+    try:
+        for r in relais:
+            for stem, title in export_groups(r, profile):
+                for fmt in formats:
+                    writer = writers.get((stem, fmt))
+                    if writer is None:
+                        writer_cls = WRITERS[fmt]
+                        path = output_dir / fmt / f"{stem}.{writer_cls.extension}"
+                        writer = writers[(stem, fmt)] = writer_cls(path, title)
+                    writer.write(r)
+    except BaseException:
+        for writer in writers.values():
+            writer.abort()
+        raise
+
+    stats = {"written": 0, "unchanged": 0, "removed": 0}
+    for writer in writers.values():
+        if writer.close():
+            stats["written"] += 1
+        else:
+            stats["unchanged"] += 1
+
+    # Drop files for groups that no longer have any relays
+    current = {writer.path for writer in writers.values()}
+    for fmt in formats:
+        for path in (output_dir / fmt).glob(f"*.{WRITERS[fmt].extension}"):
+            if path not in current:
+                path.unlink()
+                stats["removed"] += 1
+
+    logger.info(
+        f"Exports in {output_dir}: {stats['written']} written, "
+        f"{stats['unchanged']} unchanged, {stats['removed']} removed"
+    )
+    return stats
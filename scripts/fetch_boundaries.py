@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Boundary File Download
+
+Downloads the Austrian state and municipality boundaries used by
+regions.py into scripts/boundaries/. The files are the simplified
+Statistik Austria based GeoJSON of GeoJSON-TopoJSON-Austria
+(https://github.com/ginseng666/GeoJSON-TopoJSON-Austria), which carry the
+`name` and `iso` properties regions.py expects.
+
+A download is only put in place after it parsed and every feature has a
+valid iso code, so a broken download never replaces working files.
+
+Usage:
+    python fetch_boundaries.py
+    python update_relais.py --boundaries boundaries/
+"""
+
+import json
+import logging
+import os
+import tempfile
+import argparse
+from pathlib import Path
+
+import requests
+
+import httpclient
+from regions import BUNDESLAND_FROM_ISO, DEFAULT_BOUNDARIES, GEMEINDEN_FILE, STATES_FILE
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = (
+    "https://raw.githubusercontent.com/ginseng666/GeoJSON-TopoJSON-Austria/master/2021/simplified-95"
+)
+
+# Our file name -> file name in the upstream directory
+UPSTREAM_FILES = {
+    STATES_FILE: "laender_95_geo.json",
+    GEMEINDEN_FILE: "gemeinden_95_geo.json",
+}
+
+
+def check_features(data: dict, name: str) -> int:
+    """Number of features; raises ValueError if a feature lacks a valid iso code."""
+    features = data.get("features")
+    if not features:
+        raise ValueError(f"{name} contains no features")
+    for feature in features:
+        iso = str((feature.get("properties") or {}).get("iso", ""))
+        if iso[:1] not in BUNDESLAND_FROM_ISO:
+            raise ValueError(f"{name}: feature without valid iso code: {feature.get('properties')}")
+    return len(features)
+
+
+def fetch_boundaries(directory: Path, base_url: str = DEFAULT_BASE_URL, timeout: int = 60) -> None:
+    """Download and check the boundary files, then put them in place."""
+    directory.mkdir(parents=True, exist_ok=True)
+    for filename, upstream in UPSTREAM_FILES.items():
+        url = f"{base_url}/{upstream}"
+        logger.info(f"Fetching {url}...")
+        response = httpclient.session().get(url, timeout=timeout)
+        response.raise_for_status()
+        count = check_features(response.json(), upstream)
+
+        path = directory / filename
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{filename}.", dir=directory)
+        with os.fdopen(fd, "wb") as f:
+            f.write(response.content)
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+        logger.info(f"Saved {count} boundaries to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Download the Austrian boundary files for Bundesland and Gemeinde resolution"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        type=Path,
+        default=DEFAULT_BOUNDARIES,
+        help=f"Directory for the GeoJSON files (default: {DEFAULT_BOUNDARIES})"
+    )
+    parser.add_argument(
+        "--base-url",
+        default=DEFAULT_BASE_URL,
+        help="Directory URL of the upstream files (default: 2021, simplified to 95%%)"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=int,
+        default=60,
+        help="HTTP timeout per file in seconds (default: 60)"
+    )
+
+    args = parser.parse_args()
+
+    try:
+        fetch_boundaries(args.output, args.base_url, args.timeout)
+    except (requests.RequestException, ValueError) as e:
+        logger.error(f"Could not fetch boundary files: {e}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Frequency Index
+
+Sorted TX and RX frequencies per band, written next to relais.json by the
+updater, so questions like "what is on 438.425?" or "what is free between
+145.575 and 145.800 in Tirol?" are answered with a binary search instead
+of a scan over all records.
+
+frequencies.json holds, per band, parallel arrays of sorted frequencies
+and the positions of their records in relais.json:
+
+    {"lastUpdate": ..., "bands": {"2m": {"tx": [...], "txPos": [...],
+                                        "rx": [...], "rxPos": [...]}}}
+
+The free channel report walks the repeater output channels of the band plan
+(BAND_PLAN) and lists those no repeater transmits on.
+
+Usage:
+    python frequencies.py lookup 438.425
+    python frequencies.py range 145.575 145.800 --bundesland Tirol
+    python frequencies.py free 145.575 145.800 --bundesland Tirol
+"""
+
+import bisect
+import json
+import logging
+import os
+import tempfile
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "frequencies.json"
+DEFAULT_DATA = Path(__file__).parent.parent / "data" / "relais.json"
+
+# Channel rasters are stepped in whole Hz to avoid float drift
+MHZ = 1_000_000
+
+
+@dataclass(frozen=True)
+class ChannelRaster:
+    """Repeater output segment of a band and its channel spacing."""
+    first: float  # MHz
+    last: float  # MHz
+    step_khz: float
+
+    def channels(self, low: float, high: float) -> Iterator[float]:
+        """Channel centres between low and high (MHz, inclusive)."""
+        step = round(self.step_khz * 1000)
+        first, last = round(self.first * MHZ), round(self.last * MHZ)
+        start = max(first, first + -(-(round(low * MHZ) - first) // step) * step)
+        for hz in range(start, min(last, round(high * MHZ)) + 1, step):
+            yield hz / MHZ
+
+
+# Repeater outputs per IARU Region 1 / ÖVSV band plan
+BAND_PLAN = {
+    "10m": ChannelRaster(29.620, 29.680, 10),
+    "6m": ChannelRaster(51.810, 51.990, 10),
+    "2m": ChannelRaster(145.575, 145.7875, 12.5),
+    "70cm": ChannelRaster(438.025, 439.475, 12.5),
+    "23cm": ChannelRaster(1297.000, 1297.475, 25),
+}
+
+
+def build_frequency_index(relais: Iterable[dict]) -> dict[str, dict[str, list]]:
+    """Sorted frequency arrays per band; positions refer to the input order."""
+    entries: dict[str, dict[str, list[tuple[float, int]]]] = {}
+    for pos, r in enumerate(relais):
+        band = entries.setdefault(r["band"], {"tx": [], "rx": []})
+        for kind, key in (("tx", "txFrequenz"), ("rx", "rxFrequenz")):
+            if r.get(key):
+                band[kind].append((r[key], pos))
+
+    bands = {}
+    for name, kinds in sorted(entries.items()):
+        bands[name] = {}
+        for kind, pairs in kinds.items():
+            pairs.sort()
+            bands[name][kind] = [f for f, _ in pairs]
+            bands[name][f"{kind}Pos"] = [p for _, p in pairs]
+    return bands
+
+
+def write_frequency_index(relais: list[dict], path: Path, meta: dict) -> None:
+    """Write frequencies.json for the records in the order of relais.json."""
+    data = {"lastUpdate": meta.get("lastUpdate"), "bands": build_frequency_index(relais)}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.chmod(tmp_name, 0o644)
+    os.replace(tmp_name, path)
+    logger.info(f"Saved frequency index of {len(relais)} relays to {path}")
+
+
+@dataclass
+class Match:
+    frequency: float
+    kind: str  # "tx" or "rx"
+    relais: dict
+
+
+class FrequencyIndex:
+    """frequencies.json together with the relay records it points to."""
+
+    def __init__(self, bands: dict[str, dict[str, list]], relais: list[dict]):
+        self.bands = bands
+        self.relais = relais
+
+    @classmethod
+    def load(cls, data_path: Path, index_path: Optional[Path] = None) -> "FrequencyIndex":
+        index_path = index_path or data_path.parent / INDEX_NAME
+        with open(data_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("lastUpdate") != data.get("lastUpdate"):
+            raise ValueError(f"{index_path} does not belong to {data_path}; run the updater again")
+        return cls(index["bands"], data["relais"])
+
+    def range(self, low: float, high: float, kinds: tuple[str, ...] = ("tx", "rx")) -> list[Match]:
+        """All frequencies between low and high (MHz, inclusive), sorted."""
+        matches = []
+        for band in self.bands.values():
+            for kind in kinds:
+                freqs, positions = band.get(kind, []), band.get(f"{kind}Pos", [])
+                start = bisect.bisect_left(freqs, low)
+                end = bisect.bisect_right(freqs, high)
+                matches.extend(
+                    Match(freqs[i], kind, self.relais[positions[i]]) for i in range(start, end)
+                )
+        matches.sort(key=lambda m: (m.frequency, m.kind != "tx", m.relais["rufzeichen"]))
+        return matches
+
+    def lookup(self, frequency: float, tolerance_khz: float = 0.5) -> list[Match]:
+        """Frequencies within tolerance of frequency."""
+        tolerance = tolerance_khz / 1000
+        return self.range(frequency - tolerance, frequency + tolerance)
+
+    def free_channels(
+        self,
+        low: float,
+        high: float,
+        bundesland: Optional[str] = None,
+    ) -> list[tuple[str, float]]:
+        """(band, channel) of band plan outputs in range that no repeater uses."""
+        free = []
+        for band, raster in BAND_PLAN.items():
+            # A repeater off the raster occupies the channel it is closest to
+            half = raster.step_khz / 2000 - 1e-6
+            for channel in raster.channels(low, high):
+                used = [
+                    m for m in self.range(channel - half, channel + half, kinds=("tx",))
+                    if bundesland is None or m.relais.get("bundesland") == bundesland
+                ]
+                if not used:
+                    free.append((band, channel))
+        return free
+
+
+def _format_match(m: Match) -> str:
+    r = m.relais
+    return (
+        f"{m.frequency:9.4f} {m.kind.upper()}  {r['rufzeichen']:<9} {r['typ']:<6} "
+        f"{r['band']:<5} {r.get('bundesland') or '-':<16} {r['standort']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Look up repeaters by frequency"
+    )
+    parser.add_argument(
+        "-d", "--data",
+        type=Path,
+        default=DEFAULT_DATA,
+        help=f"Relay JSON file; {INDEX_NAME} is read from the same directory (default: {DEFAULT_DATA})"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    lookup = subparsers.add_parser("lookup", help="What is on this frequency?")
+    lookup.add_argument("frequency", type=float, help="Frequency in MHz")
+    lookup.add_argument("--tolerance-khz", type=float, default=0.5, help="Match tolerance (default: 0.5)")
+
+    for name, text in (("range", "Repeaters between two frequencies"), ("free", "Unused band plan channels")):
+        sub = subparsers.add_parser(name, help=text)
+        sub.add_argument("low", type=float, help="Lower frequency in MHz")
+        sub.add_argument("high", type=float, help="Upper frequency in MHz")
+
+    for sub in subparsers.choices.values():
+        sub.add_argument("--bundesland", help="Only repeaters in this Bundesland")
+
+    args = parser.parse_args()
+
+    index = FrequencyIndex.load(args.data)
+
+    if args.command == "free":
+        channels = index.free_channels(args.low, args.high, args.bundesland)
+        for band, channel in channels:
+            print(f"{channel:9.4f}  {band}")
+        where = f" in {args.bundesland}" if args.bundesland else ""
+        logger.info(f"{len(channels)} free repeater channels{where}")
+        return
+
+    if args.command == "lookup":
+        matches = index.lookup(args.frequency, args.tolerance_khz)
+    else:
+        matches = index.range(args.low, args.high)
+
+    matches = [m for m in matches if args.bundesland is None or m.relais.get("bundesland") == args.bundesland]
+    for m in matches:
+        print(_format_match(m))
+    logger.info(f"{len(matches)} matches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Relay History Store
+
+Append-only SQLite history of the merged relay data. Each updater run is
+recorded in `runs`; `changes` only holds field values that differ from the
+previous run of the same relay, keyed by (relay_id, field, run_id).
+
+A relay's presence is tracked in the pseudo field "_present", so relays
+that drop out of the sources get a tombstone instead of losing their
+history. `lastUpdate` is not tracked since it changes on every run. A run
+with the timestamp of the latest run replaces it if the data differ, and
+is a no-op otherwise.
+
+Usage:
+    python history.py append ../data/relais.json
+    python history.py at 2026-03-01 -o relais-2026-03-01.json
+    python history.py changes OE3XWU
+    python history.py compact --keep-days 365
+"""
+
+import json
+import logging
+import sqlite3
+import argparse
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable, Optional
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB = Path(__file__).parent.parent / "data" / "history.sqlite"
+
+PRESENT = "_present"
+UNTRACKED_FIELDS = {"id", "lastUpdate"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    ts TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS changes (
+    relay_id TEXT NOT NULL,
+    field TEXT NOT NULL,
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    value TEXT,  -- JSON encoded; NULL when the field was removed
+    PRIMARY KEY (relay_id, field, run_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS changes_by_run ON changes(run_id);
+CREATE INDEX IF NOT EXISTS changes_by_value ON changes(field, value);
+"""
+
+
+def normalize_timestamp(value: str, end_of_day: bool = False) -> str:
+    """Normalize an ISO date or datetime to a sortable UTC timestamp."""
+    if len(value) == 10 and end_of_day:
+        value = f"{value}T23:59:59"
+    ts = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(timezone.utc).isoformat(timespec="seconds")
+
+
+def _encode(value) -> str:
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def _flatten(relais: dict) -> dict[str, str]:
+    """Encode the tracked fields of one record."""
+    fields = {
+        field: _encode(value)
+        for field, value in relais.items()
+        if field not in UNTRACKED_FIELDS
+    }
+    fields[PRESENT] = _encode(True)
+    return fields
+
+
+class HistoryStore:
+    """SQLite backed change history of relay records."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "HistoryStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _run_at(self, ts: str) -> Optional[int]:
+        row = self.conn.execute(
+            "SELECT MAX(run_id) FROM runs WHERE ts <= ?", (ts,)
+        ).fetchone()
+        return row[0]
+
+    def _run_at_before(self, run_id: int) -> Optional[int]:
+        row = self.conn.execute(
+            "SELECT MAX(run_id) FROM runs WHERE run_id < ?", (run_id,)
+        ).fetchone()
+        return row[0]
+
+    def _encoded_state(self, run_id: Optional[int]) -> dict[str, dict[str, Optional[str]]]:
+        """Latest encoded value of every (relay, field) as of a run."""
+        state: dict[str, dict[str, Optional[str]]] = {}
+        if run_id is None:
+            return state
+
+        # SQLite returns the bare columns of the row holding MAX(run_id)
+        rows = self.conn.execute(
+            """
+            SELECT relay_id, field, value, MAX(run_id)
+            FROM changes
+            WHERE run_id <= ?
+            GROUP BY relay_id, field
+            """,
+            (run_id,),
+        )
+        for relay_id, field, value, _ in rows:
+            state.setdefault(relay_id, {})[field] = value
+        return state
+
+    def _run_stats(self, run_id: int) -> dict[str, int]:
+        """The counts append() reported for a recorded run, from its stored values."""
+        rows = self.conn.execute(
+            "SELECT relay_id, field, value FROM changes WHERE run_id = ?", (run_id,)
+        ).fetchall()
+        present = {relay_id: value for relay_id, field, value in rows if field == PRESENT}
+        return {
+            "added": sum(1 for value in present.values() if value == _encode(True)),
+            "changed": len({relay_id for relay_id, _, _ in rows if relay_id not in present}),
+            "removed": sum(1 for value in present.values() if value == _encode(False)),
+            "values": len(rows),
+        }
+
+    def _present_state(self, run_id: int) -> dict[str, dict[str, str]]:
+        """Encoded fields of the relays present as of a run, as _flatten() gives them."""
+        return {
+            relay_id: {field: value for field, value in fields.items() if value is not None}
+            for relay_id, fields in self._encoded_state(run_id).items()
+            if fields.get(PRESENT) == _encode(True)
+        }
+
+    def append(self, relais: Iterable[dict], ts: str) -> dict[str, int]:
+        """Record one run. Only values that changed since the last run are stored."""
+        ts = normalize_timestamp(ts)
+        latest = self.conn.execute("SELECT MAX(ts) FROM runs").fetchone()[0]
+        if latest and ts < latest:
+            raise ValueError(f"Run {ts} is older than the last recorded run {latest}")
+
+        if latest and ts == latest:
+            run_id = self._run_at(ts)
+            records = {r["id"]: _flatten(r) for r in relais}
+            if records == self._present_state(run_id):
+                # The same run again, e.g. the history step rerun without new data
+                logger.info(f"History run {ts} is already recorded")
+                return self._run_stats(run_id)
+
+            # Same lastUpdate with other data, e.g. regions rerun on a cached merge:
+            # the run is recorded again against the run before it
+            logger.info(f"History run {ts} is recorded again with changed data")
+            previous = self._encoded_state(self._run_at_before(run_id))
+            with self.conn:
+                self.conn.execute("DELETE FROM changes WHERE run_id = ?", (run_id,))
+                stats = self._insert_changes(run_id, records.items(), previous)
+        else:
+            previous = self._encoded_state(self._run_at(ts))
+            with self.conn:
+                run_id = self.conn.execute("INSERT INTO runs (ts) VALUES (?)", (ts,)).lastrowid
+                stats = self._insert_changes(run_id, ((r["id"], _flatten(r)) for r in relais), previous)
+
+        logger.info(
+            f"History run {ts}: {stats['added']} added, {stats['changed']} changed, "
+            f"{stats['removed']} removed ({stats['values']} values)"
+        )
+        return stats
+
+    def _insert_changes(
+        self,
+        run_id: int,
+        records: Iterable[tuple[str, dict[str, str]]],
+        previous: dict[str, dict[str, Optional[str]]],
+    ) -> dict[str, int]:
+        """Store the values of a run that differ from the previous state; returns the counts."""
+        rows = []
+        seen = set()
+        stats = {"added": 0, "changed": 0, "removed": 0, "values": 0}
+
+        for relay_id, new in records:
+            seen.add(relay_id)
+            old = previous.get(relay_id, {})
+
+            if old.get(PRESENT) != new[PRESENT]:
+                stats["added"] += 1
+            diff = [(f, v) for f, v in new.items() if old.get(f) != v]
+            diff.extend((f, None) for f, v in old.items() if f not in new and v is not None)
+            if diff and old.get(PRESENT) == new[PRESENT]:
+                stats["changed"] += 1
+
+            rows.extend((relay_id, field, run_id, value) for field, value in diff)
+
+        for relay_id, old in previous.items():
+            if relay_id not in seen and old.get(PRESENT) == _encode(True):
+                rows.append((relay_id, PRESENT, run_id, _encode(False)))
+                stats["removed"] += 1
+
+        self.conn.executemany(
+            "INSERT INTO changes (relay_id, field, run_id, value) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        stats["values"] = len(rows)
+        return stats
+
+    def state_at(self, ts: str) -> list[dict]:
+        """Reconstruct the full dataset as it was at a point in time."""
+        run_id = self._run_at(normalize_timestamp(ts, end_of_day=True))
+        relais = []
+
+        for relay_id, fields in self._encoded_state(run_id).items():
+            if fields.get(PRESENT) != _encode(True):
+                continue
+            record = {"id": relay_id}
+            for field, value in fields.items():
+                if field != PRESENT and value is not None:
+                    record[field] = json.loads(value)
+            relais.append(record)
+
+        return sorted(relais, key=lambda x: (x.get("rufzeichen", ""), x.get("typ", "")))
+
+    def relay_ids(self, query: str) -> list[str]:
+        """Resolve a relay id or callsign to relay ids."""
+        rows = self.conn.execute(
+            """
+            SELECT DISTINCT relay_id FROM changes
+            WHERE relay_id = ? OR (field = 'rufzeichen' AND value = ?)
+            ORDER BY relay_id
+            """,
+            (query.lower(), _encode(query.upper())),
+        )
+        return [row[0] for row in rows]
+
+    def changes(self, relay_id: str) -> list[dict]:
+        """List all recorded changes of one relay, oldest first."""
+        rows = self.conn.execute(
+            """
+            SELECT runs.ts, changes.field, changes.value
+            FROM changes JOIN runs USING (run_id)
+            WHERE changes.relay_id = ?
+            ORDER BY changes.run_id, changes.field
+            """,
+            (relay_id,),
+        )
+        return [
+            {"ts": ts, "field": field, "value": json.loads(value) if value is not None else None}
+            for ts, field, value in rows
+        ]
+
+    def compact(self, keep_days: int = 365) -> dict[str, int]:
+        """
+        Shrink the store.
+
+        Runs older than keep_days are thinned to one run per month by folding
+        their changes into the next kept run, then values that repeat the
+        previous value of the same field are dropped.
+        """
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=keep_days)).isoformat(timespec="seconds")
+        runs = self.conn.execute("SELECT run_id, ts FROM runs ORDER BY run_id").fetchall()
+
+        # Keep every recent run and the last run of each older month
+        kept = set()
+        last_of_month: dict[str, int] = {}
+        for run_id, ts in runs:
+            if ts >= cutoff:
+                kept.add(run_id)
+            else:
+                last_of_month[ts[:7]] = run_id
+        kept.update(last_of_month.values())
+        if runs:
+            kept.add(runs[-1][0])
+
+        stats = {"runs_removed": 0, "values_removed": 0}
+        before = self.conn.execute("SELECT COUNT(*) FROM changes").fetchone()[0]
+
+        with self.conn:
+            next_kept = None
+            for run_id, _ in reversed(runs):
+                if run_id in kept:
+                    next_kept = run_id
+                    continue
+                # Later values already on the kept run take precedence
+                self.conn.execute(
+                    "UPDATE OR IGNORE changes SET run_id = ? WHERE run_id = ?",
+                    (next_kept, run_id),
+                )
+                self.conn.execute("DELETE FROM changes WHERE run_id = ?", (run_id,))
+                self.conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+                stats["runs_removed"] += 1
+
+            self.conn.execute(
+                """
+                DELETE FROM changes WHERE (relay_id, field, run_id) IN (
+                    SELECT relay_id, field, run_id FROM (
+                        SELECT relay_id, field, run_id, value,
+                               LAG(value) OVER w AS prev_value,
+                               ROW_NUMBER() OVER w AS n
+                        FROM changes
+                        WINDOW w AS (PARTITION BY relay_id, field ORDER BY run_id)
+                    )
+                    WHERE n > 1 AND value IS prev_value
+                )
+                """
+            )
+
+        after = self.conn.execute("SELECT COUNT(*) FROM changes").fetchone()[0]
+        stats["values_removed"] = before - after
+        self.conn.execute("VACUUM")
+
+        logger.info(
+            f"Compacted history: {stats['runs_removed']} runs and "
+            f"{stats['values_removed']} values removed"
+        )
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Query and maintain the relay history store"
+    )
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=DEFAULT_DB,
+        help=f"History database (default: {DEFAULT_DB})"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    append = commands.add_parser("append", help="Record a relais.json file as a run")
+    append.add_argument("file", type=Path)
+    append.add_argument("--ts", help="Run timestamp (default: the file's lastUpdate)")
+
+    at = commands.add_parser("at", help="Reconstruct the dataset at a date/time")
+    at.add_argument("ts", help="ISO date or datetime")
+    at.add_argument("-o", "--output", type=Path, help="Write JSON here instead of stdout")
+
+    changes = commands.add_parser("changes", help="Show the change log of a relay")
+    changes.add_argument("relay", help="Relay id or callsign")
+
+    compact = commands.add_parser("compact", help="Thin old runs and drop redundant values")
+    compact.add_argument("--keep-days", type=int, default=365)
+
+    args = parser.parse_args()
+
+    with HistoryStore(args.db) as store:
+        if args.command == "append":
+            with open(args.file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            store.append(data["relais"], args.ts or data["lastUpdate"])
+
+        elif args.command == "at":
+            output = {"relais": store.state_at(args.ts), "asOf": args.ts}
+            text = json.dumps(output, ensure_ascii=False, indent=2)
+            if args.output:
+                args.output.write_text(text + "\n", encoding="utf-8")
+            else:
+                print(text)
+
+        elif args.command == "changes":
+            relay_ids = store.relay_ids(args.relay)
+            if not relay_ids:
+                logger.error(f"No history for {args.relay}")
+                raise SystemExit(1)
+            for relay_id in relay_ids:
+                print(relay_id)
+                for change in store.changes(relay_id):
+                    value = json.dumps(change["value"], ensure_ascii=False)
+                    print(f"  {change['ts']}  {change['field']}: {value}")
+
+        elif args.command == "compact":
+            store.compact(args.keep_days)
+
+
+if __name__ == "__main__":
+    main()
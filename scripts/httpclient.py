@@ -0,0 +1,35 @@
+"""
+Shared HTTP Client
+
+All sources and regions download through one connection pool, so parallel
+regions reuse TCP/TLS connections to the same hosts (e.g. Repeaterbook)
+instead of opening their own.
+
+requests sessions are not safe to share between threads, so every thread
+gets its own Session; they all mount the same HTTPAdapter, whose urllib3
+pool is thread-safe.
+"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = "Relaisblick/1.0 (Amateur Radio Relay Map)"
+
+POOL_HOSTS = 16
+POOL_CONNECTIONS_PER_HOST = 8
+
+_adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_CONNECTIONS_PER_HOST)
+_local = threading.local()
+
+
+def session() -> requests.Session:
+    """The calling thread's session on the shared connection pool."""
+    s = getattr(_local, "session", None)
+    if s is None:
+        s = _local.session = requests.Session()
+        s.mount("http://", _adapter)
+        s.mount("https://", _adapter)
+        s.headers["User-Agent"] = USER_AGENT
+    return s
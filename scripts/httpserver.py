@@ -0,0 +1,268 @@
+"""
+Minimal asyncio HTTP/1.1 Server
+
+Just enough HTTP for the small JSON services in this directory: GET
+requests, query strings, keep-alive and streamed responses. It is meant to
+sit behind nginx, not to face the internet directly.
+"""
+
+import asyncio
+import json
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Optional
+from urllib.parse import parse_qsl, urlsplit, unquote
+
+logger = logging.getLogger(__name__)
+
+REASONS = {
+    200: "OK",
+    204: "No Content",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+    502: "Bad Gateway",
+    503: "Service Unavailable",
+}
+
+MAX_HEADER_BYTES = 16 * 1024
+
+
+class HTTPError(Exception):
+    """Raised by handlers to return an error response."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+@dataclass
+class Request:
+    """Parsed HTTP request."""
+    method: str
+    path: str
+    query: dict[str, str]
+    headers: dict[str, str]
+
+    def param(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """Return a query parameter, or default if it is missing or empty."""
+        value = self.query.get(name)
+        return value if value not in (None, "") else default
+
+    def float_param(self, name: str, default: Optional[float] = None) -> float:
+        """Return a query parameter as float, raising 400 if it is invalid or not finite."""
+        value = self.param(name)
+        if value is None:
+            if default is None:
+                raise HTTPError(400, f"Missing parameter: {name}")
+            return default
+        return parse_float(name, value)
+
+    def int_param(self, name: str, default: int) -> int:
+        """Return a query parameter as int, raising 400 if it is invalid."""
+        value = self.param(name)
+        if value is None:
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise HTTPError(400, f"Invalid integer for {name}: {value}")
+
+    def list_param(self, name: str) -> list[str]:
+        """Return a comma-separated query parameter as list."""
+        value = self.param(name)
+        return [v.strip() for v in value.split(",") if v.strip()] if value else []
+
+
+def parse_float(name: str, value: str) -> float:
+    """Parse a parameter value as float, raising 400 if it is invalid or not finite."""
+    try:
+        number = float(value)
+    except ValueError:
+        raise HTTPError(400, f"Invalid number for {name}: {value}")
+    if not math.isfinite(number):
+        raise HTTPError(400, f"Invalid number for {name}: {value}")
+    return number
+
+
+@dataclass
+class Response:
+    """HTTP response. Set `stream` for long-lived chunked bodies."""
+    status: int = 200
+    body: bytes = b""
+    content_type: str = "application/json; charset=utf-8"
+    headers: dict[str, str] = field(default_factory=dict)
+    stream: Optional[AsyncIterator[bytes]] = None
+
+
+def json_response(payload, status: int = 200, headers: Optional[dict] = None) -> Response:
+    """Build a JSON response."""
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return Response(status=status, body=body, headers=headers or {})
+
+
+Handler = Callable[[Request], Awaitable[Response]]
+
+
+class HTTPServer:
+    """Routes GET requests by exact path to async handlers."""
+
+    def __init__(self, server_name: str = "Relaisblick"):
+        self.server_name = server_name
+        self.routes: dict[str, Handler] = {}
+        self.prefix_routes: list[tuple[str, Handler]] = []
+
+    def route(self, path: str, handler: Handler) -> None:
+        """Register a handler for an exact path."""
+        self.routes[path] = handler
+
+    def route_prefix(self, prefix: str, handler: Handler) -> None:
+        """Register a handler for every path starting with prefix."""
+        self.prefix_routes.append((prefix, handler))
+
+    async def serve(self, host: str, port: int) -> None:
+        """Serve until cancelled."""
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        addrs = ", ".join(str(s.getsockname()) for s in server.sockets)
+        logger.info(f"Listening on {addrs}")
+        async with server:
+            await server.serve_forever()
+
+    def _resolve(self, path: str) -> Optional[Handler]:
+        handler = self.routes.get(path)
+        if handler:
+            return handler
+        for prefix, prefix_handler in self.prefix_routes:
+            if path.startswith(prefix):
+                return prefix_handler
+        return None
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+
+                response = await self._dispatch(request)
+                keep_alive = request.headers.get("connection", "").lower() != "close"
+                await self._write_response(writer, request, response, keep_alive)
+
+                if response.stream is not None or not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except HTTPError as e:
+            writer.write(_encode_head(e.status, {"Content-Length": "0", "Connection": "close"}))
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _dispatch(self, request: Request) -> Response:
+        if request.method not in ("GET", "HEAD"):
+            return json_response({"error": "Method not allowed"}, 405)
+
+        handler = self._resolve(request.path)
+        if handler is None:
+            return json_response({"error": "Not found"}, 404)
+
+        try:
+            return await handler(request)
+        except HTTPError as e:
+            return json_response({"error": e.message}, e.status)
+        except Exception as e:
+            logger.exception(f"Handler for {request.path} failed: {e}")
+            return json_response({"error": "Internal server error"}, 500)
+
+    async def _write_response(
+        self,
+        writer: asyncio.StreamWriter,
+        request: Request,
+        response: Response,
+        keep_alive: bool,
+    ) -> None:
+        headers = {
+            "Server": self.server_name,
+            "Content-Type": response.content_type,
+            **response.headers,
+        }
+
+        if response.stream is not None:
+            headers["Connection"] = "close"
+            writer.write(_encode_head(response.status, headers))
+            await writer.drain()
+            try:
+                async for chunk in response.stream:
+                    writer.write(chunk)
+                    await writer.drain()
+            finally:
+                aclose = getattr(response.stream, "aclose", None)
+                if aclose:
+                    await aclose()
+            return
+
+        headers["Content-Length"] = str(len(response.body))
+        headers["Connection"] = "keep-alive" if keep_alive else "close"
+        writer.write(_encode_head(response.status, headers))
+        if request.method != "HEAD":
+            writer.write(response.body)
+        await writer.drain()
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+    """Read one request head; returns None on a cleanly closed connection."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if not e.partial.strip():
+            return None
+        raise
+    except asyncio.LimitOverrunError:
+        raise HTTPError(400, "Request header too large")
+
+    if len(head) > MAX_HEADER_BYTES:
+        raise HTTPError(400, "Request header too large")
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, _version = lines[0].split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Malformed request line")
+
+    headers = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    # Request bodies are not used by any service; drain them if sent
+    try:
+        length = int(headers.get("content-length", "0") or 0)
+    except ValueError:
+        raise HTTPError(400, "Invalid Content-Length")
+    if length < 0:
+        raise HTTPError(400, "Invalid Content-Length")
+    if length:
+        await reader.readexactly(length)
+
+    url = urlsplit(target)
+    return Request(
+        method=method.upper(),
+        path=unquote(url.path),
+        query=dict(parse_qsl(url.query)),
+        headers=headers,
+    )
+
+
+def _encode_head(status: int, headers: dict[str, str]) -> bytes:
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, 'Unknown')}"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
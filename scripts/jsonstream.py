@@ -0,0 +1,172 @@
+"""
+Streaming JSON Helpers
+
+- iter_array_items(): decode the items of a JSON array from a stream of
+  byte chunks one at a time, without holding the whole document
+- write_relais_json(): write relais.json record by record, in the same
+  layout json.dump(indent=2) produces, and replace the file atomically
+"""
+
+import codecs
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterable, Iterator
+
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+class _ChunkBuffer:
+    """Text buffer refilled from byte chunks on demand."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Read one more chunk. Returns False at end of stream."""
+        if self.eof:
+            return False
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self.text = self.text[self.pos:] + self._utf8.decode(b"", final=True)
+            self.pos = 0
+            self.eof = True
+            return False
+        # Drop consumed text so the buffer only holds the current item
+        self.text = self.text[self.pos:] + self._utf8.decode(chunk)
+        self.pos = 0
+        return True
+
+    def skip_whitespace(self) -> str:
+        """Skip whitespace and return the next character ("" at end)."""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+    def seek_array(self, key: str | None) -> None:
+        """Position the buffer just behind the opening '[' of the array."""
+        if key is None:
+            if self.skip_whitespace() != "[":
+                raise ValueError("Expected a JSON array")
+            self.pos += 1
+            return
+
+        # Find `"key": [` in an object without decoding its other members
+        needle = json.dumps(key)
+        while True:
+            found = self.text.find(needle, self.pos)
+            if found >= 0:
+                self.pos = found + len(needle)
+                if self.skip_whitespace() == ":":
+                    self.pos += 1
+                    if self.skip_whitespace() == "[":
+                        self.pos += 1
+                        return
+                continue
+            # Keep a tail in case the key is split across chunks
+            self.pos = max(self.pos, len(self.text) - len(needle))
+            if not self.fill():
+                raise ValueError(f"Key {key!r} with an array value not found")
+
+    def decode_value(self):
+        """Decode the next complete JSON value."""
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A number at the very end of the buffer may continue in the next chunk
+            if end == len(self.text) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_array_items(chunks: Iterable[bytes], key: str | None = None) -> Iterator:
+    """
+    Yield the items of a JSON array from a stream of byte chunks.
+
+    With key, the array is looked up as that member of the top-level
+    object, e.g. key="rptrs" for {"rptrs": [...]}.
+    """
+    buffer = _ChunkBuffer(chunks)
+    buffer.seek_array(key)
+
+    if buffer.skip_whitespace() == "]":
+        return
+
+    while True:
+        if buffer.skip_whitespace() == "":
+            raise ValueError("Unexpected end of JSON array")
+        yield buffer.decode_value()
+
+        separator = buffer.skip_whitespace()
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(f"Expected ',' or ']' in JSON array, got {separator!r}")
+        buffer.pos += 1
+
+
+def iter_file_chunks(path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Read a file in chunks."""
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+
+def write_relais_json(filepath: Path, relais: Iterable[dict], meta: dict, compact: bool = False) -> int:
+    """
+    Write {"relais": [...], **meta} to filepath one record at a time.
+
+    The result is byte-identical to json.dump(..., ensure_ascii=False,
+    indent=2), or to the minified form with compact=True. Returns the
+    number of records written.
+    """
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{filepath.name}.", dir=filepath.parent)
+    count = 0
+
+    if compact:
+        dump_options = {"separators": (",", ":")}
+        record_sep, meta_sep, key_sep = "", "", ":"
+    else:
+        dump_options = {"indent": 2}
+        record_sep, meta_sep, key_sep = "\n    ", "\n  ", ": "
+
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write("{" + meta_sep + '"relais"' + key_sep + "[")
+            for r in relais:
+                text = json.dumps(r, ensure_ascii=False, **dump_options).replace("\n", record_sep)
+                f.write(("," if count else "") + record_sep + text)
+                count += 1
+            f.write((meta_sep + "]") if count else "]")
+
+            for key, value in meta.items():
+                text = json.dumps(value, ensure_ascii=False, **dump_options).replace("\n", meta_sep)
+                f.write(f",{meta_sep}{json.dumps(key, ensure_ascii=False)}{key_sep}{text}")
+            f.write(("\n" if meta_sep else "") + "}")
+
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, filepath)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+    return count
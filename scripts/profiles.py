@@ -0,0 +1,169 @@
+"""
+Region Profiles
+
+Everything that ties the pipeline to one country: which callsigns belong to
+it, its subdivisions (Bundesländer, Kantone, kraje) with their spellings and
+centroids, the sources to fetch and, for the neighbours, the area near the
+Austrian border that is kept.
+
+Austria ("at") is the default region and writes to the usual data/ files;
+every other region writes to its own subdirectory (data/dl/, ...).
+"""
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from regions import (
+    AUSTRIA_CENTER,
+    BUNDESLAND_ALIASES,
+    BUNDESLAND_COORDINATES,
+    BUNDESLAND_FROM_CALLSIGN,
+    DEFAULT_BOUNDARIES,
+)
+
+DISTRICT_DIGIT = re.compile(r"[A-Z]+(\d)")
+
+
+@dataclass(frozen=True)
+class RegionProfile:
+    code: str
+    name: str
+    callsign_pattern: str  # Regex matched against the start of a callsign
+    center: tuple[float, float]
+    sources: tuple[str, ...]  # Sources that can be fetched for this region
+    default_sources: tuple[str, ...]
+    repeaterbook_country: str
+    districts: dict[str, str] = field(default_factory=dict)  # Callsign digit -> subdivision
+    centroids: dict[str, tuple[float, float]] = field(default_factory=dict)
+    aliases: dict[str, str] = field(default_factory=dict)  # Lower-case spelling -> subdivision
+    bbox: Optional[tuple[float, float, float, float]] = None  # (south, west, north, east) to keep
+    boundaries: Optional[Path] = None  # Boundary GeoJSON directory (see regions.py)
+
+    def matches(self, callsign: str) -> bool:
+        """Whether a callsign belongs to this region."""
+        return re.match(self.callsign_pattern, callsign.upper()) is not None
+
+    def normalize_subdivision(self, name: Optional[str]) -> Optional[str]:
+        """Map a source's spelling of a subdivision to ours; None if unknown."""
+        if not name:
+            return None
+        return self.aliases.get(name.strip().lower())
+
+    def subdivision_from_callsign(self, callsign: str) -> Optional[str]:
+        """Subdivision from the district digit of a callsign (OE1 = Wien, ...)."""
+        m = DISTRICT_DIGIT.match(callsign.upper())
+        return self.districts.get(m.group(1)) if m and self.matches(callsign) else None
+
+    def centroid(self, subdivision: Optional[str]) -> tuple[float, float]:
+        return self.centroids.get(subdivision, self.center)
+
+    def contains(self, lat: float, lng: float) -> bool:
+        if self.bbox is None:
+            return True
+        south, west, north, east = self.bbox
+        return south <= lat <= north and west <= lng <= east
+
+
+def _aliases(centroids: dict[str, tuple[float, float]], **extra: str) -> dict[str, str]:
+    return {**{name.lower(): name for name in centroids}, **{k.replace("_", " "): v for k, v in extra.items()}}
+
+
+_DL_CENTROIDS = {
+    "Bayern": (48.95, 11.40),
+    "Baden-Württemberg": (48.54, 9.04),
+}
+
+_HB9_CENTROIDS = {
+    "Graubünden": (46.66, 9.63),
+    "St. Gallen": (47.23, 9.27),
+    "Appenzell Ausserrhoden": (47.37, 9.30),
+    "Appenzell Innerrhoden": (47.32, 9.42),
+    "Thurgau": (47.57, 9.10),
+    "Glarus": (46.98, 9.07),
+}
+
+_OK_CENTROIDS = {
+    "Jihočeský kraj": (49.00, 14.47),
+    "Jihomoravský kraj": (49.00, 16.60),
+    "Kraj Vysočina": (49.40, 15.60),
+    "Plzeňský kraj": (49.60, 13.30),
+    "Zlínský kraj": (49.20, 17.70),
+}
+
+PROFILES = {
+    profile.code: profile
+    for profile in (
+        RegionProfile(
+            code="at",
+            name="Österreich",
+            callsign_pattern=r"OE\d[A-Z]{2,3}",
+            center=AUSTRIA_CENTER,
+            sources=("oevsv", "oe8vik", "repeaterbook"),
+            default_sources=("oevsv", "oe8vik"),
+            repeaterbook_country="at",
+            districts=BUNDESLAND_FROM_CALLSIGN,
+            centroids=BUNDESLAND_COORDINATES,
+            aliases=BUNDESLAND_ALIASES,
+            boundaries=DEFAULT_BOUNDARIES,
+        ),
+        RegionProfile(
+            code="dl",
+            name="Deutschland",
+            callsign_pattern=r"D[A-R]\d[A-Z]{1,3}",
+            center=(48.14, 11.58),
+            sources=("repeaterbook",),
+            default_sources=("repeaterbook",),
+            repeaterbook_country="de",
+            centroids=_DL_CENTROIDS,
+            aliases=_aliases(_DL_CENTROIDS, bavaria="Bayern", baden_wurttemberg="Baden-Württemberg"),
+            bbox=(47.2, 9.3, 48.9, 13.9),
+        ),
+        RegionProfile(
+            code="hb9",
+            name="Schweiz",
+            callsign_pattern=r"HB[39][A-Z]{1,3}",
+            center=(46.85, 9.53),
+            sources=("repeaterbook",),
+            default_sources=("repeaterbook",),
+            repeaterbook_country="ch",
+            centroids=_HB9_CENTROIDS,
+            aliases=_aliases(_HB9_CENTROIDS, grisons="Graubünden", graubuenden="Graubünden", saint_gallen="St. Gallen"),
+            bbox=(46.4, 9.0, 47.7, 10.6),
+        ),
+        RegionProfile(
+            code="ok",
+            name="Česko",
+            callsign_pattern=r"O[KL]\d[A-Z]{1,3}",
+            center=(48.99, 15.60),
+            sources=("repeaterbook",),
+            default_sources=("repeaterbook",),
+            repeaterbook_country="cz",
+            centroids=_OK_CENTROIDS,
+            aliases=_aliases(
+                _OK_CENTROIDS,
+                south_bohemian_region="Jihočeský kraj",
+                south_moravian_region="Jihomoravský kraj",
+                vysocina_region="Kraj Vysočina",
+                plzen_region="Plzeňský kraj",
+                zlin_region="Zlínský kraj",
+            ),
+            bbox=(48.5, 13.6, 49.4, 17.3),
+        ),
+    )
+}
+
+DEFAULT_REGION = "at"
+AT = PROFILES[DEFAULT_REGION]
+
+
+def get_profiles(names) -> list[RegionProfile]:
+    """Resolve region codes; raises ValueError for unknown ones."""
+    unknown = [name for name in names if name not in PROFILES]
+    if unknown:
+        raise ValueError(
+            f"Unknown region(s): {', '.join(unknown)} "
+            f"(available: {', '.join(PROFILES)})"
+        )
+    return [PROFILES[name] for name in names]
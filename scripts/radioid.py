@@ -0,0 +1,148 @@
+"""
+RadioID Repeater IDs
+
+Fills in DMR ID, color code and time slots of DMR repeaters from a locally
+supplied RadioID repeater export. Neither OE8VIK nor the ÖVSV list carry
+them reliably, RadioID has them for every registered repeater.
+
+The export (rptrs.json as {"rptrs": [...]} or the CSV variant) covers the
+whole world with hundreds of thousands of rows, so it is never loaded as a
+whole: rows are streamed, everything outside the region's callsigns is
+dropped on the fly, and the rest goes into a compact index keyed by
+callsign. The updater caches that index keyed by the file's hash, so it is
+only rebuilt when a new export is supplied.
+
+Usage:
+    python update_relais.py --radioid rptrs.json
+"""
+
+import csv
+import hashlib
+import logging
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from jsonstream import iter_array_items, iter_file_chunks
+from profiles import AT, RegionProfile
+from sites import base_callsign
+
+logger = logging.getLogger(__name__)
+
+# Column names of the JSON export first, then common CSV spellings
+ID_FIELDS = ("id", "rptr_id", "repeater_id", "radio_id", "dmr_id")
+CALLSIGN_FIELDS = ("callsign", "call")
+FREQUENCY_FIELDS = ("frequency", "freq", "tx")
+COLOR_CODE_FIELDS = ("color_code", "colorcode", "cc")
+TIMESLOT_FIELDS = ("ts_linked", "timeslots", "ts")
+
+# Repeaters whose RadioID frequency is this close to ours are the same one
+FREQUENCY_TOLERANCE_MHZ = 0.0025
+
+
+class RepeaterId(NamedTuple):
+    dmr_id: int
+    frequency: Optional[float]  # MHz
+    color_code: Optional[int]
+    timeslots: Optional[str]  # e.g. "TS1 TS2"
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file, read in chunks."""
+    h = hashlib.sha256()
+    for chunk in iter_file_chunks(path):
+        h.update(chunk)
+    return h.hexdigest()
+
+
+def iter_rows(path: Path) -> Iterator[dict]:
+    """Rows of a RadioID export (JSON or CSV) with lower-case keys."""
+    if path.suffix.lower() == ".csv":
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                yield {(k or "").strip().lower(): v for k, v in row.items()}
+    else:
+        for row in iter_array_items(iter_file_chunks(path), key="rptrs"):
+            yield {k.lower(): v for k, v in row.items()}
+
+
+def _field(row: dict, names: tuple[str, ...]):
+    for name in names:
+        value = row.get(name)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _number(value, kind=float):
+    try:
+        return kind(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_row(row: dict) -> Optional[RepeaterId]:
+    dmr_id = _number(_field(row, ID_FIELDS), int)
+    if dmr_id is None:
+        return None
+    timeslots = _field(row, TIMESLOT_FIELDS)
+    return RepeaterId(
+        dmr_id=dmr_id,
+        frequency=_number(_field(row, FREQUENCY_FIELDS)),
+        color_code=_number(_field(row, COLOR_CODE_FIELDS), int),
+        timeslots=" ".join(str(timeslots).split()) if timeslots is not None else None,
+    )
+
+
+def build_index(rows: Iterable[dict], profile: RegionProfile = AT) -> dict[str, list[RepeaterId]]:
+    """Index the rows of the region's callsigns by base callsign."""
+    index: dict[str, list[RepeaterId]] = {}
+    total = 0
+    for row in rows:
+        total += 1
+        callsign = base_callsign(str(_field(row, CALLSIGN_FIELDS) or ""))
+        if not callsign or not profile.matches(callsign):
+            continue
+        entry = parse_row(row)
+        if entry:
+            index.setdefault(callsign, []).append(entry)
+    logger.info(
+        f"RadioID: {sum(len(e) for e in index.values())} of {total} repeaters "
+        f"({len(index)} callsigns) belong to {profile.name}"
+    )
+    return index
+
+
+def load_index(path: Path, profile: RegionProfile = AT) -> dict[str, list[RepeaterId]]:
+    """Stream a RadioID export into an index of the region's repeaters."""
+    return build_index(iter_rows(path), profile)
+
+
+def find_repeater(index: dict[str, list[RepeaterId]], relais: dict) -> Optional[RepeaterId]:
+    """The RadioID entry of a record: same callsign, and same frequency if there are several."""
+    entries = index.get(base_callsign(relais["rufzeichen"]))
+    if not entries:
+        return None
+    tx = relais.get("txFrequenz")
+    for entry in entries:
+        if tx is not None and entry.frequency is not None and abs(entry.frequency - tx) <= FREQUENCY_TOLERANCE_MHZ:
+            return entry
+    return entries[0] if len(entries) == 1 else None
+
+
+def enrich_dmr(relais: Iterable[dict], index: dict[str, list[RepeaterId]]) -> int:
+    """Set dmrId, colorCode and timeslots on DMR records in place; returns how many matched."""
+    matched = 0
+    for r in relais:
+        if r["typ"] != "DMR":
+            continue
+        entry = find_repeater(index, r)
+        if entry is None:
+            continue
+        matched += 1
+        r["dmrId"] = entry.dmr_id
+        if entry.color_code is not None:
+            r["colorCode"] = entry.color_code
+        if entry.timeslots:
+            r["timeslots"] = entry.timeslots
+    logger.info(f"RadioID: DMR ID found for {matched} repeaters")
+    return matched
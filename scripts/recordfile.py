@@ -0,0 +1,66 @@
+"""
+Record Files
+
+Parsed source records as a stream of pickles in one file. The parse
+workers write them, the merge and the snapshots read them one record at a
+time, so a source's records are never all in memory at once and only a
+small handle crosses process boundaries or goes into the build cache.
+
+A file ends with a None marker; a file without it was cut short. Reading a
+truncated file, or one whose record classes no longer exist under their
+pickled names, raises RecordFileError.
+"""
+
+import os
+import pickle
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+
+class RecordFileError(Exception):
+    """A record file is missing, truncated or cannot be unpickled."""
+
+
+@dataclass(frozen=True)
+class RecordFile:
+    """Handle of a written record file; iterating it reads the records."""
+    path: Path
+    count: int
+
+    def __iter__(self) -> Iterator[Any]:
+        return read_records(self.path)
+
+
+def read_records(path: Path) -> Iterator[Any]:
+    """Yield the records of a record file."""
+    try:
+        with open(path, "rb") as f:
+            unpickler = pickle.Unpickler(f)
+            while (record := unpickler.load()) is not None:
+                yield record
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError, AttributeError, ImportError) as e:
+        # AttributeError and ImportError: pickled before a record class was renamed or moved
+        raise RecordFileError(f"{path}: {e}") from e
+
+
+def write_records(path: Path, records: Iterable[Any]) -> RecordFile:
+    """Write records one by one and replace path once all are written."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    count = 0
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickler = pickle.Pickler(f, protocol=pickle.HIGHEST_PROTOCOL)
+            for record in records:
+                pickler.dump(record)
+                # Records share no objects; without this the pickler keeps them all
+                pickler.clear_memo()
+                count += 1
+            pickler.dump(None)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return RecordFile(path, count)
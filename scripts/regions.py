@@ -0,0 +1,246 @@
+"""
+Bundesland and Gemeinde Resolution
+
+Assigns Bundesland and Gemeinde to relay records from their coordinates,
+using Austrian boundary polygons from local GeoJSON files in
+scripts/boundaries/:
+- bundeslaender.geojson: the nine states
+- gemeinden.geojson: the municipalities
+
+Features need `name` and `iso` properties with the Statistik Austria codes:
+the state number (1-9), or the five-digit Gemeindekennziffer whose first
+digit is the state. The boundary files are not part of the repository;
+fetch_boundaries.py downloads them (the Docker image and the GitHub workflow
+do so). Without them only the fallbacks below are used.
+
+Each record is resolved in this order:
+1. municipality polygon containing the coordinates
+2. state polygon containing the coordinates
+3. the Bundesland the source reported
+4. the digit of the callsign (OE1 = Wien, ...)
+
+If none of them applies, a Bundesland the source reported in a spelling we
+do not know is kept as it is.
+
+With boundaries loaded, records whose coordinates lie outside Austria are
+flagged with "ausserhalbAT": true. Records with "koordinatenGeschaetzt": true
+only carry a fallback position (the center of their Bundesland) and skip the
+polygon lookup.
+"""
+
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from spatial import BBoxIndex, point_in_polygon, ring_bbox
+
+if TYPE_CHECKING:
+    from profiles import RegionProfile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BOUNDARIES = Path(__file__).parent / "boundaries"
+STATES_FILE = "bundeslaender.geojson"
+GEMEINDEN_FILE = "gemeinden.geojson"
+
+AUSTRIA_CENTER = (47.5, 13.5)
+
+# Statistik Austria state numbers (first digit of the Gemeindekennziffer)
+BUNDESLAND_FROM_ISO = {
+    "1": "Burgenland",
+    "2": "Kärnten",
+    "3": "Niederösterreich",
+    "4": "Oberösterreich",
+    "5": "Salzburg",
+    "6": "Steiermark",
+    "7": "Tirol",
+    "8": "Vorarlberg",
+    "9": "Wien",
+}
+
+# Callsign district digits (OE1 = Wien, ..., OE9 = Vorarlberg)
+BUNDESLAND_FROM_CALLSIGN = {
+    "1": "Wien",
+    "2": "Salzburg",
+    "3": "Niederösterreich",
+    "4": "Burgenland",
+    "5": "Oberösterreich",
+    "6": "Steiermark",
+    "7": "Tirol",
+    "8": "Kärnten",
+    "9": "Vorarlberg",
+}
+
+# Approximate center coordinates for each Bundesland
+BUNDESLAND_COORDINATES = {
+    "Wien": (48.21, 16.37),
+    "Salzburg": (47.80, 13.04),
+    "Niederösterreich": (48.20, 15.63),
+    "Burgenland": (47.50, 16.53),
+    "Oberösterreich": (48.30, 14.29),
+    "Steiermark": (47.07, 15.44),
+    "Tirol": (47.26, 11.39),
+    "Kärnten": (46.62, 13.85),
+    "Vorarlberg": (47.25, 9.90),
+}
+
+# Spellings used by the sources (ÖVSV: German, Repeaterbook: English)
+BUNDESLAND_ALIASES = {
+    **{name.lower(): name for name in BUNDESLAND_COORDINATES},
+    "vienna": "Wien",
+    "lower austria": "Niederösterreich",
+    "niederoesterreich": "Niederösterreich",
+    "upper austria": "Oberösterreich",
+    "oberoesterreich": "Oberösterreich",
+    "styria": "Steiermark",
+    "carinthia": "Kärnten",
+    "kaernten": "Kärnten",
+    "tyrol": "Tirol",
+}
+
+
+def normalize_bundesland(name: Optional[str]) -> Optional[str]:
+    """Map a source's Bundesland spelling to ours; None if unknown."""
+    if not name:
+        return None
+    return BUNDESLAND_ALIASES.get(name.strip().lower())
+
+
+def bundesland_from_callsign(callsign: str) -> Optional[str]:
+    """Bundesland from the district digit of an OE callsign; None if unknown."""
+    if len(callsign) >= 3 and callsign[:2].upper() == "OE":
+        return BUNDESLAND_FROM_CALLSIGN.get(callsign[2])
+    return None
+
+
+@dataclass(frozen=True)
+class Area:
+    """One state or municipality."""
+    name: str
+    iso: str
+    bundesland: str
+
+
+class BoundaryIndex:
+    """State and municipality polygons with a bounding-box prefilter."""
+
+    def __init__(self):
+        # Each polygon of a (multi)polygon is indexed on its own bounding box
+        self.states: BBoxIndex[tuple[Area, list]] = BBoxIndex(cell_size=0.25)
+        self.gemeinden: BBoxIndex[tuple[Area, list]] = BBoxIndex(cell_size=0.05)
+
+    @classmethod
+    def load(cls, directory: Path = DEFAULT_BOUNDARIES) -> Optional["BoundaryIndex"]:
+        """Load the boundary files in directory; None if there are none."""
+        index = cls()
+        for filename, target in ((STATES_FILE, index.states), (GEMEINDEN_FILE, index.gemeinden)):
+            path = directory / filename
+            if not path.exists():
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                features = json.load(f).get("features", [])
+            for feature in features:
+                index._add_feature(feature, target)
+            logger.info(f"Loaded {len(features)} boundaries from {path}")
+
+        if not len(index.states) and not len(index.gemeinden):
+            logger.warning(
+                f"No boundary files in {directory}; "
+                "Bundesland is taken from the sources and callsigns only"
+            )
+            return None
+        return index
+
+    def _add_feature(self, feature: dict, target: BBoxIndex) -> None:
+        properties = feature.get("properties") or {}
+        geometry = feature.get("geometry") or {}
+        iso = str(properties.get("iso", ""))
+        bundesland = BUNDESLAND_FROM_ISO.get(iso[:1])
+        if not bundesland:
+            logger.warning(f"Skipping boundary without valid iso code: {properties}")
+            return
+
+        area = Area(name=properties.get("name") or bundesland, iso=iso, bundesland=bundesland)
+        if geometry.get("type") == "Polygon":
+            polygons = [geometry["coordinates"]]
+        elif geometry.get("type") == "MultiPolygon":
+            polygons = geometry["coordinates"]
+        else:
+            return
+
+        for polygon in polygons:
+            target.insert(*ring_bbox(polygon[0]), (area, polygon))
+
+    @staticmethod
+    def _find(index: BBoxIndex, lat: float, lng: float) -> Optional[Area]:
+        for area, polygon in index.candidates(lat, lng):
+            if point_in_polygon(lat, lng, polygon):
+                return area
+        return None
+
+    def locate(self, lat: float, lng: float) -> tuple[Optional[Area], Optional[Area]]:
+        """Return (Gemeinde, state) containing the point."""
+        gemeinde = self._find(self.gemeinden, lat, lng)
+        state = self._find(self.states, lat, lng)
+        return gemeinde, state
+
+
+def resolve_regions(
+    relais: Iterable[dict],
+    boundaries: Optional[BoundaryIndex],
+    profile: Optional["RegionProfile"] = None,
+) -> dict[str, int]:
+    """
+    Set bundesland (and gemeinde) on all records in place.
+
+    For regions other than Austria, profile supplies the subdivision
+    spellings and callsign districts used by the fallbacks.
+    Returns how many records were resolved by each method.
+    """
+    normalize = profile.normalize_subdivision if profile else normalize_bundesland
+    from_callsign = profile.subdivision_from_callsign if profile else bundesland_from_callsign
+    counts = {"gemeinde": 0, "bundesland": 0, "quelle": 0, "rufzeichen": 0, "unbekannt": 0, "ausserhalb": 0}
+    located: dict[tuple[float, float], tuple[Optional[Area], Optional[Area]]] = {}
+
+    for r in relais:
+        r.pop("gemeinde", None)
+        r.pop("ausserhalbAT", None)
+        gemeinde = state = None
+
+        coords = r.get("koordinaten")
+        if boundaries and coords and not r.get("koordinatenGeschaetzt"):
+            # Sites with several repeaters share coordinates
+            key = (coords["lat"], coords["lng"])
+            if key not in located:
+                located[key] = boundaries.locate(*key)
+            gemeinde, state = located[key]
+            if gemeinde is None and state is None:
+                r["ausserhalbAT"] = True
+                counts["ausserhalb"] += 1
+
+        if gemeinde:
+            bundesland, method = gemeinde.bundesland, "gemeinde"
+            r["gemeinde"] = gemeinde.name
+        elif state:
+            bundesland, method = state.bundesland, "bundesland"
+        elif bundesland := normalize(r.get("bundesland")):
+            method = "quelle"
+        elif bundesland := from_callsign(r["rufzeichen"]):
+            method = "rufzeichen"
+        else:
+            method = "unbekannt"
+
+        counts[method] += 1
+        if bundesland:
+            r["bundesland"] = bundesland
+        elif not r.get("bundesland"):
+            r.pop("bundesland", None)
+
+    logger.info(
+        f"Regions: {counts['gemeinde']} by Gemeinde, {counts['bundesland']} by state polygon, "
+        f"{counts['quelle']} from source, {counts['rufzeichen']} from callsign, "
+        f"{counts['unbekannt']} unknown, {counts['ausserhalb']} outside Austria"
+    )
+    return counts
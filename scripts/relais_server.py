@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Relaisblick Query Service
+
+Small HTTP service answering "which repeaters are near me" style lookups
+from the merged relais.json without every client parsing the full file.
+
+Endpoints:
+- GET /nearest?lat=&lng=&n=&band=&typ=&status=&max_km=
+- GET /bbox?bbox=west,south,east,north&band=&typ=&status=
+- GET /health
+
+The dataset is held in memory with a grid index and reloaded automatically
+whenever the JSON file changes on disk.
+"""
+
+import asyncio
+import json
+import logging
+import argparse
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from httpserver import HTTPError, HTTPServer, Request, Response, json_response, parse_float
+from spatial import GridIndex
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA = Path(__file__).parent.parent / "data" / "relais.json"
+MAX_RESULTS = 200
+
+
+def check_range(name: str, value: float, low: float, high: float) -> float:
+    """Return value, raising 400 if it lies outside low..high."""
+    if not low <= value <= high:
+        raise HTTPError(400, f"{name} must be between {low:g} and {high:g}: {value:g}")
+    return value
+
+
+@dataclass
+class Snapshot:
+    """One immutable, indexed version of the dataset."""
+    relais: list[dict]
+    index: GridIndex[dict]
+    last_update: Optional[str]
+    mtime_ns: int
+    size: int
+
+
+class RelaisStore:
+    """Holds the current dataset and swaps it when the file changes."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.snapshot: Optional[Snapshot] = None
+
+    def reload_if_changed(self) -> bool:
+        """Reload the file if its mtime or size changed. Returns True on reload."""
+        try:
+            stat = self.path.stat()
+        except OSError as e:
+            logger.warning(f"Cannot stat {self.path}: {e}")
+            return False
+
+        current = self.snapshot
+        if current and current.mtime_ns == stat.st_mtime_ns and current.size == stat.st_size:
+            return False
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            # Likely caught mid-write; keep serving the previous snapshot
+            logger.warning(f"Could not load {self.path}: {e}")
+            return False
+
+        relais = [r for r in data.get("relais", []) if r.get("koordinaten")]
+        index = GridIndex.build(
+            relais,
+            key=lambda r: (r["koordinaten"]["lat"], r["koordinaten"]["lng"]),
+        )
+        self.snapshot = Snapshot(
+            relais=relais,
+            index=index,
+            last_update=data.get("lastUpdate"),
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+        )
+        logger.info(f"Loaded {len(relais)} relays from {self.path}")
+        return True
+
+    async def watch(self, interval: float) -> None:
+        """Poll the data file for changes."""
+        while True:
+            await asyncio.sleep(interval)
+            self.reload_if_changed()
+
+    def current(self) -> Snapshot:
+        if self.snapshot is None:
+            raise HTTPError(503, "Dataset not loaded")
+        return self.snapshot
+
+
+def build_filter(request: Request):
+    """Build a record predicate from band/typ/status query parameters."""
+    bands = set(request.list_param("band"))
+    types = {t.upper() for t in request.list_param("typ")}
+    statuses = set(request.list_param("status"))
+
+    def matches(r: dict) -> bool:
+        if bands and r.get("band") not in bands:
+            return False
+        if types and r.get("typ", "").upper() not in types:
+            return False
+        if statuses and r.get("status") not in statuses:
+            return False
+        return True
+
+    return matches
+
+
+class QueryService:
+    """HTTP handlers on top of a RelaisStore."""
+
+    def __init__(self, store: RelaisStore):
+        self.store = store
+
+    async def nearest(self, request: Request) -> Response:
+        lat = check_range("lat", request.float_param("lat"), -90, 90)
+        lng = check_range("lng", request.float_param("lng"), -180, 180)
+        n = min(max(request.int_param("n", 10), 1), MAX_RESULTS)
+        max_km = request.float_param("max_km") if request.param("max_km") is not None else None
+        if max_km is not None and max_km < 0:
+            raise HTTPError(400, f"max_km must not be negative: {max_km}")
+
+        snapshot = self.store.current()
+        results = snapshot.index.nearest(
+            lat, lng, n,
+            predicate=build_filter(request),
+            max_km=max_km,
+        )
+
+        return json_response({
+            "lastUpdate": snapshot.last_update,
+            "count": len(results),
+            "relais": [
+                {**r, "distanceKm": round(dist, 3)} for dist, r in results
+            ],
+        })
+
+    async def bbox(self, request: Request) -> Response:
+        parts = request.list_param("bbox")
+        if len(parts) != 4:
+            raise HTTPError(400, "bbox must be west,south,east,north")
+        west, south, east, north = (parse_float("bbox", p) for p in parts)
+        for name, value, limit in (("west", west, 180), ("south", south, 90), ("east", east, 180), ("north", north, 90)):
+            check_range(name, value, -limit, limit)
+
+        snapshot = self.store.current()
+        matches = build_filter(request)
+        results = [
+            r for _, _, r in snapshot.index.query_bbox(south, west, north, east)
+            if matches(r)
+        ]
+        results.sort(key=lambda r: (r["rufzeichen"], r["typ"]))
+
+        return json_response({
+            "lastUpdate": snapshot.last_update,
+            "count": len(results),
+            "relais": results,
+        })
+
+    async def health(self, request: Request) -> Response:
+        snapshot = self.store.snapshot
+        return json_response({
+            "status": "ok" if snapshot else "loading",
+            "relais": len(snapshot.relais) if snapshot else 0,
+            "lastUpdate": snapshot.last_update if snapshot else None,
+            "checked": datetime.now(timezone.utc).isoformat(),
+        }, status=200 if snapshot else 503)
+
+
+async def run(data: Path, host: str, port: int, reload_interval: float) -> None:
+    store = RelaisStore(data)
+    store.reload_if_changed()
+
+    service = QueryService(store)
+    server = HTTPServer()
+    server.route("/nearest", service.nearest)
+    server.route("/bbox", service.bbox)
+    server.route("/health", service.health)
+
+    watcher = asyncio.create_task(store.watch(reload_interval))
+    try:
+        await server.serve(host, port)
+    finally:
+        watcher.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve nearest/bounding-box repeater queries over HTTP"
+    )
+    parser.add_argument(
+        "-d", "--data",
+        type=Path,
+        default=DEFAULT_DATA,
+        help=f"Relay JSON file (default: {DEFAULT_DATA})"
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Listen address (default: 127.0.0.1)"
+    )
+    parser.add_argument(
+        "-p", "--port",
+        type=int,
+        default=8081,
+        help="Listen port (default: 8081)"
+    )
+    parser.add_argument(
+        "--reload-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between checks for a changed data file (default: 5)"
+    )
+
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run(args.data, args.host, args.port, args.reload_interval))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
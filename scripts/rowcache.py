@@ -0,0 +1,83 @@
+"""
+Row Cache
+
+Parsed table rows of earlier runs, so a list page that changed by a row or
+two is not parsed from scratch. Rows are keyed by a hash of their cell
+texts, exactly as the parser gets them, and the parser version; a row whose
+key is known reuses its cached record (or its cached None, for header and
+junk rows), only new and changed rows go through the parser.
+
+The cache is kept as one pickle per source, with the rows of every page
+kind (DMR, D-STAR, ...) apart. When it is saved, the rows of the pages
+parsed in this run are replaced by the rows seen, so rows that left a page
+are dropped; pages that were not parsed, e.g. because their download
+failed, keep their rows for the next run.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def row_key(version: str, kind: str, texts: list[str]) -> str:
+    """Hash of a row's cell texts; any difference in them gives a different key."""
+    encoded = json.dumps([version, kind, texts], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class RowCache:
+    """Parsed records of one source's rows per page kind, keyed by row_key()."""
+
+    def __init__(self, path: Path, version: str):
+        self.path = path
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._rows = self._load()
+        self._seen: dict[str, dict[str, Any]] = {}
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        try:
+            with open(self.path, "rb") as f:
+                rows = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError) as e:
+            logger.debug(f"Starting empty row cache {self.path}: {e}")
+            return {}
+        if not isinstance(rows, dict) or not all(isinstance(v, dict) for v in rows.values()):
+            logger.debug(f"Starting empty row cache {self.path}: unknown format")
+            return {}
+        return rows
+
+    def parse(self, kind: str, texts: list[str], parse_row: Callable[[list[str]], Optional[Any]]) -> Optional[Any]:
+        """The cached record of a row, parsing it only if it is new or changed."""
+        key = row_key(self.version, kind, texts)
+        record = self._rows.get(kind, {}).get(key, _MISSING)
+        if record is _MISSING:
+            self.misses += 1
+            record = parse_row(texts)
+        else:
+            self.hits += 1
+        self._seen.setdefault(kind, {})[key] = record
+        return record
+
+    def save(self) -> None:
+        """Store the rows of the pages parsed since loading, keeping those of the others."""
+        logger.info(f"Row cache {self.path.name}: {self.hits} hits, {self.misses} misses")
+        rows = {**self._rows, **self._seen}
+        if all(self._rows.get(kind, {}).keys() == seen.keys() for kind, seen in self._seen.items()):
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{self.path.name}.", dir=self.path.parent)
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(rows, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_name, self.path)
+        self._rows = rows
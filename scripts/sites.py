@@ -0,0 +1,103 @@
+"""
+Repeater Sites
+
+Groups co-located repeaters into sites. Many sites carry several repeaters
+(FM, DMR, the D-STAR modules "OE8XKK B" and "OE8XKK C", C4FM), which would
+otherwise become overlapping markers with repeated popup data.
+
+Records belong to the same site when their base callsign matches (the
+callsign without module letter) and they lie within SITE_RADIUS_KM of the
+site's first record. Candidate sites are looked up in a hashed grid keyed
+by (base callsign, cell), so grouping is linear in the number of records.
+
+Every record gets the id of its site in "site"; the site table lists the
+members with a summary of their types and bands.
+"""
+
+import json
+import logging
+import math
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterable
+
+from spatial import KM_PER_DEGREE, haversine_km
+
+logger = logging.getLogger(__name__)
+
+SITES_NAME = "sites.json"
+SITE_RADIUS_KM = 0.5
+
+
+def base_callsign(rufzeichen: str) -> str:
+    """Callsign without D-STAR module letter ("OE8XKK B" -> "OE8XKK")."""
+    parts = rufzeichen.split()
+    return parts[0].upper() if parts else ""
+
+
+def assign_sites(relais: Iterable[dict], radius_km: float = SITE_RADIUS_KM) -> list[dict]:
+    """
+    Set "site" on every record and return the site table.
+
+    Sites are created in record order, so the ids ("oe8xkk", "oe8xkk-2" for
+    a second site of the same callsign) are stable as long as the records are.
+    """
+    cell_deg = radius_km / KM_PER_DEGREE
+    grid: dict[tuple[str, int, int], list[dict]] = {}
+    sites: list[dict] = []
+    per_callsign: dict[str, int] = {}
+
+    for r in relais:
+        base = base_callsign(r["rufzeichen"])
+        lat, lng = r["koordinaten"]["lat"], r["koordinaten"]["lng"]
+        row, col = math.floor(lat / cell_deg), math.floor(lng / cell_deg)
+        # Longitude cells are narrower than the radius away from the equator
+        col_span = math.ceil(1 / max(math.cos(math.radians(lat)), 0.01))
+
+        site = next(
+            (
+                s
+                for dr in (-1, 0, 1)
+                for dc in range(-col_span, col_span + 1)
+                for s in grid.get((base, row + dr, col + dc), ())
+                if haversine_km(lat, lng, s["koordinaten"]["lat"], s["koordinaten"]["lng"]) <= radius_km
+            ),
+            None,
+        )
+        if site is None:
+            per_callsign[base] = per_callsign.get(base, 0) + 1
+            number = per_callsign[base]
+            site = {
+                "id": base.lower() if number == 1 else f"{base.lower()}-{number}",
+                "rufzeichen": base,
+                "standort": r["standort"],
+                "koordinaten": r["koordinaten"],
+                "relais": [],
+                "typen": [],
+                "baender": [],
+            }
+            sites.append(site)
+            grid.setdefault((base, row, col), []).append(site)
+
+        site["relais"].append(r["id"])
+        if r["typ"] not in site["typen"]:
+            site["typen"].append(r["typ"])
+        if r["band"] not in site["baender"]:
+            site["baender"].append(r["band"])
+        r["site"] = site["id"]
+
+    shared = sum(1 for s in sites if len(s["relais"]) > 1)
+    logger.info(f"Sites: {len(sites)} sites, {shared} with several repeaters")
+    return sites
+
+
+def write_sites(sites: list[dict], path: Path) -> None:
+    """Write the site table as minified JSON."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"sites": sites}, f, ensure_ascii=False, separators=(",", ":"))
+    os.chmod(tmp_name, 0o644)
+    os.replace(tmp_name, path)
+    logger.info(f"Saved {len(sites)} sites to {path}")
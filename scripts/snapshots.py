@@ -0,0 +1,92 @@
+"""
+Source Snapshots
+
+Last known good parsed output of every source. When a source fails or is
+too slow, the updater merges its snapshot instead, so one broken website
+does not take its relays off the map until the next successful run.
+
+Each source has two files in the snapshot directory:
+- <source>.records: the parsed records of the last successful parse, a
+  copy of its record file (see recordfile.py)
+- <source>.json: when the source was last fetched and parsed successfully
+
+The records are only rewritten when the parsed output changed; the
+timestamp is refreshed on every successful run.
+"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from recordfile import RecordFile, read_records
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Snapshot:
+    source: str
+    fetched: str  # ISO timestamp of the last successful fetch
+    path: Path
+
+    def records(self) -> Iterator[Any]:
+        """Read the records one at a time."""
+        return read_records(self.path)
+
+
+class SnapshotStore:
+    """Directory with one records snapshot per source."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    def records_path(self, name: str) -> Path:
+        return self.directory / f"{name}.records"
+
+    def _meta_path(self, name: str) -> Path:
+        return self.directory / f"{name}.json"
+
+    def _replace(self, path: Path, data: bytes) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=self.directory)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+
+    def save(self, name: str, records: RecordFile) -> None:
+        """Store a copy of a source's parsed record file."""
+        path = self.records_path(name)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=self.directory)
+        with os.fdopen(fd, "wb") as dst, open(records.path, "rb") as src:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_name, path)
+
+    def mark_fresh(self, name: str, fetched: str) -> None:
+        """Record that the stored records are current as of fetched."""
+        self._replace(self._meta_path(name), json.dumps({"fetched": fetched}).encode("utf-8"))
+
+    def load(self, name: str) -> Optional[Snapshot]:
+        """
+        The last good snapshot of a source, or None if there is none.
+
+        The records are read lazily; records that cannot be read any more
+        (truncated, or pickled with a class that was renamed since) raise
+        RecordFileError while iterating, and the snapshot is not usable.
+        """
+        path = self.records_path(name)
+        try:
+            with open(self._meta_path(name), "r", encoding="utf-8") as f:
+                fetched = json.load(f)["fetched"]
+        except (OSError, KeyError, json.JSONDecodeError) as e:
+            logger.debug(f"No usable snapshot of {name}: {e}")
+            return None
+        if not path.exists():
+            logger.debug(f"No usable snapshot of {name}: {path} is missing")
+            return None
+        return Snapshot(name, fetched, path)
@@ -3,9 +3,108 @@ Relaisblick Data Sources
 
 This package contains scrapers and API clients for various
 Austrian amateur radio relay data sources.
+
+Sources are listed in SOURCES and imported lazily, so selecting a single
+source does not pull in the dependencies (e.g. lxml) of the others.
+Each source module provides two entry points:
+- fetch(timeout, profile) -> raw payload as byte stream(s), read lazily
+- parse(raw, profile, cache_dir) -> iterator of parsed relay records
+
+cache_dir is a directory where a source may keep state between runs to
+parse incrementally (OE8VIK keeps its parsed rows there); sources without
+such state ignore it. The region profile (see profiles.py) selects the
+country and which callsigns belong to it; it defaults to Austria.
 """
 
-from .oevsv import OevsvScraper
-from .oe8vik import OE8VIKScraper
+import importlib
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import Iterator, Optional
+
+from profiles import AT, RegionProfile
+
+
+@dataclass(frozen=True)
+class SourceSpec:
+    """Registry entry for one data source."""
+    name: str
+    priority: int  # Higher wins when two sources describe the same relay
+    module: str
+    description: str
+    fetch: str = "fetch"
+    parse: str = "parse"
+
+    def load(self) -> ModuleType:
+        """Import the source module on first use."""
+        return importlib.import_module(self.module, __name__)
+
+    def fetch_raw(self, timeout: int = 30, profile: RegionProfile = AT):
+        """Download the raw payload. Raises on network or HTTP errors."""
+        return getattr(self.load(), self.fetch)(timeout=timeout, profile=profile)
+
+    def parse_raw(self, raw, profile: RegionProfile = AT, cache_dir: Optional[Path] = None) -> Iterator:
+        """Parse a raw payload into relay records."""
+        return getattr(self.load(), self.parse)(raw, profile=profile, cache_dir=cache_dir)
+
+    def run(self, timeout: int = 30, profile: RegionProfile = AT) -> list:
+        """Fetch and parse in one go."""
+        return list(self.parse_raw(self.fetch_raw(timeout, profile), profile))
+
+
+SOURCES = {
+    spec.name: spec
+    for spec in (
+        SourceSpec(
+            name="oevsv",
+            priority=20,
+            module=".oevsv",
+            description="ÖVSV repeater API (primary source for FM)",
+        ),
+        SourceSpec(
+            name="oe8vik",
+            priority=30,
+            module=".oe8vik",
+            description="OE8VIK websites (DMR, D-STAR, C4FM)",
+        ),
+        SourceSpec(
+            name="repeaterbook",
+            priority=10,
+            module=".repeaterbook",
+            description="Repeaterbook API (international database)",
+        ),
+    )
+}
+
+DEFAULT_SOURCES = ("oevsv", "oe8vik")
+
+
+def get_sources(names) -> list[SourceSpec]:
+    """Resolve source names, in merge order (ascending priority)."""
+    unknown = [name for name in names if name not in SOURCES]
+    if unknown:
+        raise ValueError(
+            f"Unknown source(s): {', '.join(unknown)} "
+            f"(available: {', '.join(SOURCES)})"
+        )
+    specs = {SOURCES[name] for name in names}
+    return sorted(specs, key=lambda spec: spec.priority)
+
+
+_LAZY_EXPORTS = {
+    "OevsvScraper": ".oevsv",
+    "OE8VIKScraper": ".oe8vik",
+    "RepeaterbookClient": ".repeaterbook",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_EXPORTS:
+        return getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-__all__ = ['OevsvScraper', 'OE8VIKScraper']
+__all__ = [
+    'SourceSpec', 'SOURCES', 'DEFAULT_SOURCES', 'get_sources',
+    'OevsvScraper', 'OE8VIKScraper', 'RepeaterbookClient',
+]
@@ -5,18 +5,63 @@ Fetches DMR, D-STAR, and C4FM repeater data from OE8VIK's websites:
 - dmraustria.at
 - dstaraustria.at
 - c4fmaustria.at
+
+The pages change by a row or two per week, so with a cache directory the
+parsed rows are kept in a RowCache (see rowcache.py) and only new or
+changed rows are parsed again.
 """
 
 import re
 import logging
-from typing import Optional
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
 from dataclasses import dataclass
 
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree
+
+import httpclient
+import profiles
+import rowcache
+from buildgraph import file_fingerprint
+from jsonstream import CHUNK_SIZE
+from profiles import AT, RegionProfile
+from rowcache import RowCache
 
 logger = logging.getLogger(__name__)
 
+ROW_CACHE_NAME = "oe8vik-rows.pickle"
+
+
+def iter_table_rows(chunks: Iterable[bytes], encoding: str = "utf-8") -> Iterator[list[str]]:
+    """
+    Yield the cell texts of every table row in an HTML stream.
+
+    Rows are emitted as soon as their closing tag is parsed and then
+    removed from the tree, so memory use does not grow with page size.
+    Cell texts are stripped and joined like BeautifulSoup's
+    get_text(strip=True). The OE8VIK sites are all served as UTF-8.
+    """
+    parser = etree.HTMLPullParser(events=("end",), tag="tr", encoding=encoding)
+
+    def rows():
+        for _, row in parser.read_events():
+            yield [
+                "".join(text.strip() for text in cell.itertext())
+                for cell in row.iterchildren("td", "th")
+            ]
+            row.clear()
+            # Drop already processed siblings still attached to the table
+            while row.getprevious() is not None:
+                del row.getparent()[0]
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from rows()
+
+    parser.close()
+    yield from rows()
+
 
 @dataclass
 class DigitalRelaisInfo:
@@ -41,12 +86,22 @@ class OE8VIKScraper:
     DSTAR_URL = "https://dstaraustria.at/relaisliste/"
     C4FM_URL = "https://c4fmaustria.at/relaisliste-c4fm-oesterreich/"
 
-    def __init__(self, timeout: int = 30):
+    PAGES = {
+        "DMR": DMR_URL,
+        "D-STAR": DSTAR_URL,
+        "C4FM": C4FM_URL,
+    }
+
+    def __init__(
+        self,
+        timeout: int = 30,
+        profile: RegionProfile = AT,
+        row_cache: Optional[RowCache] = None,
+    ):
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "Relaisblick/1.0 (Amateur Radio Relay Map)",
-        })
+        self.profile = profile
+        self.row_cache = row_cache
+        self.session = httpclient.session()
 
     def fetch_all(self) -> list[DigitalRelaisInfo]:
         """Fetch all digital repeaters from all OE8VIK sites."""
@@ -67,70 +122,90 @@ class OE8VIKScraper:
         logger.info(f"Total from OE8VIK: {len(all_relais)} digital repeaters")
         return all_relais
 
-    def fetch_dmr(self) -> list[DigitalRelaisInfo]:
-        """Fetch DMR repeaters from dmraustria.at."""
-        logger.info("Fetching DMR data from dmraustria.at...")
-
+    def open_page(self, kind: str) -> Iterator[bytes]:
+        """Open one relay list page as a stream of byte chunks."""
+        url = self.PAGES[kind]
+        logger.info(f"Fetching {kind} data from {url}...")
+
+        response = self.session.get(url, timeout=self.timeout, stream=True)
+        response.raise_for_status()
+        return response.iter_content(chunk_size=CHUNK_SIZE)
+
+    def fetch_pages(self) -> dict[str, Iterator[bytes]]:
+        """
+        Open all relay list pages as byte streams.
+
+        Pages that fail are left out; raises if none could be opened.
+        """
+        pages = {}
+        errors = []
+
+        for kind in self.PAGES:
+            try:
+                pages[kind] = self.open_page(kind)
+            except requests.RequestException as e:
+                logger.error(f"Failed to fetch {kind} data: {e}")
+                errors.append(e)
+
+        if not pages and errors:
+            raise errors[0]
+        return pages
+
+    def iter_pages(self, pages: dict[str, Iterable[bytes]]) -> Iterator[DigitalRelaisInfo]:
+        """Parse page streams as returned by fetch_pages(), yielding relays."""
+        count = 0
+        for kind, chunks in pages.items():
+            for relais in self._parse_page(kind, chunks):
+                count += 1
+                yield relais
+
+        logger.info(f"Total from OE8VIK: {count} digital repeaters")
+        if self.row_cache:
+            self.row_cache.save()
+
+    def _fetch_kind(self, kind: str) -> list[DigitalRelaisInfo]:
         try:
-            response = self.session.get(self.DMR_URL, timeout=self.timeout)
-            response.raise_for_status()
+            return list(self._parse_page(kind, self.open_page(kind)))
         except requests.RequestException as e:
-            logger.error(f"Failed to fetch DMR data: {e}")
+            logger.error(f"Failed to fetch {kind} data: {e}")
             return []
 
-        return self._parse_dmr_page(response.text)
+    def fetch_dmr(self) -> list[DigitalRelaisInfo]:
+        """Fetch DMR repeaters from dmraustria.at."""
+        return self._fetch_kind("DMR")
 
     def fetch_dstar(self) -> list[DigitalRelaisInfo]:
         """Fetch D-STAR repeaters from dstaraustria.at."""
-        logger.info("Fetching D-STAR data from dstaraustria.at...")
-
-        try:
-            response = self.session.get(self.DSTAR_URL, timeout=self.timeout)
-            response.raise_for_status()
-        except requests.RequestException as e:
-            logger.error(f"Failed to fetch D-STAR data: {e}")
-            return []
-
-        return self._parse_dstar_page(response.text)
+        return self._fetch_kind("D-STAR")
 
     def fetch_c4fm(self) -> list[DigitalRelaisInfo]:
         """Fetch C4FM repeaters from c4fmaustria.at."""
-        logger.info("Fetching C4FM data from c4fmaustria.at...")
-
-        try:
-            response = self.session.get(self.C4FM_URL, timeout=self.timeout)
-            response.raise_for_status()
-        except requests.RequestException as e:
-            logger.error(f"Failed to fetch C4FM data: {e}")
-            return []
-
-        return self._parse_c4fm_page(response.text)
-
-    def _parse_dmr_page(self, html: str) -> list[DigitalRelaisInfo]:
-        """Parse DMR repeater page."""
-        soup = BeautifulSoup(html, "lxml")
-        relais_list = []
-
-        # Find table rows
-        tables = soup.find_all("table")
-        for table in tables:
-            rows = table.find_all("tr")
-            for row in rows:
-                cells = row.find_all(["td", "th"])
-                if len(cells) >= 3:
-                    relais = self._parse_dmr_row(cells)
-                    if relais:
-                        relais_list.append(relais)
-
-        logger.info(f"Parsed {len(relais_list)} DMR repeaters")
-        return relais_list
-
-    def _parse_dmr_row(self, cells) -> Optional[DigitalRelaisInfo]:
-        """Parse a DMR table row."""
+        return self._fetch_kind("C4FM")
+
+    def _parse_page(self, kind: str, chunks: Iterable[bytes]) -> Iterator[DigitalRelaisInfo]:
+        """Parse a relay list page row by row while it is being downloaded."""
+        parse_row = {
+            "DMR": self._parse_dmr_row,
+            "D-STAR": self._parse_dstar_row,
+            "C4FM": self._parse_c4fm_row,
+        }[kind]
+        count = 0
+
+        for texts in iter_table_rows(chunks):
+            if len(texts) >= 3:
+                if self.row_cache:
+                    relais = self.row_cache.parse(kind, texts, parse_row)
+                else:
+                    relais = parse_row(texts)
+                if relais:
+                    count += 1
+                    yield relais
+
+        logger.info(f"Parsed {count} {kind} repeaters")
+
+    def _parse_dmr_row(self, texts: list[str]) -> Optional[DigitalRelaisInfo]:
+        """Parse a DMR table row from its cell texts."""
         try:
-            # Extract text from cells
-            texts = [cell.get_text(strip=True) for cell in cells]
-
             # Look for callsign pattern
             callsign = None
             location = None
@@ -138,7 +213,7 @@ class OE8VIKScraper:
             network = None
 
             for i, text in enumerate(texts):
-                if re.match(r"OE\d[A-Z]{2,3}", text.upper()):
+                if self.profile.matches(text):
                     callsign = text.upper()
                     if i + 1 < len(texts):
                         location = texts[i + 1]
@@ -181,29 +256,9 @@ class OE8VIKScraper:
             logger.debug(f"Failed to parse DMR row: {e}")
             return None
 
-    def _parse_dstar_page(self, html: str) -> list[DigitalRelaisInfo]:
-        """Parse D-STAR repeater page."""
-        soup = BeautifulSoup(html, "lxml")
-        relais_list = []
-
-        tables = soup.find_all("table")
-        for table in tables:
-            rows = table.find_all("tr")
-            for row in rows:
-                cells = row.find_all(["td", "th"])
-                if len(cells) >= 3:
-                    relais = self._parse_dstar_row(cells)
-                    if relais:
-                        relais_list.append(relais)
-
-        logger.info(f"Parsed {len(relais_list)} D-STAR repeaters")
-        return relais_list
-
-    def _parse_dstar_row(self, cells) -> Optional[DigitalRelaisInfo]:
-        """Parse a D-STAR table row."""
+    def _parse_dstar_row(self, texts: list[str]) -> Optional[DigitalRelaisInfo]:
+        """Parse a D-STAR table row from its cell texts."""
         try:
-            texts = [cell.get_text(strip=True) for cell in cells]
-
             callsign = None
             location = None
             tx_freq = None
@@ -211,7 +266,7 @@ class OE8VIKScraper:
             reflector = None
 
             for i, text in enumerate(texts):
-                if re.match(r"OE\d[A-Z]{2,3}", text.upper()):
+                if self.profile.matches(text):
                     callsign = text.upper()
                     if i + 1 < len(texts):
                         location = texts[i + 1]
@@ -261,36 +316,16 @@ class OE8VIKScraper:
             logger.debug(f"Failed to parse D-STAR row: {e}")
             return None
 
-    def _parse_c4fm_page(self, html: str) -> list[DigitalRelaisInfo]:
-        """Parse C4FM repeater page."""
-        soup = BeautifulSoup(html, "lxml")
-        relais_list = []
-
-        tables = soup.find_all("table")
-        for table in tables:
-            rows = table.find_all("tr")
-            for row in rows:
-                cells = row.find_all(["td", "th"])
-                if len(cells) >= 3:
-                    relais = self._parse_c4fm_row(cells)
-                    if relais:
-                        relais_list.append(relais)
-
-        logger.info(f"Parsed {len(relais_list)} C4FM repeaters")
-        return relais_list
-
-    def _parse_c4fm_row(self, cells) -> Optional[DigitalRelaisInfo]:
-        """Parse a C4FM table row."""
+    def _parse_c4fm_row(self, texts: list[str]) -> Optional[DigitalRelaisInfo]:
+        """Parse a C4FM table row from its cell texts."""
         try:
-            texts = [cell.get_text(strip=True) for cell in cells]
-
             callsign = None
             location = None
             tx_freq = None
             network = None
 
             for i, text in enumerate(texts):
-                if re.match(r"OE\d[A-Z]{2,3}", text.upper()):
+                if self.profile.matches(text):
                     callsign = text.upper()
                     if i + 1 < len(texts):
                         location = texts[i + 1]
@@ -328,3 +363,22 @@ class OE8VIKScraper:
         except Exception as e:
             logger.debug(f"Failed to parse C4FM row: {e}")
             return None
+
+
+def fetch(timeout: int = 30, profile: RegionProfile = AT) -> dict[str, Iterator[bytes]]:
+    """Source registry entry point: open the raw list page streams."""
+    return OE8VIKScraper(timeout=timeout, profile=profile).fetch_pages()
+
+
+def parse(
+    raw: dict[str, Iterable[bytes]],
+    profile: RegionProfile = AT,
+    cache_dir: Optional[Path] = None,
+) -> Iterator[DigitalRelaisInfo]:
+    """Source registry entry point: parse the raw list page streams."""
+    row_cache = None
+    if cache_dir is not None:
+        # Rows parsed by an older parser or for another region are not reused
+        version = f"{profile.code}:{file_fingerprint(__file__, profiles.__file__, rowcache.__file__)}"
+        row_cache = RowCache(cache_dir / ROW_CACHE_NAME, version)
+    return OE8VIKScraper(profile=profile, row_cache=row_cache).iter_pages(raw)
@@ -5,11 +5,16 @@ Fetches relay data from the official ÖVSV repeater API.
 """
 
 import logging
-from typing import Optional
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
 from dataclasses import dataclass
 
 import requests
 
+import httpclient
+from jsonstream import CHUNK_SIZE, iter_array_items
+from profiles import AT, RegionProfile
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,7 +23,7 @@ class RelaisInfo:
     """Parsed relay information from ÖVSV API."""
     rufzeichen: str
     standort: str
-    bundesland: str
+    bundesland: Optional[str]  # As reported by the source
     lat: float
     lng: float
     typ: str
@@ -43,34 +48,32 @@ class OevsvScraper:
 
     API_URL = "https://repeater.oevsv.at/api/trx_list"
 
-    BUNDESLAND_MAP = {
-        "Wien": "Wien",
-        "Niederösterreich": "Niederösterreich",
-        "Oberösterreich": "Oberösterreich",
-        "Steiermark": "Steiermark",
-        "Kärnten": "Kärnten",
-        "Salzburg": "Salzburg",
-        "Tirol": "Tirol",
-        "Vorarlberg": "Vorarlberg",
-        "Burgenland": "Burgenland",
-    }
-
-    def __init__(self, timeout: int = 30):
+    def __init__(self, timeout: int = 30, profile: RegionProfile = AT):
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "Relaisblick/1.0 (Amateur Radio Relay Map)",
-            "Accept": "application/json",
-        })
+        self.profile = profile
+        self.session = httpclient.session()
 
-    def fetch_relais(self) -> list[RelaisInfo]:
-        """Fetch all relays from ÖVSV API."""
+    def fetch_raw(self) -> Iterator[bytes]:
+        """
+        Open the ÖVSV relay list as a stream of byte chunks.
+
+        Raises on network or HTTP errors; the body is read lazily.
+        """
         logger.info("Fetching relay data from ÖVSV API...")
 
+        response = self.session.get(
+            self.API_URL,
+            headers={"Accept": "application/json"},
+            timeout=self.timeout,
+            stream=True
+        )
+        response.raise_for_status()
+        return response.iter_content(chunk_size=CHUNK_SIZE)
+
+    def fetch_relais(self) -> list[RelaisInfo]:
+        """Fetch all relays from ÖVSV API."""
         try:
-            response = self.session.get(self.API_URL, timeout=self.timeout)
-            response.raise_for_status()
-            data = response.json()
+            return list(self.iter_relais(self.fetch_raw()))
         except requests.RequestException as e:
             logger.error(f"Failed to fetch ÖVSV data: {e}")
             return []
@@ -78,28 +81,26 @@ class OevsvScraper:
             logger.error(f"Failed to parse ÖVSV JSON: {e}")
             return []
 
-        return self._parse_response(data)
-
-    def _parse_response(self, data: list) -> list[RelaisInfo]:
-        """Parse API response into RelaisInfo objects."""
-        relais_list = []
+    def iter_relais(self, chunks: Iterable[bytes]) -> Iterator[RelaisInfo]:
+        """Decode the API response incrementally and yield parsed relays."""
+        count = 0
 
-        for item in data:
+        for item in iter_array_items(chunks):
             try:
                 relais = self._parse_item(item)
                 if relais:
-                    relais_list.append(relais)
+                    count += 1
+                    yield relais
             except Exception as e:
                 logger.warning(f"Failed to parse item {item.get('callsign', 'unknown')}: {e}")
 
-        logger.info(f"Parsed {len(relais_list)} relays from ÖVSV API")
-        return relais_list
+        logger.info(f"Parsed {count} relays from ÖVSV API")
 
     def _parse_item(self, item: dict) -> Optional[RelaisInfo]:
         """Parse a single API item into RelaisInfo."""
         # Get callsign
         callsign = item.get("callsign", "").upper()
-        if not callsign or not callsign.startswith("OE"):
+        if not callsign or not self.profile.matches(callsign):
             return None
 
         # Skip digipeaters and beacons for now (focus on voice repeaters)
@@ -129,9 +130,8 @@ class OevsvScraper:
         if city and city != standort:
             standort = f"{standort}, {city}"
 
-        # Get bundesland
-        bundesland = item.get("bl", "Wien")
-        bundesland = self.BUNDESLAND_MAP.get(bundesland, bundesland)
+        # Reported Bundesland as is; resolve_regions normalizes it after merging
+        bundesland = (item.get("bl") or "").strip() or None
 
         # Get coordinates
         lat = item.get("latitude")
@@ -274,3 +274,17 @@ class OevsvScraper:
 
         # Default to FM for voice repeaters
         return "FM"
+
+
+def fetch(timeout: int = 30, profile: RegionProfile = AT) -> Iterator[bytes]:
+    """Source registry entry point: open the raw API response stream."""
+    return OevsvScraper(timeout=timeout, profile=profile).fetch_raw()
+
+
+def parse(
+    raw: Iterable[bytes],
+    profile: RegionProfile = AT,
+    cache_dir: Optional[Path] = None,
+) -> Iterator[RelaisInfo]:
+    """Source registry entry point: parse a raw API response stream."""
+    return OevsvScraper(profile=profile).iter_relais(raw)
@@ -1,15 +1,21 @@
 """
 Repeaterbook API Client
 
-Fetches Austrian amateur radio relay data from the Repeaterbook API.
+Fetches amateur radio relay data of one region (country) from the
+Repeaterbook API.
 """
 
 import logging
-from typing import Optional
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
 from dataclasses import dataclass
 
 import requests
 
+import httpclient
+from jsonstream import CHUNK_SIZE, iter_array_items
+from profiles import AT, RegionProfile
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,7 +24,7 @@ class RepeaterInfo:
     """Parsed repeater information from Repeaterbook."""
     rufzeichen: str
     standort: str
-    bundesland: str
+    bundesland: Optional[str]  # As reported by the source
     lat: float
     lng: float
     typ: str
@@ -36,44 +42,38 @@ class RepeaterbookClient:
     """Client for Repeaterbook API."""
 
     API_URL = "https://www.repeaterbook.com/api/export.php"
-    COUNTRY_CODE = "at"  # Austria
-
-    BUNDESLAND_MAP = {
-        "Vienna": "Wien",
-        "Lower Austria": "Niederösterreich",
-        "Upper Austria": "Oberösterreich",
-        "Styria": "Steiermark",
-        "Carinthia": "Kärnten",
-        "Salzburg": "Salzburg",
-        "Tyrol": "Tirol",
-        "Vorarlberg": "Vorarlberg",
-        "Burgenland": "Burgenland",
-    }
-
-    def __init__(self, timeout: int = 30):
+
+    def __init__(self, timeout: int = 30, profile: RegionProfile = AT):
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "Relaisblick/1.0 (Amateur Radio Relay Map)"
-        })
+        self.profile = profile
+        self.session = httpclient.session()
 
-    def fetch_repeaters(self) -> list[RepeaterInfo]:
-        """Fetch all Austrian repeaters from Repeaterbook API."""
-        logger.info("Fetching repeater data from Repeaterbook...")
+    def fetch_raw(self) -> Iterator[bytes]:
+        """
+        Open the Repeaterbook export as a stream of byte chunks.
+
+        Raises on network or HTTP errors; the body is read lazily.
+        """
+        logger.info(f"Fetching {self.profile.name} repeater data from Repeaterbook...")
 
         params = {
-            "country": self.COUNTRY_CODE,
+            "country": self.profile.repeaterbook_country,
             "format": "json"
         }
 
+        response = self.session.get(
+            self.API_URL,
+            params=params,
+            timeout=self.timeout,
+            stream=True
+        )
+        response.raise_for_status()
+        return response.iter_content(chunk_size=CHUNK_SIZE)
+
+    def fetch_repeaters(self) -> list[RepeaterInfo]:
+        """Fetch all repeaters of the region from Repeaterbook API."""
         try:
-            response = self.session.get(
-                self.API_URL,
-                params=params,
-                timeout=self.timeout
-            )
-            response.raise_for_status()
-            data = response.json()
+            return list(self.iter_repeaters(self.fetch_raw()))
         except requests.RequestException as e:
             logger.error(f"Failed to fetch Repeaterbook data: {e}")
             return []
@@ -81,33 +81,28 @@ class RepeaterbookClient:
             logger.error(f"Failed to parse Repeaterbook JSON: {e}")
             return []
 
-        return self._parse_response(data)
+    def iter_repeaters(self, chunks: Iterable[bytes]) -> Iterator[RepeaterInfo]:
+        """Decode the "results" array incrementally and yield parsed repeaters."""
+        count = 0
 
-    def _parse_response(self, data: dict) -> list[RepeaterInfo]:
-        """Parse Repeaterbook API response."""
-        repeaters = []
-
-        results = data.get("results", [])
-        if not results:
-            logger.warning("No results in Repeaterbook response")
-            return []
-
-        for item in results:
+        for item in iter_array_items(chunks, key="results"):
             try:
                 repeater = self._parse_item(item)
                 if repeater:
-                    repeaters.append(repeater)
+                    count += 1
+                    yield repeater
             except Exception as e:
                 logger.warning(f"Failed to parse Repeaterbook item: {e}")
 
-        logger.info(f"Parsed {len(repeaters)} repeaters from Repeaterbook")
-        return repeaters
+        if not count:
+            logger.warning("No results in Repeaterbook response")
+        logger.info(f"Parsed {count} repeaters from Repeaterbook")
 
     def _parse_item(self, item: dict) -> Optional[RepeaterInfo]:
         """Parse a single Repeaterbook item."""
         # Get callsign
         callsign = item.get("Callsign", "").upper()
-        if not callsign or not callsign.startswith("OE"):
+        if not callsign or not self.profile.matches(callsign):
             return None
 
         # Get frequencies
@@ -124,15 +119,16 @@ class RepeaterbookClient:
 
         # Get location
         city = item.get("Nearest City", "Unbekannt")
-        state = item.get("State", "")
-        bundesland = self.BUNDESLAND_MAP.get(state, self._guess_bundesland(callsign))
+        # Reported state as is; resolve_regions normalizes it after merging
+        bundesland = (item.get("State") or "").strip() or None
 
         # Get coordinates
+        center_lat, center_lng = self.profile.center
         try:
-            lat = float(item.get("Lat", 47.5))
-            lng = float(item.get("Long", 13.5))
+            lat = float(item.get("Lat", center_lat))
+            lng = float(item.get("Long", center_lng))
         except (ValueError, TypeError):
-            lat, lng = 47.5, 13.5
+            lat, lng = center_lat, center_lng
 
         # Get CTCSS
         ctcss = None
@@ -177,24 +173,6 @@ class RepeaterbookClient:
             status=status,
         )
 
-    def _guess_bundesland(self, callsign: str) -> str:
-        """Guess bundesland from callsign prefix."""
-        if len(callsign) >= 3:
-            code = callsign[2]
-            code_map = {
-                "1": "Wien",
-                "2": "Salzburg",
-                "3": "Niederösterreich",
-                "4": "Burgenland",
-                "5": "Oberösterreich",
-                "6": "Steiermark",
-                "7": "Tirol",
-                "8": "Kärnten",
-                "9": "Vorarlberg",
-            }
-            return code_map.get(code, "Wien")
-        return "Wien"
-
     def _determine_band(self, freq_mhz: float) -> str:
         """Determine amateur band from frequency."""
         if 28 <= freq_mhz < 30:
@@ -233,3 +211,17 @@ class RepeaterbookClient:
             return "ATV"
 
         return "FM"
+
+
+def fetch(timeout: int = 30, profile: RegionProfile = AT) -> Iterator[bytes]:
+    """Source registry entry point: open the raw API response stream."""
+    return RepeaterbookClient(timeout=timeout, profile=profile).fetch_raw()
+
+
+def parse(
+    raw: Iterable[bytes],
+    profile: RegionProfile = AT,
+    cache_dir: Optional[Path] = None,
+) -> Iterator[RepeaterInfo]:
+    """Source registry entry point: parse a raw API response stream."""
+    return RepeaterbookClient(profile=profile).iter_repeaters(raw)
@@ -0,0 +1,268 @@
+"""
+Spatial Helpers
+
+Small in-memory spatial index for relay coordinates. Points are bucketed
+into a fixed lat/lng grid so bounding-box and nearest-neighbour lookups only
+touch the cells around the query instead of scanning every record.
+
+BBoxIndex does the same for areas (e.g. boundary polygons): every area is
+listed in each cell its bounding box overlaps, so a point lookup only has
+to test the few areas registered in its cell.
+
+simplify() thins polylines and rings with Douglas-Peucker.
+"""
+
+import heapq
+import math
+from typing import Callable, Generic, Iterable, Iterator, Optional, TypeVar
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+T = TypeVar("T")
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two points in kilometres."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lng2 - lng1)
+
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GridIndex(Generic[T]):
+    """Uniform grid index over (lat, lng) points."""
+
+    def __init__(self, cell_size: float = 0.1):
+        self.cell_size = cell_size
+        self._cells: dict[tuple[int, int], list[tuple[float, float, T]]] = {}
+        self._size = 0
+
+    @classmethod
+    def build(
+        cls,
+        items: Iterable[T],
+        key: Callable[[T], tuple[float, float]],
+        cell_size: float = 0.1,
+    ) -> "GridIndex[T]":
+        """Build an index from items, using key() to get (lat, lng)."""
+        index = cls(cell_size)
+        for item in items:
+            lat, lng = key(item)
+            index.insert(lat, lng, item)
+        return index
+
+    def __len__(self) -> int:
+        return self._size
+
+    def cell_of(self, lat: float, lng: float) -> tuple[int, int]:
+        """Return the grid cell containing a point."""
+        return (math.floor(lat / self.cell_size), math.floor(lng / self.cell_size))
+
+    def insert(self, lat: float, lng: float, item: T) -> None:
+        """Add a point to the index."""
+        self._cells.setdefault(self.cell_of(lat, lng), []).append((lat, lng, item))
+        self._size += 1
+
+    def cell_items(self, cell: tuple[int, int]) -> list[tuple[float, float, T]]:
+        """Return the (lat, lng, item) entries stored in one cell."""
+        return self._cells.get(cell, [])
+
+    def query_bbox(
+        self,
+        south: float,
+        west: float,
+        north: float,
+        east: float,
+    ) -> Iterator[tuple[float, float, T]]:
+        """Yield (lat, lng, item) for all points inside the bounding box."""
+        min_row, min_col = self.cell_of(south, west)
+        max_row, max_col = self.cell_of(north, east)
+
+        # Sparse grids: walking the occupied cells is cheaper than the range
+        if (max_row - min_row + 1) * (max_col - min_col + 1) > len(self._cells):
+            cells = [
+                c for c in self._cells
+                if min_row <= c[0] <= max_row and min_col <= c[1] <= max_col
+            ]
+        else:
+            cells = [
+                (row, col)
+                for row in range(min_row, max_row + 1)
+                for col in range(min_col, max_col + 1)
+            ]
+
+        for cell in cells:
+            for lat, lng, item in self._cells.get(cell, ()):
+                if south <= lat <= north and west <= lng <= east:
+                    yield lat, lng, item
+
+    def nearest(
+        self,
+        lat: float,
+        lng: float,
+        n: int = 10,
+        predicate: Optional[Callable[[T], bool]] = None,
+        max_km: Optional[float] = None,
+    ) -> list[tuple[float, T]]:
+        """
+        Return up to n (distance_km, item) pairs closest to a point.
+
+        Cells are visited in growing square rings around the query cell;
+        the search stops once no unvisited ring can hold a closer point.
+        """
+        if n <= 0 or not self._cells:
+            return []
+
+        row0, col0 = self.cell_of(lat, lng)
+        rows = [c[0] for c in self._cells]
+        cols = [c[1] for c in self._cells]
+        max_ring = max(
+            abs(row0 - min(rows)), abs(row0 - max(rows)),
+            abs(col0 - min(cols)), abs(col0 - max(cols)),
+        )
+
+        # Lower bound on the distance covered by one ring of cells. Longitude
+        # cells shrink towards the poles, so use the narrowest latitude seen.
+        widest_lat = max(abs(lat), *(abs(r * self.cell_size) for r in (min(rows), max(rows) + 1)))
+        ring_km = self.cell_size * KM_PER_DEGREE * max(math.cos(math.radians(min(widest_lat, 89.9))), 0.01)
+
+        best: list[tuple[float, int, T]] = []  # max-heap via negated distance
+        counter = 0
+
+        for ring in range(max_ring + 1):
+            if ring > 0:
+                bound = (ring - 1) * ring_km
+                if max_km is not None and bound > max_km:
+                    break
+                if len(best) >= n and bound > -best[0][0]:
+                    break
+
+            for cell in _ring_cells(row0, col0, ring):
+                for plat, plng, item in self._cells.get(cell, ()):
+                    if predicate is not None and not predicate(item):
+                        continue
+                    dist = haversine_km(lat, lng, plat, plng)
+                    if max_km is not None and dist > max_km:
+                        continue
+                    counter += 1
+                    if len(best) < n:
+                        heapq.heappush(best, (-dist, counter, item))
+                    elif dist < -best[0][0]:
+                        heapq.heapreplace(best, (-dist, counter, item))
+
+        return [(-d, item) for d, _, item in sorted(best, key=lambda e: (-e[0], e[1]))]
+
+
+def _ring_cells(row: int, col: int, ring: int) -> Iterator[tuple[int, int]]:
+    """Yield the cells on the square ring at Chebyshev distance `ring`."""
+    if ring == 0:
+        yield (row, col)
+        return
+
+    for c in range(col - ring, col + ring + 1):
+        yield (row - ring, c)
+        yield (row + ring, c)
+    for r in range(row - ring + 1, row + ring):
+        yield (r, col - ring)
+        yield (r, col + ring)
+
+
+def point_in_ring(lat: float, lng: float, ring: list[list[float]]) -> bool:
+    """Ray casting test against a GeoJSON ring of [lng, lat] positions."""
+    inside = False
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        xi, yi = ring[i][0], ring[i][1]
+        xj, yj = ring[j][0], ring[j][1]
+        if (yi > lat) != (yj > lat) and lng < (xj - xi) * (lat - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+def point_in_polygon(lat: float, lng: float, polygon: list[list[list[float]]]) -> bool:
+    """Test a point against a GeoJSON polygon (outer ring, then holes)."""
+    if not polygon or not point_in_ring(lat, lng, polygon[0]):
+        return False
+    return not any(point_in_ring(lat, lng, hole) for hole in polygon[1:])
+
+
+def ring_bbox(ring: list[list[float]]) -> tuple[float, float, float, float]:
+    """(south, west, north, east) of a GeoJSON ring."""
+    lngs = [p[0] for p in ring]
+    lats = [p[1] for p in ring]
+    return min(lats), min(lngs), max(lats), max(lngs)
+
+
+class BBoxIndex(Generic[T]):
+    """Uniform grid index over bounding boxes, for point-in-area lookups."""
+
+    def __init__(self, cell_size: float = 0.1):
+        self.cell_size = cell_size
+        self._cells: dict[tuple[int, int], list[tuple[float, float, float, float, T]]] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def cell_of(self, lat: float, lng: float) -> tuple[int, int]:
+        return (math.floor(lat / self.cell_size), math.floor(lng / self.cell_size))
+
+    def insert(self, south: float, west: float, north: float, east: float, item: T) -> None:
+        """Register an item in every cell its bounding box overlaps."""
+        min_row, min_col = self.cell_of(south, west)
+        max_row, max_col = self.cell_of(north, east)
+        entry = (south, west, north, east, item)
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                self._cells.setdefault((row, col), []).append(entry)
+        self._size += 1
+
+    def candidates(self, lat: float, lng: float) -> Iterator[T]:
+        """Yield the items whose bounding box contains the point."""
+        for south, west, north, east, item in self._cells.get(self.cell_of(lat, lng), ()):
+            if south <= lat <= north and west <= lng <= east:
+                yield item
+
+
+def simplify(points: list[tuple[float, float]], tolerance: float) -> list[tuple[float, float]]:
+    """
+    Douglas-Peucker simplification of a polyline in planar coordinates.
+
+    Keeps the end points and every point further than tolerance from the
+    simplified line. Closed rings should repeat their first point at the end.
+    """
+    if len(points) < 3:
+        return list(points)
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+
+    while stack:
+        first, last = stack.pop()
+        (x1, y1), (x2, y2) = points[first], points[last]
+        dx, dy = x2 - x1, y2 - y1
+        length_sq = dx * dx + dy * dy
+
+        max_dist_sq, index = 0.0, 0
+        for i in range(first + 1, last):
+            px, py = points[i]
+            if length_sq == 0:
+                dist_sq = (px - x1) ** 2 + (py - y1) ** 2
+            else:
+                t = max(0.0, min(1.0, ((px - x1) * dx + (py - y1) * dy) / length_sq))
+                dist_sq = (px - x1 - t * dx) ** 2 + (py - y1 - t * dy) ** 2
+            if dist_sq > max_dist_sq:
+                max_dist_sq, index = dist_sq, i
+
+        if max_dist_sq > tolerance * tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+
+    return [p for p, kept in zip(points, keep) if kept]
@@ -0,0 +1,159 @@
+"""
+SQLite Export
+
+Writes the merged relay records to a self-contained SQLite database for
+downstream tools:
+- relais: one row per relay with B-tree indexes on callsign, band, type,
+  Bundesland and status
+- relais_fts: FTS5 full-text index over location, QTH and operator
+- relais_rtree: R*Tree over coordinates for bounding-box queries
+- meta: lastUpdate, version and source counts
+
+The database is built in a temporary file with a single bulk transaction
+and moved into place atomically, so readers can open it read-only, e.g.
+    sqlite3.connect("file:relais.sqlite?mode=ro&immutable=1", uri=True)
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+
+# (column, record key, SQL type)
+COLUMNS = [
+    ("id", "id", "TEXT NOT NULL UNIQUE"),
+    ("rufzeichen", "rufzeichen", "TEXT NOT NULL"),
+    ("standort", "standort", "TEXT"),
+    ("bundesland", "bundesland", "TEXT"),
+    ("lat", None, "REAL"),
+    ("lng", None, "REAL"),
+    ("typ", "typ", "TEXT"),
+    ("band", "band", "TEXT"),
+    ("tx_frequenz", "txFrequenz", "REAL"),
+    ("rx_frequenz", "rxFrequenz", "REAL"),
+    ("shift", "shift", "REAL"),
+    ("ctcss", "ctcss", "REAL"),
+    ("dcs_code", "dcsCode", "TEXT"),
+    ("echolink", "echolink", "INTEGER"),
+    ("dmr_id", "dmrId", "INTEGER"),
+    ("color_code", "colorCode", "INTEGER"),
+    ("timeslots", "timeslots", "TEXT"),
+    ("dstar_module", "dstarModule", "TEXT"),
+    ("network", "network", "TEXT"),
+    ("reflector", "reflector", "TEXT"),
+    ("betreiber", "betreiber", "TEXT"),
+    ("qth", "qth", "TEXT"),
+    ("seehoehe", "seehöhe", "INTEGER"),
+    ("status", "status", "TEXT"),
+    ("bemerkung", "bemerkung", "TEXT"),
+    ("last_update", "lastUpdate", "TEXT"),
+    ("extra", None, "TEXT"),  # JSON of any fields without a column
+]
+
+INDEXED_COLUMNS = ["rufzeichen", "band", "typ", "bundesland", "status"]
+FTS_COLUMNS = ["standort", "qth", "betreiber"]
+
+KNOWN_KEYS = {key for _, key, _ in COLUMNS if key} | {"koordinaten"}
+
+
+def _row(rowid: int, relais: dict) -> tuple:
+    coords = relais.get("koordinaten") or {}
+    extra = {k: v for k, v in relais.items() if k not in KNOWN_KEYS}
+    values = [rowid]
+    for column, key, _ in COLUMNS:
+        if column == "lat":
+            values.append(coords.get("lat"))
+        elif column == "lng":
+            values.append(coords.get("lng"))
+        elif column == "extra":
+            values.append(json.dumps(extra, ensure_ascii=False) if extra else None)
+        else:
+            values.append(relais.get(key))
+    return tuple(values)
+
+
+def _has_module(conn: sqlite3.Connection, module: str) -> bool:
+    """Check whether this SQLite build ships a virtual table module."""
+    try:
+        conn.execute(f"CREATE VIRTUAL TABLE temp.probe_{module} USING {module}(a, b, c)")
+        conn.execute(f"DROP TABLE temp.probe_{module}")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def write_sqlite(relais: Iterable[dict], path: Path, meta: dict | None = None) -> None:
+    """Build the SQLite database for the given records at path."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    os.close(fd)
+
+    conn = sqlite3.connect(tmp_name)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+
+        column_defs = ",\n    ".join(f"{name} {sql_type}" for name, _, sql_type in COLUMNS)
+        conn.execute(f"CREATE TABLE relais (\n    rowid INTEGER PRIMARY KEY,\n    {column_defs}\n)")
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        has_fts = _has_module(conn, "fts5")
+        has_rtree = _has_module(conn, "rtree")
+        if has_fts:
+            conn.execute(
+                f"CREATE VIRTUAL TABLE relais_fts USING fts5("
+                f"{', '.join(FTS_COLUMNS)}, content='relais', content_rowid='rowid')"
+            )
+        else:
+            logger.warning("SQLite has no FTS5 support, skipping relais_fts")
+        if has_rtree:
+            conn.execute(
+                "CREATE VIRTUAL TABLE relais_rtree USING rtree("
+                "id, min_lat, max_lat, min_lng, max_lng)"
+            )
+        else:
+            logger.warning("SQLite has no R*Tree support, skipping relais_rtree")
+
+        placeholders = ", ".join("?" * (len(COLUMNS) + 1))
+        count = 0
+        with conn:
+            rows = (_row(rowid, r) for rowid, r in enumerate(relais, start=1))
+            conn.executemany(f"INSERT INTO relais VALUES ({placeholders})", rows)
+            count = conn.execute("SELECT COUNT(*) FROM relais").fetchone()[0]
+
+            if has_rtree:
+                conn.execute(
+                    "INSERT INTO relais_rtree "
+                    "SELECT rowid, lat, lat, lng, lng FROM relais WHERE lat IS NOT NULL"
+                )
+            if has_fts:
+                conn.execute("INSERT INTO relais_fts(relais_fts) VALUES ('rebuild')")
+
+            # Indexes are cheaper to build once after the bulk insert
+            for column in INDEXED_COLUMNS:
+                conn.execute(f"CREATE INDEX relais_{column} ON relais({column})")
+
+            conn.executemany(
+                "INSERT INTO meta VALUES (?, ?)",
+                [
+                    (key, value if isinstance(value, str) else json.dumps(value, ensure_ascii=False))
+                    for key, value in (meta or {}).items()
+                ],
+            )
+
+        conn.execute("ANALYZE")
+        conn.execute("VACUUM")
+    except BaseException:
+        conn.close()
+        os.unlink(tmp_name)
+        raise
+
+    conn.close()
+    os.chmod(tmp_name, 0o644)
+    os.replace(tmp_name, path)
+    logger.info(f"Saved {count} relays to {path}")
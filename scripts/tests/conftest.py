@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The scripts are flat modules imported top-level, as when run from scripts/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
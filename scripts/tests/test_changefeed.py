@@ -0,0 +1,60 @@
+import asyncio
+import json
+
+from changefeed import ChangeFeed, ChangeFeedService, diff_records
+
+
+def write_index(path, last_update, relais):
+    path.write_text(json.dumps({"lastUpdate": last_update, "relais": relais}), encoding="utf-8")
+
+
+def relay(relay_id, status="aktiv"):
+    return {"id": relay_id, "rufzeichen": relay_id.upper(), "status": status}
+
+
+def test_diff_records():
+    old = {"a": relay("a"), "b": relay("b")}
+    new = {"a": relay("a", "defekt"), "c": relay("c")}
+    assert diff_records(old, new) == ([relay("c")], [relay("a", "defekt")], ["b"])
+
+
+def test_client_without_version_receives_new_changes(tmp_path):
+    path = tmp_path / "relais-index.json"
+
+    async def scenario():
+        write_index(path, "v1", [relay("a")])
+        feed = ChangeFeed(path, buffer_size=4)
+        await feed.reload_if_changed()
+        stream = ChangeFeedService(feed)._stream(None)
+        assert (await anext(stream)).startswith(b"retry:")
+
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        write_index(path, "v2", [relay("a", "defekt")])
+        assert await feed.reload_if_changed()
+        event = await asyncio.wait_for(pending, 1)
+        await stream.aclose()
+        return event
+
+    event = asyncio.run(scenario())
+    assert b"id: v2\nevent: changes\n" in event
+
+
+def test_ids_stay_unique_when_buffer_is_full(tmp_path):
+    path = tmp_path / "relais-index.json"
+
+    async def scenario():
+        write_index(path, "v1", [relay("a")])
+        feed = ChangeFeed(path, buffer_size=2)
+        await feed.reload_if_changed()
+        ids = []
+        # Rewrites with the same lastUpdate get ids of their own
+        for n in range(5):
+            write_index(path, "v1", [relay("a", f"status-{n}")])
+            assert await feed.reload_if_changed()
+            ids.append(feed.current_id)
+        return feed, ids
+
+    feed, ids = asyncio.run(scenario())
+    assert len(set(ids)) == len(ids)
+    assert [c.id for c in feed.since(ids[2])] == [ids[3], ids[4]]
@@ -0,0 +1,39 @@
+import json
+import os
+
+from detail_chunks import DETAILS_DIR, INDEX_NAME, detail_bucket, write_index_and_details
+
+
+def relay(relay_id, **fields):
+    return {"id": relay_id, "rufzeichen": relay_id.upper(), "typ": "FM", "band": "2m", **fields}
+
+
+def test_index_and_details_split_fields(tmp_path):
+    relais = [relay("oe1xaa", ctcss=88.5), relay("oe2xbb", betreiber="ADL 201")]
+    assert write_index_and_details(relais, tmp_path, {"lastUpdate": "v1"}, chunk_count=4) == 2
+
+    index = json.loads((tmp_path / INDEX_NAME).read_text(encoding="utf-8"))
+    assert index["detailChunks"] == 4
+    assert [r["id"] for r in index["relais"]] == ["oe1xaa", "oe2xbb"]
+    assert "ctcss" not in index["relais"][0]
+
+    chunk = tmp_path / DETAILS_DIR / f"{detail_bucket('oe1xaa', 4)}.json"
+    assert json.loads(chunk.read_text(encoding="utf-8"))["oe1xaa"] == {"ctcss": 88.5}
+
+
+def test_index_is_published_after_the_chunks(tmp_path, monkeypatch):
+    published = []
+    replace = os.replace
+
+    def recording_replace(src, dst):
+        published.append(os.path.basename(dst))
+        replace(src, dst)
+
+    monkeypatch.setattr(os, "replace", recording_replace)
+    relais = [relay(f"oe{n}xaa") for n in range(1, 10)]
+    write_index_and_details(relais, tmp_path, {"lastUpdate": "v1"}, chunk_count=4)
+
+    assert published[-1] == INDEX_NAME
+    assert published.count(INDEX_NAME) == 1
+    assert len(published) > 1
+    assert not list(tmp_path.glob(".*"))
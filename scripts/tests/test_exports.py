@@ -0,0 +1,26 @@
+from exports import write_exports
+from profiles import PROFILES
+
+
+def relay(rufzeichen, **fields):
+    return {
+        "id": rufzeichen.lower(), "rufzeichen": rufzeichen, "standort": "Berg", "typ": "FM", "band": "2m",
+        "txFrequenz": 145.6, "rxFrequenz": 145.0, "shift": -600, "status": "aktiv",
+        "koordinaten": {"lat": 48.0, "lng": 11.5}, **fields,
+    }
+
+
+def test_all_relays_export_is_titled_with_the_region(tmp_path):
+    write_exports([relay("DB0ABC", bundesland="Bayern")], tmp_path, profile=PROFILES["dl"])
+
+    kml = (tmp_path / "kml" / "alle.kml").read_text(encoding="utf-8")
+    assert "Relais Deutschland" in kml and "Österreich" not in kml
+    assert "Relais Bayern" in (tmp_path / "gpx" / "bundesland-bayern.gpx").read_text(encoding="utf-8")
+
+
+def test_unchanged_exports_are_not_rewritten(tmp_path):
+    write_exports([relay("OE1XAA")], tmp_path)
+    stats = write_exports([relay("OE1XAA")], tmp_path)
+
+    # alle, band-2m and typ-fm in three formats
+    assert stats == {"written": 0, "unchanged": 9, "removed": 0}
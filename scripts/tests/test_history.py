@@ -0,0 +1,58 @@
+import pytest
+
+from history import HistoryStore
+
+
+def relay(relay_id, **fields):
+    return {"id": relay_id, "rufzeichen": relay_id.upper(), "typ": "FM", **fields}
+
+
+@pytest.fixture
+def store(tmp_path):
+    with HistoryStore(tmp_path / "history.sqlite") as store:
+        yield store
+
+
+def test_append_records_changes(store):
+    store.append([relay("oe1xaa", status="aktiv"), relay("oe2xbb")], "2026-01-04T03:00:00+00:00")
+    stats = store.append([relay("oe1xaa", status="defekt"), relay("oe3xcc")], "2026-01-11T03:00:00+00:00")
+
+    assert stats["added"] == 1
+    assert stats["changed"] == 1
+    assert stats["removed"] == 1
+    assert [r["id"] for r in store.state_at("2026-01-04")] == ["oe1xaa", "oe2xbb"]
+
+
+def test_rerun_of_latest_run_is_a_no_op(store):
+    store.append([relay("oe1xaa", status="aktiv")], "2026-01-04T03:00:00+00:00")
+    relais = [relay("oe1xaa", status="defekt"), relay("oe3xcc")]
+    first = store.append(relais, "2026-01-11T03:00:00+00:00")
+
+    again = store.append(relais, "2026-01-11T03:00:00+00:00")
+
+    assert again == first
+    assert store.conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0] == 2
+
+
+def test_rerun_of_latest_run_with_other_data_is_recorded(store):
+    store.append([relay("oe1xaa", status="aktiv"), relay("oe2xbb")], "2026-01-04T03:00:00+00:00")
+    store.append([relay("oe1xaa", status="aktiv"), relay("oe2xbb")], "2026-01-11T03:00:00+00:00")
+
+    # Same lastUpdate, but e.g. the regions step ran again with new boundaries
+    stats = store.append(
+        [relay("oe1xaa", status="aktiv", bundesland="Wien"), relay("oe3xcc")],
+        "2026-01-11T03:00:00+00:00",
+    )
+
+    assert stats == {"added": 1, "changed": 1, "removed": 1, "values": 5}
+    assert store.conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0] == 2
+    assert store.state_at("2026-01-11") == [
+        relay("oe1xaa", status="aktiv", bundesland="Wien"), relay("oe3xcc"),
+    ]
+    assert [r["id"] for r in store.state_at("2026-01-04")] == ["oe1xaa", "oe2xbb"]
+
+
+def test_older_run_is_rejected(store):
+    store.append([relay("oe1xaa")], "2026-01-11T03:00:00+00:00")
+    with pytest.raises(ValueError):
+        store.append([relay("oe1xaa")], "2026-01-04T03:00:00+00:00")
@@ -0,0 +1,26 @@
+import json
+
+from regions import resolve_regions
+from sources.oevsv import OevsvScraper
+from update_relais import _oevsv_record
+
+
+def item(callsign, bl):
+    return {
+        "callsign": callsign, "type_of_station": "repeater_voice", "frequency_tx": "438.950",
+        "frequency_rx": "431.350", "site_name": "Jauerling", "latitude": 48.33, "longitude": 15.34, "bl": bl,
+    }
+
+
+def parse(*items):
+    return list(OevsvScraper().iter_relais([json.dumps(list(items)).encode("utf-8")]))
+
+
+def test_reported_bundesland_is_normalized_after_merging():
+    # OE0 has no Bundesland of its own, so an unknown spelling is all there is
+    relais = [_oevsv_record(r, "2026-01-04") for r in parse(item("OE3XAA", "niederoesterreich"), item("OE0XBB", "Wien-Umgebung"))]
+    assert [r["bundesland"] for r in relais] == ["niederoesterreich", "Wien-Umgebung"]
+
+    resolve_regions(relais, None)
+
+    assert [r["bundesland"] for r in relais] == ["Niederösterreich", "Wien-Umgebung"]
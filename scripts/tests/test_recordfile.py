@@ -0,0 +1,33 @@
+import pytest
+
+from recordfile import RecordFileError, read_records, write_records
+
+
+def test_records_are_read_back_in_order(tmp_path):
+    records = write_records(tmp_path / "oevsv.records", ({"n": n} for n in range(1000)))
+
+    assert records.count == 1000
+    assert list(records) == [{"n": n} for n in range(1000)]
+
+
+def test_truncated_file_is_an_error(tmp_path):
+    path = tmp_path / "oevsv.records"
+    write_records(path, ({"n": n} for n in range(10)))
+    path.write_bytes(path.read_bytes()[:-20])
+
+    with pytest.raises(RecordFileError):
+        list(read_records(path))
+
+
+def test_failed_parse_keeps_the_previous_file(tmp_path):
+    path = tmp_path / "oevsv.records"
+    write_records(path, [{"n": 1}])
+
+    def broken():
+        yield {"n": 2}
+        raise ValueError("page changed")
+
+    with pytest.raises(ValueError):
+        write_records(path, broken())
+    assert list(read_records(path)) == [{"n": 1}]
+    assert [p.name for p in tmp_path.iterdir()] == ["oevsv.records"]
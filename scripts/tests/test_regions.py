@@ -0,0 +1,65 @@
+import json
+
+from regions import GEMEINDEN_FILE, STATES_FILE, BoundaryIndex, resolve_regions
+
+
+def square(west, south, east, north):
+    return {"type": "Polygon", "coordinates": [[[west, south], [east, south], [east, north], [west, north], [west, south]]]}
+
+
+def write_geojson(path, features):
+    path.write_text(json.dumps({
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "properties": {"name": name, "iso": iso}, "geometry": geometry}
+            for name, iso, geometry in features
+        ],
+    }), encoding="utf-8")
+
+
+def relay(rufzeichen, lat, lng, **fields):
+    return {"id": rufzeichen.lower(), "rufzeichen": rufzeichen, "koordinaten": {"lat": lat, "lng": lng}, **fields}
+
+
+def test_resolves_from_polygons(tmp_path):
+    write_geojson(tmp_path / STATES_FILE, [("Wien", "9", square(16.2, 48.1, 16.6, 48.4))])
+    write_geojson(tmp_path / GEMEINDEN_FILE, [("Wien Innere Stadt", "90101", square(16.35, 48.19, 16.39, 48.22))])
+    relais = [
+        relay("OE1XAA", 48.21, 16.37),
+        relay("OE1XBB", 48.30, 16.30, bundesland="Niederösterreich"),
+        relay("OE3XCC", 47.00, 15.00),
+    ]
+
+    counts = resolve_regions(relais, BoundaryIndex.load(tmp_path))
+
+    assert (relais[0]["bundesland"], relais[0]["gemeinde"]) == ("Wien", "Wien Innere Stadt")
+    assert relais[1]["bundesland"] == "Wien"
+    assert relais[2]["ausserhalbAT"] is True
+    assert relais[2]["bundesland"] == "Niederösterreich"  # From the callsign
+    assert counts["gemeinde"] == 1 and counts["bundesland"] == 1 and counts["ausserhalb"] == 1
+
+
+def test_estimated_coordinates_skip_the_polygons(tmp_path):
+    write_geojson(tmp_path / STATES_FILE, [("Wien", "9", square(16.2, 48.1, 16.6, 48.4))])
+    write_geojson(tmp_path / GEMEINDEN_FILE, [("Wien Innere Stadt", "90101", square(16.35, 48.19, 16.39, 48.22))])
+    relais = [relay("OE1XAA", 48.21, 16.37, koordinatenGeschaetzt=True)]
+
+    counts = resolve_regions(relais, BoundaryIndex.load(tmp_path))
+
+    assert relais[0]["bundesland"] == "Wien"
+    assert "gemeinde" not in relais[0] and "ausserhalbAT" not in relais[0]
+    assert counts["rufzeichen"] == 1
+
+
+def test_unknown_source_spelling_is_kept():
+    relais = [
+        relay("OE3XAA", 48.2, 15.6, bundesland="niederoesterreich"),
+        relay("9A0XBB", 45.8, 16.0, bundesland="Zagrebačka"),
+        relay("9A0XCC", 45.8, 16.0),
+    ]
+
+    resolve_regions(relais, None)
+
+    assert relais[0]["bundesland"] == "Niederösterreich"
+    assert relais[1]["bundesland"] == "Zagrebačka"
+    assert "bundesland" not in relais[2]
@@ -0,0 +1,88 @@
+import asyncio
+import json
+
+import pytest
+
+from httpserver import HTTPError, HTTPServer, Request, _read_request
+from relais_server import QueryService, RelaisStore
+
+
+def request(path="/nearest", **query):
+    return Request(method="GET", path=path, query=query, headers={})
+
+
+@pytest.fixture
+def server(tmp_path):
+    path = tmp_path / "relais.json"
+    path.write_text(json.dumps({"lastUpdate": "v1", "relais": [
+        {"id": "oe1xaa", "rufzeichen": "OE1XAA", "typ": "FM", "band": "2m", "koordinaten": {"lat": 48.21, "lng": 16.37}},
+        {"id": "oe6xbb", "rufzeichen": "OE6XBB", "typ": "FM", "band": "2m", "koordinaten": {"lat": 47.07, "lng": 15.44}},
+    ]}), encoding="utf-8")
+    store = RelaisStore(path)
+    store.reload_if_changed()
+    server = HTTPServer()
+    service = QueryService(store)
+    server.route("/nearest", service.nearest)
+    server.route("/bbox", service.bbox)
+    return server
+
+
+def nearest(server, **query):
+    response = asyncio.run(server._dispatch(request(**query)))
+    return response.status, json.loads(response.body)
+
+
+def test_nearest_with_max_km(server):
+    status, body = nearest(server, lat="48.2", lng="16.4", max_km="50")
+    assert status == 200
+    assert [r["id"] for r in body["relais"]] == ["oe1xaa"]
+
+
+@pytest.mark.parametrize("max_km", ["abc", "nan", "inf", "-1"])
+def test_invalid_max_km_is_a_bad_request(server, max_km):
+    status, _ = nearest(server, lat="48.2", lng="16.4", max_km=max_km)
+    assert status == 400
+
+
+def bbox(server, value):
+    response = asyncio.run(server._dispatch(request("/bbox", bbox=value)))
+    return response.status, json.loads(response.body)
+
+
+@pytest.mark.parametrize("lat", ["nan", "-inf", "1e308", "90.5", "-91"])
+def test_invalid_latitude_is_a_bad_request(server, lat):
+    status, _ = nearest(server, lat=lat, lng="16.4")
+    assert status == 400
+
+
+@pytest.mark.parametrize("lng", ["inf", "180.1", "-1e308"])
+def test_invalid_longitude_is_a_bad_request(server, lng):
+    status, _ = nearest(server, lat="48.2", lng=lng)
+    assert status == 400
+
+
+def test_bbox(server):
+    status, body = bbox(server, "16,48,17,49")
+    assert status == 200
+    assert [r["id"] for r in body["relais"]] == ["oe1xaa"]
+
+
+@pytest.mark.parametrize("value", [
+    "nan,1,2,3", "-inf,40,inf,50", "9,40,1e308,50", "9,-95,17,50", "-181,40,17,50", "9,40,17", "9,40,x,50",
+])
+def test_invalid_bbox_is_a_bad_request(server, value):
+    status, _ = bbox(server, value)
+    assert status == 400
+
+
+@pytest.mark.parametrize("length", ["abc", "-5"])
+def test_malformed_content_length_is_a_bad_request(length):
+    async def read():
+        reader = asyncio.StreamReader()
+        reader.feed_data(f"GET /health HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode("latin-1"))
+        reader.feed_eof()
+        return await _read_request(reader)
+
+    with pytest.raises(HTTPError) as e:
+        asyncio.run(read())
+    assert e.value.status == 400
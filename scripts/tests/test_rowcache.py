@@ -0,0 +1,61 @@
+from rowcache import RowCache
+
+
+class Parser:
+    """Counts the rows that actually went through the parser."""
+
+    def __init__(self):
+        self.parsed = []
+
+    def __call__(self, texts):
+        self.parsed.append(texts)
+        return {"rufzeichen": texts[0], "ort": texts[1]}
+
+
+def run(path, pages):
+    cache = RowCache(path, "v1")
+    parser = Parser()
+    records = {kind: [cache.parse(kind, texts, parser) for texts in rows] for kind, rows in pages.items()}
+    cache.save()
+    return records, parser.parsed
+
+
+def test_unchanged_rows_are_not_parsed_again(tmp_path):
+    path = tmp_path / "rows.pickle"
+    pages = {"DMR": [["OE1XAR", "Wien"], ["OE3XPA", "St. Pölten"]]}
+    first, parsed = run(path, pages)
+    assert len(parsed) == 2
+
+    second, parsed = run(path, pages)
+    assert parsed == []
+    assert second == first
+
+
+def test_rows_of_pages_not_parsed_are_kept(tmp_path):
+    path = tmp_path / "rows.pickle"
+    run(path, {"DMR": [["OE1XAR", "Wien"]], "C4FM": [["OE5XLL", "Linz"]]})
+
+    # The DMR page failed to download in this run
+    _, parsed = run(path, {"C4FM": [["OE5XLL", "Linz"], ["OE6XRR", "Graz"]]})
+    assert parsed == [["OE6XRR", "Graz"]]
+
+    _, parsed = run(path, {"DMR": [["OE1XAR", "Wien"]], "C4FM": [["OE5XLL", "Linz"]]})
+    assert parsed == []
+
+
+def test_rows_that_left_a_parsed_page_are_dropped(tmp_path):
+    path = tmp_path / "rows.pickle"
+    run(path, {"DMR": [["OE1XAR", "Wien"], ["OE3XPA", "St. Pölten"]]})
+    run(path, {"DMR": [["OE1XAR", "Wien"]]})
+
+    _, parsed = run(path, {"DMR": [["OE1XAR", "Wien"], ["OE3XPA", "St. Pölten"]]})
+    assert parsed == [["OE3XPA", "St. Pölten"]]
+
+
+def test_rows_differing_only_in_whitespace_are_parsed_apart(tmp_path):
+    path = tmp_path / "rows.pickle"
+    run(path, {"DMR": [["OE1XAR", "Wien Kahlenberg"]]})
+
+    records, parsed = run(path, {"DMR": [["OE1XAR", "Wien  Kahlenberg"]]})
+    assert parsed == [["OE1XAR", "Wien  Kahlenberg"]]
+    assert records["DMR"][0]["ort"] == "Wien  Kahlenberg"
@@ -0,0 +1,61 @@
+import sys
+import types
+from dataclasses import dataclass
+
+import pytest
+
+from recordfile import RecordFileError, write_records
+from snapshots import SnapshotStore
+
+
+@dataclass
+class Record:
+    rufzeichen: str
+
+
+def saved(tmp_path, records):
+    store = SnapshotStore(tmp_path / "snapshots")
+    store.save("oevsv", write_records(tmp_path / "oevsv.records", records))
+    store.mark_fresh("oevsv", "2026-01-04T03:00:00+00:00")
+    return store
+
+
+def test_snapshot_round_trip(tmp_path):
+    store = saved(tmp_path, [Record("OE1XAA"), Record("OE3XBB")])
+
+    snapshot = store.load("oevsv")
+    assert snapshot.fetched == "2026-01-04T03:00:00+00:00"
+    assert list(snapshot.records()) == [Record("OE1XAA"), Record("OE3XBB")]
+
+
+def test_missing_snapshot(tmp_path):
+    assert SnapshotStore(tmp_path).load("oevsv") is None
+
+
+@pytest.mark.parametrize("content", [b"", b"\x80\x05\x95"])
+def test_empty_or_short_snapshot_is_not_usable(tmp_path, content):
+    store = saved(tmp_path, [Record("OE1XAA")])
+    store.records_path("oevsv").write_bytes(content)
+
+    with pytest.raises(RecordFileError):
+        list(store.load("oevsv").records())
+
+
+def test_snapshot_of_a_renamed_class_is_not_usable(tmp_path, monkeypatch):
+    store = saved(tmp_path, [Record("OE1XAA")])
+    monkeypatch.delattr(sys.modules[__name__], "Record")
+
+    with pytest.raises(RecordFileError):
+        list(store.load("oevsv").records())
+
+
+def test_snapshot_of_a_moved_module_is_not_usable(tmp_path, monkeypatch):
+    module = types.ModuleType("sources_old")
+    exec("class Record:\n    pass", module.__dict__)
+    module.Record.__module__ = "sources_old"
+    monkeypatch.setitem(sys.modules, "sources_old", module)
+    store = saved(tmp_path, [module.Record()])
+    monkeypatch.delitem(sys.modules, "sources_old")
+
+    with pytest.raises(RecordFileError):
+        list(store.load("oevsv").records())
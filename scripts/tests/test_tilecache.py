@@ -0,0 +1,93 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import tilecache
+from tilecache import TileFetcher, TileStore, seed, tiles_in_bbox
+
+BBOX = (16.3, 48.1, 16.5, 48.3)
+ZOOMS = range(8, 10)
+
+
+class Upstream(BaseHTTPRequestHandler):
+    """Tile server answering every tile with its path and a fixed ETag."""
+
+    requests = []
+
+    def do_GET(self):
+        Upstream.requests.append((self.path, self.headers.get("If-None-Match")))
+        etag = '"v1"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = self.path.encode("ascii")
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def upstream():
+    Upstream.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Upstream)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/{{z}}/{{x}}/{{y}}.png"
+    server.shutdown()
+    server.server_close()
+
+
+def run_seed(store, upstream, max_age):
+    return asyncio.run(seed(store, TileFetcher(upstream, 2, 5), BBOX, ZOOMS, 2, max_age))
+
+
+def test_seed_fetches_stores_and_revalidates(tmp_path, upstream):
+    tiles = [tile for z in ZOOMS for tile in tiles_in_bbox(*BBOX, z)]
+    with TileStore(tmp_path / "tiles.mbtiles", 1 << 20) as store:
+        counts = run_seed(store, upstream, max_age=3600)
+        assert counts["fetched"] == len(tiles)
+        z, x, y = tiles[0]
+        data, fetched, etag = store.get(z, x, y)
+        assert data == f"/{z}/{x}/{y}.png".encode("ascii") and etag == '"v1"'
+
+        counts = run_seed(store, upstream, max_age=3600)
+        assert counts["fresh"] == len(tiles)
+        assert len(Upstream.requests) == len(tiles)
+
+        # Expired tiles are revalidated; the upstream answers 304 and only the fetch time moves
+        counts = run_seed(store, upstream, max_age=-1)
+        assert counts["revalidated"] == len(tiles) and counts["fetched"] == 0
+        assert all(etag == '"v1"' for _, etag in Upstream.requests[len(tiles):])
+        assert store.get(z, x, y)[0] == data
+        assert store.get(z, x, y)[1] > fetched
+
+
+def test_seed_refuses_the_osm_tile_servers(tmp_path, monkeypatch):
+    monkeypatch.setattr("sys.argv", ["tilecache.py", "--db", str(tmp_path / "tiles.mbtiles"), "seed"])
+    with pytest.raises(SystemExit) as e:
+        tilecache.main()
+    assert e.value.code == 2
+
+
+def test_stale_tile_is_served_and_revalidated(tmp_path, upstream):
+    async def lookups(cache):
+        first = await cache.get(8, 140, 89)
+        second = await cache.get(8, 140, 89)
+        await asyncio.gather(*cache._inflight.values())
+        return first, second
+
+    with TileStore(tmp_path / "tiles.mbtiles", 1 << 20) as store:
+        cache = tilecache.TileCache(store, TileFetcher(upstream, 2, 5), max_age=-1)
+        (data, status), (stale, stale_status) = asyncio.run(lookups(cache))
+
+    assert (status, stale_status) == ("MISS", "STALE")
+    assert stale == data == b"/8/140/89.png"
+    assert Upstream.requests == [("/8/140/89.png", None), ("/8/140/89.png", '"v1"')]
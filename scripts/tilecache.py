@@ -0,0 +1,590 @@
+#!/usr/bin/env python3
+"""
+OSM Tile Cache
+
+Caching proxy for the map tiles under /tiles/{s}/{z}/{x}/{y}.png. Tiles are
+kept in an MBTiles file (SQLite, TMS row order), so the cache can also be
+opened by any MBTiles viewer. A side table records size and last access of
+every tile; once the cache grows beyond --max-size-mb the least recently
+used tiles are evicted.
+
+Tiles older than --max-age-days are served from the cache right away and
+refreshed in the background, revalidated with the ETag the upstream sent
+(a 304 only renews the fetch time). If the upstream is unreachable, stale
+tiles keep being served.
+
+Usage:
+    python tilecache.py serve --port 8082
+    python tilecache.py --upstream https://tiles.example.org/{z}/{x}/{y}.png seed --zoom 6-12
+    python tilecache.py stats
+
+Seeding downloads every tile of the bounding box (Austria by default). The
+OpenStreetMap tile usage policy does not allow bulk downloads from
+tile.openstreetmap.org, so seeding refuses to run against it: pass
+--upstream with a tile server that permits it (e.g. your own). Serving
+from tile.openstreetmap.org is allowed for light use and logs a warning.
+"""
+
+import asyncio
+import logging
+import math
+import re
+import sqlite3
+import threading
+import time
+import argparse
+from pathlib import Path
+from typing import Iterator, NamedTuple, Optional
+
+import requests
+
+from httpserver import HTTPError, HTTPServer, Request, Response, json_response
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB = Path(__file__).parent.parent / "cache" / "tiles.mbtiles"
+DEFAULT_UPSTREAM = "https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png"
+OSM_TILE_HOST = "tile.openstreetmap.org"
+OSM_TILE_POLICY = "https://operations.osmfoundation.org/policies/tiles/"
+USER_AGENT = "Relaisblick/1.0 (https://relaisblick.oeradio.at)"
+
+# west, south, east, north - same area as AUSTRIA_BOUNDS in RelaisMap.tsx
+AUSTRIA_BBOX = (9.5, 46.3, 17.2, 49.0)
+MAX_ZOOM = 19
+
+TILE_PATH = re.compile(r"^/tiles/(?:[abc]/)?(\d+)/(\d+)/(\d+)\.png$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+
+CREATE TABLE IF NOT EXISTS tiles (
+    zoom_level INTEGER NOT NULL,
+    tile_column INTEGER NOT NULL,
+    tile_row INTEGER NOT NULL,
+    tile_data BLOB NOT NULL
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS tile_index ON tiles(zoom_level, tile_column, tile_row);
+
+CREATE TABLE IF NOT EXISTS tile_usage (
+    zoom_level INTEGER NOT NULL,
+    tile_column INTEGER NOT NULL,
+    tile_row INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    fetched REAL NOT NULL,
+    accessed REAL NOT NULL,
+    etag TEXT,  -- Upstream ETag, for revalidating expired tiles
+    PRIMARY KEY (zoom_level, tile_column, tile_row)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS tile_usage_accessed ON tile_usage(accessed);
+"""
+
+METADATA = {
+    "name": "Relaisblick OSM tile cache",
+    "type": "baselayer",
+    "format": "png",
+    "attribution": "© OpenStreetMap contributors",
+}
+
+ACCESS_FLUSH_SIZE = 512
+EVICT_TARGET = 0.9  # Evict down to this fraction of the size limit
+
+
+def tile_row(z: int, y: int) -> int:
+    """Convert an XYZ row to the TMS row used by MBTiles."""
+    return (1 << z) - 1 - y
+
+
+def lonlat_to_tile(lon: float, lat: float, z: int) -> tuple[int, int]:
+    """Web Mercator tile containing a coordinate."""
+    n = 1 << z
+    lat_rad = math.radians(max(min(lat, 85.0511), -85.0511))
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tile_range(west: float, south: float, east: float, north: float, z: int) -> tuple[int, int, int, int]:
+    """(x0, y0, x1, y1) of the tiles intersecting a bounding box."""
+    x0, y0 = lonlat_to_tile(west, north, z)
+    x1, y1 = lonlat_to_tile(east, south, z)
+    return x0, y0, x1, y1
+
+
+def tiles_in_bbox(west: float, south: float, east: float, north: float, z: int) -> Iterator[tuple[int, int, int]]:
+    """Yield (z, x, y) of every tile intersecting the bounding box."""
+    x0, y0, x1, y1 = tile_range(west, south, east, north, z)
+    for x in range(x0, x1 + 1):
+        for y in range(y0, y1 + 1):
+            yield z, x, y
+
+
+def parse_zoom_range(value: str) -> range:
+    """Parse "6-12" or "10" into a range of zoom levels."""
+    low, _, high = value.partition("-")
+    try:
+        zooms = range(int(low), int(high or low) + 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid zoom range: {value}")
+    if not zooms or zooms.start < 0 or zooms.stop - 1 > MAX_ZOOM:
+        raise argparse.ArgumentTypeError(f"Zoom range must be within 0-{MAX_ZOOM}: {value}")
+    return zooms
+
+
+def is_osm_upstream(upstream: str) -> bool:
+    """Whether an upstream URL template points at the OpenStreetMap tile servers."""
+    return OSM_TILE_HOST in upstream
+
+
+def parse_bbox(value: str) -> tuple[float, float, float, float]:
+    """Parse "west,south,east,north"."""
+    try:
+        west, south, east, north = (float(p) for p in value.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError("bbox must be west,south,east,north")
+    return west, south, east, north
+
+
+class TileStore:
+    """MBTiles file with LRU eviction by total tile size."""
+
+    def __init__(self, path: Path, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.executescript(SCHEMA)
+        with self.conn:
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(tile_usage)")}
+            if "etag" not in columns:
+                # Caches created before ETags were kept
+                self.conn.execute("ALTER TABLE tile_usage ADD COLUMN etag TEXT")
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO metadata VALUES (?, ?)", METADATA.items()
+            )
+        self.total_bytes = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM tile_usage"
+        ).fetchone()[0]
+        # Access times are buffered so cache hits do not each cost a write
+        self._accessed: dict[tuple[int, int, int], float] = {}
+
+    def close(self) -> None:
+        self.flush_access()
+        self.conn.close()
+
+    def __enter__(self) -> "TileStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def get(self, z: int, x: int, y: int) -> Optional[tuple[bytes, float, Optional[str]]]:
+        """Return (tile data, fetch time, ETag) or None if the tile is not cached."""
+        row = self.conn.execute(
+            """
+            SELECT tile_data, fetched, etag
+            FROM tiles JOIN tile_usage USING (zoom_level, tile_column, tile_row)
+            WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?
+            """,
+            (z, x, tile_row(z, y)),
+        ).fetchone()
+        if row is None:
+            return None
+
+        self._accessed[(z, x, y)] = time.time()
+        if len(self._accessed) >= ACCESS_FLUSH_SIZE:
+            self.flush_access()
+        return row[0], row[1], row[2]
+
+    def fetched_at(self, z: int, x: int, y: int) -> Optional[tuple[float, Optional[str]]]:
+        """(fetch time, ETag) of a cached tile, without counting it as an access."""
+        row = self.conn.execute(
+            "SELECT fetched, etag FROM tile_usage WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+            (z, x, tile_row(z, y)),
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def revalidated(self, z: int, x: int, y: int) -> None:
+        """Renew the fetch time of a tile the upstream reported as not modified."""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE tile_usage SET fetched = ? WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+                (time.time(), z, x, tile_row(z, y)),
+            )
+
+    def put(self, z: int, x: int, y: int, data: bytes, etag: Optional[str] = None) -> None:
+        """Store a tile, evicting old tiles if the size limit is exceeded."""
+        key = (z, x, tile_row(z, y))
+        now = time.time()
+        with self.conn:
+            old = self.conn.execute(
+                "SELECT size FROM tile_usage WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+                key,
+            ).fetchone()
+            self.conn.execute("INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?)", (*key, data))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO tile_usage VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*key, len(data), now, now, etag),
+            )
+        self.total_bytes += len(data) - (old[0] if old else 0)
+        self._accessed.pop((z, x, y), None)
+
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def flush_access(self) -> None:
+        """Write buffered access times."""
+        if not self._accessed:
+            return
+        with self.conn:
+            self.conn.executemany(
+                """
+                UPDATE tile_usage SET accessed = ?
+                WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?
+                """,
+                [(ts, z, x, tile_row(z, y)) for (z, x, y), ts in self._accessed.items()],
+            )
+        self._accessed.clear()
+
+    def evict(self) -> int:
+        """Drop least recently used tiles until below the size limit."""
+        self.flush_access()
+        target = int(self.max_bytes * EVICT_TARGET)
+        evicted = 0
+
+        with self.conn:
+            rows = self.conn.execute(
+                "SELECT zoom_level, tile_column, tile_row, size FROM tile_usage ORDER BY accessed"
+            )
+            victims = []
+            for z, x, row, size in rows:
+                if self.total_bytes <= target:
+                    break
+                victims.append((z, x, row))
+                self.total_bytes -= size
+            rows.close()
+
+            for table in ("tiles", "tile_usage"):
+                self.conn.executemany(
+                    f"DELETE FROM {table} WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+                    victims,
+                )
+            evicted = len(victims)
+
+        logger.info(f"Evicted {evicted} tiles, cache now {self.total_bytes / 1e6:.1f} MB")
+        return evicted
+
+    def stats(self) -> dict:
+        by_zoom = self.conn.execute(
+            "SELECT zoom_level, COUNT(*), SUM(size) FROM tile_usage GROUP BY zoom_level ORDER BY zoom_level"
+        ).fetchall()
+        return {
+            "tiles": sum(count for _, count, _ in by_zoom),
+            "bytes": self.total_bytes,
+            "maxBytes": self.max_bytes,
+            "zoom": {z: {"tiles": count, "bytes": size} for z, count, size in by_zoom},
+        }
+
+
+class TileUpstreamError(Exception):
+    """The upstream tile server could not deliver a tile."""
+
+
+class FetchedTile(NamedTuple):
+    """An upstream answer: the tile and its ETag, or no data if it was not modified."""
+    data: Optional[bytes]
+    etag: Optional[str]
+
+
+class TileFetcher:
+    """Downloads tiles from the upstream server with bounded concurrency."""
+
+    def __init__(self, upstream: str, concurrency: int, timeout: float):
+        self.upstream = upstream
+        self.timeout = timeout
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        # requests.Session is not thread-safe; keep one per worker thread
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers["User-Agent"] = USER_AGENT
+        return session
+
+    def url(self, z: int, x: int, y: int) -> str:
+        return self.upstream.format(s="abc"[(x + y) % 3], z=z, x=x, y=y)
+
+    def _get(self, url: str, etag: Optional[str]) -> Optional[FetchedTile]:
+        headers = {"If-None-Match": etag} if etag else {}
+        try:
+            response = self._session().get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise TileUpstreamError(f"{url}: {e}")
+        if response.status_code == 404:
+            return None
+        if response.status_code == 304 and etag:
+            return FetchedTile(None, etag)
+        if response.status_code != 200:
+            raise TileUpstreamError(f"{url}: HTTP {response.status_code}")
+        return FetchedTile(response.content, response.headers.get("ETag"))
+
+    async def fetch(self, z: int, x: int, y: int, etag: Optional[str] = None) -> Optional[FetchedTile]:
+        """Download a tile, conditional on etag if given; None if the upstream has no such tile."""
+        async with self.semaphore:
+            return await asyncio.to_thread(self._get, self.url(z, x, y), etag)
+
+
+class TileCache:
+    """Answers tile lookups from the store, fetching misses upstream."""
+
+    def __init__(self, store: TileStore, fetcher: TileFetcher, max_age: float):
+        self.store = store
+        self.fetcher = fetcher
+        self.max_age = max_age
+        self._inflight: dict[tuple[int, int, int], asyncio.Task] = {}
+
+    def _download(self, z: int, x: int, y: int, etag: Optional[str] = None) -> asyncio.Task:
+        """Start (or join) the download of a tile and store the result."""
+        key = (z, x, y)
+        task = self._inflight.get(key)
+        if task is None:
+            async def download() -> Optional[bytes]:
+                try:
+                    tile = await self.fetcher.fetch(z, x, y, etag)
+                    if tile is None:
+                        return None
+                    if tile.data is None:
+                        self.store.revalidated(z, x, y)
+                    else:
+                        self.store.put(z, x, y, tile.data, tile.etag)
+                    return tile.data
+                finally:
+                    del self._inflight[key]
+
+            task = self._inflight[key] = asyncio.create_task(download())
+        return task
+
+    async def get(self, z: int, x: int, y: int) -> tuple[Optional[bytes], str]:
+        """Return (tile data or None, cache status)."""
+        cached = self.store.get(z, x, y)
+        if cached is not None:
+            data, fetched, etag = cached
+            if time.time() - fetched <= self.max_age:
+                return data, "HIT"
+            # Serve the stale tile now and refresh it in the background
+            self._download(z, x, y, etag).add_done_callback(_log_refresh_error)
+            return data, "STALE"
+
+        return await self._download(z, x, y), "MISS"
+
+
+def _log_refresh_error(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Background refresh failed: {task.exception()}")
+
+
+class TileService:
+    """HTTP handlers on top of a TileCache."""
+
+    def __init__(self, cache: TileCache, max_age: float):
+        self.cache = cache
+        self.cache_control = f"public, max-age={int(max_age)}"
+
+    async def tile(self, request: Request) -> Response:
+        match = TILE_PATH.match(request.path)
+        if not match:
+            raise HTTPError(404, "Not a tile path")
+        z, x, y = (int(g) for g in match.groups())
+        if z > MAX_ZOOM or x >= 1 << z or y >= 1 << z:
+            raise HTTPError(404, "Tile out of range")
+
+        try:
+            data, status = await self.cache.get(z, x, y)
+        except TileUpstreamError as e:
+            logger.warning(f"Upstream error: {e}")
+            raise HTTPError(502, "Upstream tile server unavailable")
+        if data is None:
+            raise HTTPError(404, "Tile not found")
+
+        return Response(
+            body=data,
+            content_type="image/png",
+            headers={"Cache-Control": self.cache_control, "X-Tile-Cache": status},
+        )
+
+    async def health(self, request: Request) -> Response:
+        store = self.cache.store
+        return json_response({
+            "status": "ok",
+            "bytes": store.total_bytes,
+            "maxBytes": store.max_bytes,
+        })
+
+
+async def serve(store: TileStore, fetcher: TileFetcher, host: str, port: int, max_age: float) -> None:
+    if is_osm_upstream(fetcher.upstream):
+        logger.warning(
+            f"Proxying tiles from {OSM_TILE_HOST}; keep the traffic low and follow "
+            f"{OSM_TILE_POLICY}, or pass --upstream with your own tile server"
+        )
+    service = TileService(TileCache(store, fetcher, max_age), max_age)
+    server = HTTPServer()
+    server.route_prefix("/tiles/", service.tile)
+    server.route("/health", service.health)
+    await server.serve(host, port)
+
+
+async def seed(
+    store: TileStore,
+    fetcher: TileFetcher,
+    bbox: tuple[float, float, float, float],
+    zooms: range,
+    concurrency: int,
+    max_age: float,
+) -> dict[str, int]:
+    """Fetch every missing or expired tile of bbox for the given zoom levels."""
+    counts = {"fetched": 0, "fresh": 0, "revalidated": 0, "missing": 0, "failed": 0}
+    tiles = (tile for z in zooms for tile in tiles_in_bbox(*bbox, z))
+    total = 0
+    for z in zooms:
+        x0, y0, x1, y1 = tile_range(*bbox, z)
+        total += (x1 - x0 + 1) * (y1 - y0 + 1)
+    logger.info(f"Seeding {total} tiles for zoom {zooms.start}-{zooms.stop - 1}")
+    now = time.time()
+
+    async def worker() -> None:
+        # Workers share one generator, so only `concurrency` tiles are in flight
+        for z, x, y in tiles:
+            fetched, etag = store.fetched_at(z, x, y) or (None, None)
+            if fetched is not None and now - fetched <= max_age:
+                counts["fresh"] += 1
+                continue
+            try:
+                tile = await fetcher.fetch(z, x, y, etag)
+            except TileUpstreamError as e:
+                logger.warning(f"Failed: {e}")
+                counts["failed"] += 1
+                continue
+            if tile is None:
+                counts["missing"] += 1
+            elif tile.data is None:
+                store.revalidated(z, x, y)
+                counts["revalidated"] += 1
+            else:
+                store.put(z, x, y, tile.data, tile.etag)
+                counts["fetched"] += 1
+
+            done = sum(counts.values())
+            if done % 500 == 0:
+                logger.info(f"{done}/{total} tiles")
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    logger.info(
+        f"Seeding done: {counts['fetched']} fetched, {counts['fresh']} already fresh, "
+        f"{counts['revalidated']} not modified, {counts['missing']} missing, {counts['failed']} failed"
+    )
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Caching proxy and pre-seeding tool for OSM map tiles"
+    )
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=DEFAULT_DB,
+        help=f"MBTiles cache file (default: {DEFAULT_DB})"
+    )
+    parser.add_argument(
+        "--max-size-mb",
+        type=int,
+        default=1024,
+        help="Evict least recently used tiles above this size (default: 1024)"
+    )
+    parser.add_argument(
+        "--max-age-days",
+        type=float,
+        default=7,
+        help="Refresh tiles older than this (default: 7)"
+    )
+    parser.add_argument(
+        "--upstream",
+        default=DEFAULT_UPSTREAM,
+        help=f"Upstream URL template (default: {DEFAULT_UPSTREAM}; required for seed)"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=10,
+        help="Upstream request timeout in seconds (default: 10)"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_cmd = commands.add_parser("serve", help="Serve /tiles/{s}/{z}/{x}/{y}.png")
+    serve_cmd.add_argument("--host", default="127.0.0.1", help="Listen address (default: 127.0.0.1)")
+    serve_cmd.add_argument("-p", "--port", type=int, default=8082, help="Listen port (default: 8082)")
+    serve_cmd.add_argument(
+        "--concurrency", type=int, default=4,
+        help="Parallel upstream requests (default: 4)"
+    )
+
+    seed_cmd = commands.add_parser("seed", help="Pre-fetch all tiles of an area")
+    seed_cmd.add_argument(
+        "--bbox", type=parse_bbox, default=AUSTRIA_BBOX,
+        help="west,south,east,north (default: Austria)"
+    )
+    seed_cmd.add_argument(
+        "--zoom", type=parse_zoom_range, default=parse_zoom_range("6-12"),
+        help="Zoom levels, e.g. 6-12 (default: 6-12)"
+    )
+    seed_cmd.add_argument(
+        "--concurrency", type=int, default=2,
+        help="Parallel upstream requests (default: 2)"
+    )
+
+    commands.add_parser("stats", help="Show cache size per zoom level")
+
+    args = parser.parse_args()
+    max_age = args.max_age_days * 86400
+    if args.command == "seed" and is_osm_upstream(args.upstream):
+        parser.error(
+            f"seeding from {OSM_TILE_HOST} is bulk downloading, which {OSM_TILE_POLICY} forbids; "
+            "pass --upstream with a tile server that allows it"
+        )
+
+    with TileStore(args.db, args.max_size_mb * 1024 * 1024) as store:
+        if args.command == "stats":
+            stats = store.stats()
+            print(f"{stats['tiles']} tiles, {stats['bytes'] / 1e6:.1f} of {stats['maxBytes'] / 1e6:.0f} MB")
+            for z, zoom_stats in stats["zoom"].items():
+                print(f"  z{z}: {zoom_stats['tiles']} tiles, {zoom_stats['bytes'] / 1e6:.1f} MB")
+            return
+
+        async def run() -> None:
+            fetcher = TileFetcher(args.upstream, args.concurrency, args.timeout)
+            if args.command == "serve":
+                await serve(store, fetcher, args.host, args.port, max_age)
+            else:
+                await seed(store, fetcher, args.bbox, args.zoom, args.concurrency, max_age)
+
+        try:
+            asyncio.run(run())
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -5,16 +5,67 @@ Relaisblick Data Updater
 Main script to fetch and merge relay data from multiple sources:
 - OE8VIK websites (DMR, D-STAR, C4FM) - primary source for digital repeaters
 - OEVSV API - primary source for FM repeaters
+- Repeaterbook API - optional, fills gaps; the only source for the
+  neighbouring regions
+
+The stages run as an incremental build graph (see build_graph()), so
+outputs are only rewritten when the data they depend on changed. Each
+region (see profiles.py) has its own graph; selected regions run
+concurrently, download through one shared connection pool and parse in
+one shared process pool.
+
+Every source's last good parse is kept as a snapshot. A source that fails
+or exceeds --source-deadline is merged from its snapshot, its records are
+flagged "veraltet", and its download is retried in the background; if a
+retry succeeds, the outputs are rebuilt with the fresh data.
 """
 
+import hashlib
 import json
 import logging
+import multiprocessing
 import argparse
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime, timezone
 from pathlib import Path
-
-from sources.oevsv import OevsvScraper, RelaisInfo
-from sources.oe8vik import OE8VIKScraper, DigitalRelaisInfo
+from typing import TYPE_CHECKING, Callable, Iterable, Optional
+
+import detail_chunks
+import exports
+import frequencies
+import history
+import jsonstream
+import profiles
+import radioid
+import recordfile
+import regions
+import sites
+import snapshots
+import sqlite_export
+import sources
+import spatial
+from buildgraph import FAILED, BuildGraph, BuildReport, Node, file_fingerprint
+from detail_chunks import INDEX_NAME, detail_bucket, write_index_and_details
+from exports import write_exports
+from frequencies import write_frequency_index
+from history import HistoryStore
+from jsonstream import iter_file_chunks, write_relais_json
+from profiles import AT, DEFAULT_REGION, PROFILES, RegionProfile, get_profiles
+from radioid import enrich_dmr, file_digest, load_index
+from recordfile import RecordFile, RecordFileError, write_records
+from regions import BoundaryIndex, resolve_regions
+from sites import SITES_NAME, assign_sites, write_sites
+from snapshots import SnapshotStore
+from sqlite_export import write_sqlite
+from sources import SOURCES, SourceSpec, get_sources
+
+if TYPE_CHECKING:
+    from sources.oevsv import RelaisInfo
+    from sources.oe8vik import DigitalRelaisInfo
+    from sources.repeaterbook import RepeaterInfo
 
 logging.basicConfig(
     level=logging.INFO,
@@ -23,137 +74,216 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 DEFAULT_OUTPUT = Path(__file__).parent.parent / "data" / "relais.json"
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "cache" / "build"
+SHARDS_DIR = "shards"
+
+
+def _oevsv_record(r: "RelaisInfo", today: str) -> Optional[dict]:
+    """Convert an ÖVSV FM repeater to an output record."""
+    if r.typ != "FM":
+        return None  # Skip digital from OEVSV, we'll use OE8VIK
+
+    relais_id = f"{r.rufzeichen.lower()}-{r.band}".replace("/", "-")
+
+    record = {
+        "id": relais_id,
+        "rufzeichen": r.rufzeichen,
+        "standort": r.standort,
+        "bundesland": r.bundesland,
+        "koordinaten": {"lat": r.lat, "lng": r.lng},
+        "typ": r.typ,
+        "band": r.band,
+        "txFrequenz": r.tx_frequenz,
+        "rxFrequenz": r.rx_frequenz,
+        "shift": r.shift,
+        "status": r.status,
+        "lastUpdate": today,
+    }
+
+    if r.ctcss:
+        record["ctcss"] = r.ctcss
+    if r.echolink:
+        record["echolink"] = r.echolink
+    if r.betreiber:
+        record["betreiber"] = r.betreiber
+    if r.seehoehe:
+        record["seehöhe"] = r.seehoehe
+    if r.bemerkung:
+        record["bemerkung"] = r.bemerkung
+
+    return record
+
+
+def _oe8vik_record(
+    r: "DigitalRelaisInfo",
+    oevsv_by_callsign: dict[str, "RelaisInfo"],
+    today: str,
+    profile: RegionProfile = AT,
+) -> dict:
+    """Convert an OE8VIK digital repeater, borrowing ÖVSV coordinates."""
+    relais_id = f"{r.rufzeichen.lower()}-{r.typ.lower()}-{r.band}".replace("/", "-").replace(" ", "-")
+
+    # Without an ÖVSV entry the position is only the center of the callsign's
+    # Bundesland; the Bundesland itself is left to resolve_regions
+    lat, lng = profile.centroid(profile.subdivision_from_callsign(r.rufzeichen))
+    bundesland = None
+    seehoehe = None
+
+    # Extract base callsign (without module suffix like " G", " B", " C")
+    base_callsign = r.rufzeichen.split()[0] if " " in r.rufzeichen else r.rufzeichen
+
+    # Look for matching OEVSV entry to get coordinates
+    oevsv_r = oevsv_by_callsign.get(r.rufzeichen) or oevsv_by_callsign.get(base_callsign)
+    if oevsv_r:
+        lat, lng = oevsv_r.lat, oevsv_r.lng
+        bundesland = oevsv_r.bundesland
+        seehoehe = oevsv_r.seehoehe
+
+    record = {
+        "id": relais_id,
+        "rufzeichen": r.rufzeichen,
+        "standort": r.standort,
+        "bundesland": bundesland,
+        "koordinaten": {"lat": lat, "lng": lng},
+        "typ": r.typ,
+        "band": r.band,
+        "txFrequenz": r.tx_frequenz,
+        "rxFrequenz": r.rx_frequenz,
+        "shift": r.shift,
+        "status": r.status,
+        "lastUpdate": today,
+    }
+
+    if r.network:
+        record["network"] = r.network
+    if r.module:
+        record["dstarModule"] = r.module
+    if r.reflector:
+        record["reflector"] = r.reflector
+    if seehoehe:
+        record["seehöhe"] = seehoehe
+    if not oevsv_r:
+        record["koordinatenGeschaetzt"] = True
+
+    return record
+
+
+def _repeaterbook_record(r: "RepeaterInfo", today: str) -> dict:
+    """Convert a Repeaterbook entry, using the same ids as ÖVSV/OE8VIK."""
+    if r.typ == "FM":
+        relais_id = f"{r.rufzeichen.lower()}-{r.band}"
+    else:
+        relais_id = f"{r.rufzeichen.lower()}-{r.typ.lower()}-{r.band}"
+    relais_id = relais_id.replace("/", "-").replace(" ", "-")
+
+    record = {
+        "id": relais_id,
+        "rufzeichen": r.rufzeichen,
+        "standort": r.standort,
+        "bundesland": r.bundesland,
+        "koordinaten": {"lat": r.lat, "lng": r.lng},
+        "typ": r.typ,
+        "band": r.band,
+        "txFrequenz": r.tx_frequenz,
+        "rxFrequenz": r.rx_frequenz,
+        "shift": r.shift,
+        "status": r.status,
+        "lastUpdate": today,
+    }
 
-# Mapping from OEVSV Bundesland to our format
-BUNDESLAND_FROM_CALLSIGN = {
-    "1": "Wien",
-    "2": "Salzburg",
-    "3": "Niederösterreich",
-    "4": "Burgenland",
-    "5": "Oberösterreich",
-    "6": "Steiermark",
-    "7": "Tirol",
-    "8": "Kärnten",
-    "9": "Vorarlberg",
-}
-
-# Approximate center coordinates for each Bundesland
-BUNDESLAND_COORDINATES = {
-    "Wien": (48.21, 16.37),
-    "Salzburg": (47.80, 13.04),
-    "Niederösterreich": (48.20, 15.63),
-    "Burgenland": (47.50, 16.53),
-    "Oberösterreich": (48.30, 14.29),
-    "Steiermark": (47.07, 15.44),
-    "Tirol": (47.26, 11.39),
-    "Kärnten": (46.62, 13.85),
-    "Vorarlberg": (47.25, 9.90),
-}
-
-
-def get_bundesland_from_callsign(callsign: str) -> str:
-    """Extract Bundesland from callsign prefix."""
-    if len(callsign) >= 3 and callsign.startswith("OE"):
-        digit = callsign[2]
-        return BUNDESLAND_FROM_CALLSIGN.get(digit, "Wien")
-    return "Wien"
+    if r.ctcss:
+        record["ctcss"] = r.ctcss
+    if r.seehoehe:
+        record["seehöhe"] = r.seehoehe
+
+    return record
+
+
+class RelaisMerger:
+    """
+    Merges streams of source records into one keyed index.
+
+    Records with the same id are taken from the source with the highest
+    registry priority: OE8VIK > OEVSV > Repeaterbook. OE8VIK records borrow
+    coordinates from ÖVSV, so ÖVSV has to be added first. Records outside
+    the profile's area (bbox) are dropped.
+    """
+
+    def __init__(self, profile: RegionProfile = AT):
+        self.profile = profile
+        self.today = datetime.now(timezone.utc).date().isoformat()
+        self.merged: dict[str, tuple[int, dict]] = {}
+        self.oevsv_by_callsign: dict[str, "RelaisInfo"] = {}
+        self.counts: dict[str, int] = {}
+        self.stale: dict[str, str] = {}  # Source -> timestamp of the snapshot used
+
+    def add(self, name: str, records: Iterable, stale_since: Optional[str] = None) -> int:
+        """
+        Consume one source's records. Nothing is merged if the stream fails
+        part way through. Returns the number of source records.
+
+        stale_since is set for records from a snapshot: they keep the date
+        of that snapshot as lastUpdate and are flagged "veraltet".
+        """
+        priority = SOURCES[name].priority
+        today = stale_since[:10] if stale_since else self.today
+        staged: dict[str, dict] = {}
+        oevsv_by_callsign: dict[str, "RelaisInfo"] = {}
+        count = 0
+
+        for r in records:
+            count += 1
+            if name == "oevsv":
+                # Index ÖVSV entries by callsign for coordinate lookups (first one wins)
+                oevsv_by_callsign.setdefault(r.rufzeichen, r)
+                record = _oevsv_record(r, today)
+            elif name == "oe8vik":
+                record = _oe8vik_record(r, self.oevsv_by_callsign, today, self.profile)
+            else:
+                record = _repeaterbook_record(r, today)
+
+            if record and self.profile.contains(record["koordinaten"]["lat"], record["koordinaten"]["lng"]):
+                if stale_since:
+                    record["veraltet"] = True
+                staged[record["id"]] = record
+
+        for callsign, r in oevsv_by_callsign.items():
+            self.oevsv_by_callsign.setdefault(callsign, r)
+
+        for relais_id, record in staged.items():
+            existing = self.merged.get(relais_id)
+            if existing is None or existing[0] <= priority:
+                self.merged[relais_id] = (priority, record)
+
+        self.counts[name] = count
+        if stale_since:
+            self.stale[name] = stale_since
+        return count
+
+    def result(self) -> list[dict]:
+        """Merged records sorted by callsign and type."""
+        return sorted(
+            (record for _, record in self.merged.values()),
+            key=lambda x: (x["rufzeichen"], x["typ"]),
+        )
 
 
 def merge_relais_data(
-    oevsv_data: list[RelaisInfo],
-    oe8vik_data: list[DigitalRelaisInfo],
+    oevsv_data: Iterable["RelaisInfo"],
+    oe8vik_data: Iterable["DigitalRelaisInfo"],
+    repeaterbook_data: Optional[Iterable["RepeaterInfo"]] = None,
 ) -> list[dict]:
     """
     Merge relay data from multiple sources.
 
     Priority for digital modes: OE8VIK > OEVSV
-    FM repeaters: OEVSV only
+    FM repeaters: OEVSV (Repeaterbook fills gaps)
     """
-    merged = {}
-    today = datetime.now(timezone.utc).date().isoformat()
-
-    # First, add all OEVSV FM repeaters
-    for r in oevsv_data:
-        if r.typ != "FM":
-            continue  # Skip digital from OEVSV, we'll use OE8VIK
-
-        relais_id = f"{r.rufzeichen.lower()}-{r.band}".replace("/", "-")
-
-        merged[relais_id] = {
-            "id": relais_id,
-            "rufzeichen": r.rufzeichen,
-            "standort": r.standort,
-            "bundesland": r.bundesland,
-            "koordinaten": {"lat": r.lat, "lng": r.lng},
-            "typ": r.typ,
-            "band": r.band,
-            "txFrequenz": r.tx_frequenz,
-            "rxFrequenz": r.rx_frequenz,
-            "shift": r.shift,
-            "status": r.status,
-            "lastUpdate": today,
-        }
-
-        if r.ctcss:
-            merged[relais_id]["ctcss"] = r.ctcss
-        if r.echolink:
-            merged[relais_id]["echolink"] = r.echolink
-        if r.betreiber:
-            merged[relais_id]["betreiber"] = r.betreiber
-        if r.seehoehe:
-            merged[relais_id]["seehöhe"] = r.seehoehe
-        if r.bemerkung:
-            merged[relais_id]["bemerkung"] = r.bemerkung
-
-    # Then add OE8VIK digital repeaters (these are more up-to-date)
-    for r in oe8vik_data:
-        relais_id = f"{r.rufzeichen.lower()}-{r.typ.lower()}-{r.band}".replace("/", "-").replace(" ", "-")
-
-        # Get Bundesland from callsign
-        bundesland = get_bundesland_from_callsign(r.rufzeichen)
-
-        # Use Bundesland center as fallback coordinates
-        fallback_coords = BUNDESLAND_COORDINATES.get(bundesland, (47.5, 13.5))
-        lat, lng = fallback_coords
-        seehoehe = None
-
-        # Extract base callsign (without module suffix like " G", " B", " C")
-        base_callsign = r.rufzeichen.split()[0] if " " in r.rufzeichen else r.rufzeichen
-
-        # Look for matching OEVSV entry to get coordinates
-        for oevsv_r in oevsv_data:
-            if oevsv_r.rufzeichen == r.rufzeichen or oevsv_r.rufzeichen == base_callsign:
-                lat, lng = oevsv_r.lat, oevsv_r.lng
-                bundesland = oevsv_r.bundesland
-                seehoehe = oevsv_r.seehoehe
-                break
-
-        merged[relais_id] = {
-            "id": relais_id,
-            "rufzeichen": r.rufzeichen,
-            "standort": r.standort,
-            "bundesland": bundesland,
-            "koordinaten": {"lat": lat, "lng": lng},
-            "typ": r.typ,
-            "band": r.band,
-            "txFrequenz": r.tx_frequenz,
-            "rxFrequenz": r.rx_frequenz,
-            "shift": r.shift,
-            "status": r.status,
-            "lastUpdate": today,
-        }
-
-        if r.network:
-            merged[relais_id]["network"] = r.network
-        if r.module:
-            merged[relais_id]["dstarModule"] = r.module
-        if r.reflector:
-            merged[relais_id]["reflector"] = r.reflector
-        if seehoehe:
-            merged[relais_id]["seehöhe"] = seehoehe
-
-    # Sort by callsign and type
-    return sorted(merged.values(), key=lambda x: (x["rufzeichen"], x["typ"]))
+    merger = RelaisMerger()
+    merger.add("oevsv", oevsv_data)
+    merger.add("oe8vik", oe8vik_data)
+    merger.add("repeaterbook", repeaterbook_data or [])
+    return merger.result()
 
 
 def load_existing_data(filepath: Path) -> dict | None:
@@ -169,19 +299,465 @@ def load_existing_data(filepath: Path) -> dict | None:
         return None
 
 
-def save_data(data: dict, filepath: Path) -> None:
-    """Save relay data to JSON file."""
-    filepath.parent.mkdir(parents=True, exist_ok=True)
+def _spool(chunks: Iterable[bytes], path: Path, deadline: Optional[float] = None) -> str:
+    """Write a byte stream to path and return its SHA-256."""
+    h = hashlib.sha256()
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "wb") as f:
+        for chunk in chunks:
+            # The HTTP timeout only bounds single reads, not a slow trickle
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Download of {path.name} exceeded the source deadline")
+            h.update(chunk)
+            f.write(chunk)
+    tmp.replace(path)
+    return h.hexdigest()
+
+
+def spool_raw(
+    raw, spool_dir: Path, name: str, max_seconds: Optional[float] = None
+) -> dict[Optional[str], tuple[Path, str]]:
+    """
+    Download a source's raw payload into spool_dir.
+
+    Returns {part: (path, sha256)}; part is None for single-stream sources
+    and the page kind for sources returning a dict of streams (OE8VIK).
+    Raises TimeoutError if the whole payload takes longer than max_seconds.
+    """
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    deadline = time.monotonic() + max_seconds if max_seconds else None
+    parts = raw.items() if isinstance(raw, dict) else [(None, raw)]
+    spooled = {}
+    for part, chunks in parts:
+        path = spool_dir / (f"{name}-{part}.raw" if part else f"{name}.raw")
+        spooled[part] = (path, _spool(chunks, path, deadline))
+    return spooled
+
+
+def open_spooled(spooled: dict[Optional[str], tuple[Path, str]]):
+    """Re-open spooled payloads in the shape the source's parse() expects."""
+    if None in spooled:
+        return iter_file_chunks(spooled[None][0])
+    return {part: iter_file_chunks(path) for part, (path, _) in spooled.items()}
+
+
+def spool_digest(spooled: dict[Optional[str], tuple[Path, str]]) -> str:
+    return json.dumps({str(part): sha for part, (_, sha) in spooled.items()}, sort_keys=True)
+
+
+def fetch_source(spec: SourceSpec, args: argparse.Namespace) -> dict[Optional[str], tuple[Path, str]]:
+    """Download one source into the spool directory."""
+    return spool_raw(
+        spec.fetch_raw(timeout=args.timeout, profile=args.profile),
+        args.cache_dir / "raw",
+        spec.name,
+        max_seconds=args.source_deadline,
+    )
+
+
+class SourceRetry:
+    """
+    Retries failed source downloads on background threads, so the build
+    can publish with snapshots in the meantime.
+    """
+
+    def __init__(self, fetch: Callable[[SourceSpec], dict], attempts: int, delay: float):
+        self.fetch = fetch
+        self.attempts = attempts
+        self.delay = delay
+        self.refreshed: dict[str, dict] = {}
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def start(self, spec: SourceSpec) -> None:
+        logger.info(f"Retrying {spec.name} in the background")
+        thread = threading.Thread(target=self._retry, args=(spec,), name=f"retry-{spec.name}", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _retry(self, spec: SourceSpec) -> None:
+        delay = self.delay
+        for attempt in range(1, self.attempts + 1):
+            time.sleep(delay)
+            try:
+                spooled = self.fetch(spec)
+            except Exception as e:
+                logger.warning(f"Retry {attempt}/{self.attempts} of {spec.name} failed: {e}")
+                delay *= 2
+                continue
+            with self._lock:
+                self.refreshed[spec.name] = spooled
+            logger.info(f"Retry {attempt}/{self.attempts} of {spec.name} succeeded")
+            return
+
+    def wait(self) -> dict[str, dict]:
+        """Wait for all retries; returns {source: spooled payload} of the successful ones."""
+        for thread in self._threads:
+            thread.join()
+        return dict(self.refreshed)
+
+
+def parse_spooled(
+    source: str,
+    region: str,
+    spooled: dict[Optional[str], tuple[Path, str]],
+    cache_dir: Path,
+) -> RecordFile:
+    """
+    Parse a spooled download into cache_dir/<source>.records; runs in the
+    shared parse process pool. Records are written as they are parsed and
+    only the file's handle is returned.
+    """
+    records = SOURCES[source].parse_raw(open_spooled(spooled), PROFILES[region], cache_dir)
+    return write_records(cache_dir / f"{source}.records", records)
+
+
+def build_graph(
+    args: argparse.Namespace,
+    spooled: Optional[dict[str, dict]] = None,
+    retry: Optional[SourceRetry] = None,
+    parse_pool: Optional[Executor] = None,
+) -> BuildGraph:
+    """
+    Model the update as fetch -> parse -> merge -> regions -> writer nodes.
+
+    Fetch nodes always run and are fingerprinted by the downloaded bytes;
+    everything downstream is only recomputed when its inputs, its settings
+    or its code changed.
+
+    spooled maps sources to downloaded payloads: fetch nodes reuse its
+    entries and add the ones they download, so a rebuild after a retry
+    only downloads what is missing. Failed downloads are handed to retry;
+    parsing runs on parse_pool if given.
+    """
+    graph = BuildGraph(args.cache_dir)
+    store = SnapshotStore(args.cache_dir / "snapshots")
+    parse_dir = args.cache_dir / "parse"
+    spooled = {} if spooled is None else spooled
+    specs: list[SourceSpec] = args.sources
+
+    for spec in specs:
+        def fetch(inputs, spec=spec):
+            if spec.name in spooled:
+                return spooled[spec.name]
+            try:
+                spooled[spec.name] = fetch_source(spec, args)
+            except Exception:
+                if retry:
+                    retry.start(spec)
+                raise
+            return spooled[spec.name]
+
+        def parse(inputs, spec=spec):
+            task = (spec.name, args.profile.code, inputs[f"fetch:{spec.name}"], parse_dir)
+            records = parse_pool.submit(parse_spooled, *task).result() if parse_pool else parse_spooled(*task)
+            if not records.count:
+                # An empty page is as good as a failed download
+                raise RuntimeError(f"No records parsed from {spec.name}")
+            return records
+
+        graph.add(Node(f"fetch:{spec.name}", fetch, always=True, digest=spool_digest))
+        # Only the record file's handle is persisted; the records stay on disk
+        graph.add(Node(
+            f"parse:{spec.name}",
+            parse,
+            deps=(f"fetch:{spec.name}",),
+            key=f"{args.profile.code}:{file_fingerprint(spec.load().__file__, jsonstream.__file__, recordfile.__file__)}",
+            outputs=(parse_dir / f"{spec.name}.records",),
+            persist=True,
+        ))
+        graph.add(Node(
+            f"snapshot:{spec.name}",
+            lambda inputs, spec=spec: store.save(spec.name, inputs[f"parse:{spec.name}"]),
+            deps=(f"parse:{spec.name}",),
+            outputs=(store.records_path(spec.name),),
+        ))
+
+    def merge(inputs) -> dict:
+        merger = RelaisMerger(args.profile)
+        for spec in specs:
+            records = inputs.get(f"parse:{spec.name}")
+            if records is not None:
+                merger.add(spec.name, records)
+            elif snapshot := store.load(spec.name):
+                try:
+                    count = merger.add(spec.name, snapshot.records(), stale_since=snapshot.fetched)
+                except RecordFileError as e:
+                    # Nothing of the source was merged
+                    logger.warning(f"No usable snapshot of {spec.name}: {e}")
+                    merger.counts[spec.name] = 0
+                else:
+                    logger.warning(f"Used {spec.name} snapshot from {snapshot.fetched} ({count} records)")
+            else:
+                logger.warning(f"No data and no snapshot from {spec.name}")
+                merger.counts[spec.name] = 0
+        if not merger.merged:
+            raise RuntimeError("No data from any source")
+        relais = merger.result()
+        data = {
+            "relais": relais,
+            "sites": assign_sites(relais),
+            "lastUpdate": datetime.now(timezone.utc).isoformat(),
+            "version": "1.0.0",
+            "sources": merger.counts,
+        }
+        if merger.stale:
+            data["staleSources"] = merger.stale
+        return data
+
+    graph.add(Node(
+        "merge",
+        merge,
+        deps=tuple(f"parse:{spec.name}" for spec in specs),
+        key=file_fingerprint(
+            __file__, sources.__file__, profiles.__file__, sites.__file__, snapshots.__file__, recordfile.__file__,
+        ),
+        persist=True,
+        allow_failed=True,
+    ))
+
+    if args.radioid:
+        # Keyed by the export's hash, so the index is only rebuilt for a new export
+        graph.add(Node(
+            "radioid",
+            lambda inputs: load_index(args.radioid, args.profile),
+            key=f"{args.profile.code}:{file_digest(args.radioid)}:{file_fingerprint(radioid.__file__)}",
+            persist=True,
+        ))
+
+    def resolve(inputs) -> dict:
+        data = inputs["merge"]
+        relais = [dict(r) for r in data["relais"]]
+        boundaries = BoundaryIndex.load(args.boundaries) if args.boundaries else None
+        resolve_regions(relais, boundaries, args.profile)
+        if "radioid" in inputs:
+            enrich_dmr(relais, inputs["radioid"])
+        return {**data, "relais": relais}
+
+    boundary_files = sorted(args.boundaries.glob("*.geojson")) if args.boundaries and args.boundaries.is_dir() else []
+    graph.add(Node(
+        "regions",
+        resolve,
+        deps=("merge", "radioid") if args.radioid else ("merge",),
+        key=file_fingerprint(regions.__file__, radioid.__file__, profiles.__file__, spatial.__file__, *boundary_files),
+        persist=True,
+    ))
+
+    def meta(data: dict) -> dict:
+        return {key: value for key, value in data.items() if key not in ("relais", "sites")}
+
+    def write_json(inputs):
+        data = inputs["regions"]
+        count = write_relais_json(args.output, data["relais"], meta(data))
+        logger.info(f"Saved {count} relays to {args.output}")
+
+    def write_index(inputs):
+        data = inputs["regions"]
+        write_index_and_details(data["relais"], args.output.parent, meta(data))
+
+    graph.add(Node(
+        "write:json",
+        write_json,
+        deps=("regions",),
+        key=f"{args.output}:{file_fingerprint(jsonstream.__file__)}",
+        outputs=(args.output,),
+    ))
+    graph.add(Node(
+        "write:index",
+        write_index,
+        deps=("regions",),
+        key=f"{args.output.parent}:{file_fingerprint(detail_chunks.__file__, exports.__file__, jsonstream.__file__)}",
+        outputs=(args.output.parent / INDEX_NAME,),
+    ))
+
+    if args.shards > 1:
+        shard_dir = args.output.parent / SHARDS_DIR
+
+        def write_shards(inputs):
+            data = inputs["regions"]
+            buckets: list[list[dict]] = [[] for _ in range(args.shards)]
+            for r in data["relais"]:
+                buckets[detail_bucket(r["id"], args.shards)].append(r)
+            for i, bucket in enumerate(buckets):
+                write_relais_json(
+                    shard_dir / f"relais-{i}.json", bucket, {**meta(data), "shard": i, "shards": args.shards}
+                )
+            # Shards left over from a run with more of them
+            for path in shard_dir.glob("relais-*.json"):
+                if int(path.stem.split("-")[1]) >= args.shards:
+                    path.unlink()
+            logger.info(f"Saved {len(data['relais'])} relays in {args.shards} shards to {shard_dir}")
+
+        graph.add(Node(
+            "write:shards",
+            write_shards,
+            deps=("regions",),
+            key=f"{shard_dir}:{args.shards}:{file_fingerprint(detail_chunks.__file__, jsonstream.__file__)}",
+            outputs=(shard_dir,),
+        ))
+
+    sites_path = args.output.parent / SITES_NAME
+    graph.add(Node(
+        "write:sites",
+        lambda inputs: write_sites(inputs["regions"]["sites"], sites_path),
+        deps=("regions",),
+        key=f"{sites_path}:{file_fingerprint(sites.__file__)}",
+        outputs=(sites_path,),
+    ))
+
+    frequencies_path = args.output.parent / frequencies.INDEX_NAME
+    graph.add(Node(
+        "write:frequencies",
+        lambda inputs: write_frequency_index(inputs["regions"]["relais"], frequencies_path, meta(inputs["regions"])),
+        deps=("regions",),
+        key=f"{frequencies_path}:{file_fingerprint(frequencies.__file__)}",
+        outputs=(frequencies_path,),
+    ))
+
+    if args.sqlite:
+        graph.add(Node(
+            "write:sqlite",
+            lambda inputs: write_sqlite(inputs["regions"]["relais"], args.sqlite, meta(inputs["regions"])),
+            deps=("regions",),
+            key=f"{args.sqlite}:{file_fingerprint(sqlite_export.__file__)}",
+            outputs=(args.sqlite,),
+        ))
+
+    if args.export_dir:
+        graph.add(Node(
+            "write:exports",
+            lambda inputs: write_exports(inputs["regions"]["relais"], args.export_dir, profile=args.profile),
+            deps=("regions",),
+            key=f"{args.export_dir}:{file_fingerprint(exports.__file__)}",
+            outputs=(args.export_dir,),
+        ))
+
+    if args.dem:
+        # NumPy is only needed for coverage, so import it on demand
+        import coverage
+
+        coverage_path = args.output.parent / "coverage.geojson"
+        graph.add(Node(
+            "write:coverage",
+            lambda inputs: coverage.write_coverage(
+                inputs["regions"]["relais"], args.dem, coverage_path, args.cache_dir / "coverage.json"
+            ),
+            deps=("regions",),
+            key=f"{coverage_path}:{coverage.dem_version(args.dem)}:{file_fingerprint(coverage.__file__)}",
+            outputs=(coverage_path,),
+        ))
+
+    if args.history:
+        def append_history(inputs):
+            with HistoryStore(args.history) as store:
+                store.append(inputs["regions"]["relais"], inputs["regions"]["lastUpdate"])
+
+        graph.add(Node(
+            "write:history",
+            append_history,
+            deps=("regions",),
+            key=f"{args.history}:{file_fingerprint(history.__file__)}",
+            outputs=(args.history,),
+        ))
+
+    return graph
+
+
+def run_build(args: argparse.Namespace, graph: BuildGraph) -> BuildReport:
+    """Run the graph, log a line per node and date the fresh snapshots."""
+    fetched = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    report = graph.run(max_workers=args.jobs, force=args.force)
+
+    for result in report.results.values():
+        detail = f" ({result.error})" if result.error else ""
+        logger.info(f"  [{args.profile.code}] {result.name:<22} {result.status:<8} {result.seconds:6.2f}s{detail}")
+    logger.info(f"[{args.profile.code}] Build: {report.summary()}")
+
+    store = SnapshotStore(args.cache_dir / "snapshots")
+    for spec in args.sources:
+        if report.ok(f"snapshot:{spec.name}"):
+            store.mark_fresh(spec.name, fetched)
+    return report
+
+
+def parse_source_list(value: str) -> list:
+    """argparse type for --sources."""
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    try:
+        return get_sources(names)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def parse_region_list(value: str) -> list[RegionProfile]:
+    """argparse type for --regions."""
+    names = [name.strip().lower() for name in value.split(",") if name.strip()]
+    try:
+        return get_profiles(names)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def region_path(path: Optional[Path], profile: RegionProfile) -> Optional[Path]:
+    """Austria keeps the configured paths; other regions get a subdirectory next to them."""
+    if path is None or profile.code == DEFAULT_REGION:
+        return path
+    return path.parent / profile.code / path.name
+
+
+def region_args(args: argparse.Namespace, profile: RegionProfile) -> argparse.Namespace:
+    """Copy of the command line options for one region's build."""
+    rargs = argparse.Namespace(**vars(args))
+    rargs.profile = profile
+    for name in ("output", "cache_dir", "sqlite", "export_dir", "history"):
+        setattr(rargs, name, region_path(getattr(args, name), profile))
+    if args.sources is None:
+        rargs.sources = get_sources(profile.default_sources)
+    else:
+        rargs.sources = [spec for spec in args.sources if spec.name in profile.sources]
+    if args.boundaries is None:
+        rargs.boundaries = profile.boundaries
+    return rargs
+
+
+def update_region(
+    args: argparse.Namespace,
+    profile: RegionProfile,
+    parse_pool: Optional[Executor],
+) -> Optional[BuildReport]:
+    """Build one region; None if none of the selected sources covers it."""
+    rargs = region_args(args, profile)
+    if not rargs.sources:
+        logger.warning(f"[{profile.code}] None of the selected sources covers {profile.name}, skipping")
+        return None
 
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    logger.info(f"[{profile.code}] Updating {profile.name} from {', '.join(s.name for s in rargs.sources)}")
+    retry = None
+    if rargs.retries > 0:
+        retry = SourceRetry(lambda spec: fetch_source(spec, rargs), rargs.retries, rargs.retry_delay)
 
-    logger.info(f"Saved {len(data['relais'])} relays to {filepath}")
+    spooled: dict[str, dict] = {}
+    report = run_build(rargs, build_graph(rargs, spooled, retry, parse_pool))
+
+    # Outputs are published by now; rebuild if a failed source came back
+    if retry and (refreshed := retry.wait()):
+        logger.info(f"[{profile.code}] Rebuilding with refreshed sources: {', '.join(refreshed)}")
+        spooled.update(refreshed)
+        report = run_build(rargs, build_graph(rargs, spooled, parse_pool=parse_pool))
+
+    # If all sources failed, the existing data is left untouched
+    if not report.ok("merge"):
+        logger.warning(f"[{profile.code}] No data from any source!")
+        if load_existing_data(rargs.output):
+            logger.info(f"[{profile.code}] Keeping existing data")
+        else:
+            logger.error(f"[{profile.code}] No existing data to fall back to")
+    return report
 
 
 def main():
     parser = argparse.ArgumentParser(
-        description="Update Austrian amateur radio relay data"
+        description="Update Austrian (and neighbouring) amateur radio relay data"
     )
     parser.add_argument(
         "-o", "--output",
@@ -190,14 +766,107 @@ def main():
         help=f"Output JSON file (default: {DEFAULT_OUTPUT})"
     )
     parser.add_argument(
-        "--skip-oevsv",
-        action="store_true",
-        help="Skip OEVSV API"
+        "--regions",
+        type=parse_region_list,
+        default=DEFAULT_REGION,
+        help=(
+            "Comma-separated regions to update concurrently; regions other than "
+            f"{DEFAULT_REGION} write to a subdirectory of the output directory "
+            f"(available: {', '.join(PROFILES)}; default: {DEFAULT_REGION})"
+        )
+    )
+    parser.add_argument(
+        "--sources",
+        type=parse_source_list,
+        default=None,
+        help=(
+            "Comma-separated sources to fetch, limited to those covering each region "
+            f"(available: {', '.join(SOURCES)}; default: the region's default sources)"
+        )
+    )
+    parser.add_argument(
+        "--timeout",
+        type=int,
+        default=30,
+        help="HTTP timeout per request in seconds (default: 30)"
+    )
+    parser.add_argument(
+        "--source-deadline",
+        type=int,
+        default=300,
+        help="Give up on a source's download after this many seconds and use its snapshot (default: 300)"
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=3,
+        help="Background retries of failed sources, 0 to disable (default: 3)"
+    )
+    parser.add_argument(
+        "--retry-delay",
+        type=float,
+        default=60,
+        help="Seconds before the first retry, doubled for each further one (default: 60)"
+    )
+    parser.add_argument(
+        "--export-dir",
+        type=Path,
+        help="Also write CHIRP CSV, KML and GPX exports to this directory"
+    )
+    parser.add_argument(
+        "--sqlite",
+        type=Path,
+        help="Also write the data as SQLite database with spatial and text indexes"
+    )
+    parser.add_argument(
+        "--dem",
+        type=Path,
+        help="Also estimate coverage polygons from this elevation model (.npz or GeoTIFF, needs numpy)"
     )
     parser.add_argument(
-        "--skip-oe8vik",
+        "--radioid",
+        type=Path,
+        help="Add DMR IDs, color codes and time slots from this RadioID repeater export (rptrs.json or CSV)"
+    )
+    parser.add_argument(
+        "--history",
+        type=Path,
+        help="Append this run to a SQLite history store (e.g. ../data/history.sqlite)"
+    )
+    parser.add_argument(
+        "--boundaries",
+        type=Path,
+        default=None,
+        help=f"Directory with boundary GeoJSON files (default: the region's, {AT.boundaries} for {AT.code})"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=DEFAULT_CACHE_DIR,
+        help=f"Downloads and intermediate results of earlier runs (default: {DEFAULT_CACHE_DIR})"
+    )
+    parser.add_argument(
+        "--force",
         action="store_true",
-        help="Skip OE8VIK websites"
+        help="Rebuild every output even if its inputs did not change"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=4,
+        help="Number of build steps to run in parallel per region (default: 4)"
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=None,
+        help="Processes parsing downloads, shared by all regions; 0 parses in the build threads (default: CPU count)"
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help=f"Also write the records split into this many files under {SHARDS_DIR}/ (default: 1, no shards)"
     )
     parser.add_argument(
         "-v", "--verbose",
@@ -212,50 +881,27 @@ def main():
 
     logger.info("Starting relay data update...")
 
-    # Fetch from sources
-    oevsv_data = []
-    oe8vik_data = []
-
-    if not args.skip_oevsv:
-        try:
-            scraper = OevsvScraper()
-            oevsv_data = scraper.fetch_relais()
-        except Exception as e:
-            logger.error(f"OEVSV fetching failed: {e}")
-
-    if not args.skip_oe8vik:
-        try:
-            scraper = OE8VIKScraper()
-            oe8vik_data = scraper.fetch_all()
-        except Exception as e:
-            logger.error(f"OE8VIK fetching failed: {e}")
-
-    # If all sources failed, try to keep existing data
-    if not oevsv_data and not oe8vik_data:
-        logger.warning("No data from any source!")
-        existing = load_existing_data(args.output)
-        if existing:
-            logger.info("Keeping existing data")
-            return
-        logger.error("No existing data to fall back to")
-        return
-
-    # Merge data
-    merged_relais = merge_relais_data(oevsv_data, oe8vik_data)
-
-    # Create output structure
-    output_data = {
-        "relais": merged_relais,
-        "lastUpdate": datetime.now(timezone.utc).isoformat(),
-        "version": "1.0.0",
-        "sources": {
-            "oevsv": len(oevsv_data),
-            "oe8vik": len(oe8vik_data),
+    # Spawned rather than forked workers: the pool is started from build threads
+    parse_pool = (
+        ProcessPoolExecutor(args.parse_workers, mp_context=multiprocessing.get_context("spawn"))
+        if args.parse_workers != 0 else None
+    )
+    with parse_pool or nullcontext(), ThreadPoolExecutor(len(args.regions)) as region_pool:
+        futures = {
+            profile.code: region_pool.submit(update_region, args, profile, parse_pool)
+            for profile in args.regions
         }
-    }
+        reports = {code: future.result() for code, future in futures.items()}
+
+    failed_writers = [
+        f"{code}/{name}"
+        for code, report in reports.items() if report
+        for name in report.by_status(FAILED) if name.startswith("write:")
+    ]
+    if failed_writers:
+        logger.error(f"Writing outputs failed: {', '.join(failed_writers)}")
+        raise SystemExit(1)
 
-    # Save
-    save_data(output_data, args.output)
     logger.info("Update complete!")
 
 
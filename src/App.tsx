@@ -144,6 +144,7 @@ function App() {
         <main className="flex-1 relative">
           <RelaisMap
             relais={filteredRelais}
+            detailChunks={data?.detailChunks ?? 0}
             selectedRelais={selectedRelais}
             onSelectRelais={setSelectedRelais}
           />
@@ -1,11 +1,13 @@
-import { useEffect, useRef } from 'react';
+import { useEffect, useMemo, useRef } from 'react';
 import { MapContainer, TileLayer, useMap, AttributionControl } from 'react-leaflet';
 import 'leaflet/dist/leaflet.css';
 import { Relais } from '../../types/relais';
 import { RelaisMarker } from './RelaisMarker';
+import { SiteMarker } from './SiteMarker';
 
 interface RelaisMapProps {
   relais: Relais[];
+  detailChunks: number;
   selectedRelais: Relais | null;
   onSelectRelais: (relais: Relais) => void;
 }
@@ -43,9 +45,25 @@ function MapController({ selectedRelais }: { selectedRelais: Relais | null }) {
 
 export function RelaisMap({
   relais,
+  detailChunks,
   selectedRelais,
   onSelectRelais,
 }: RelaisMapProps) {
+  // Relais am selben Standort teilen sich einen Marker
+  const sites = useMemo(() => {
+    const bySite = new Map<string, Relais[]>();
+    for (const r of relais) {
+      const key = r.site ?? r.id;
+      const members = bySite.get(key);
+      if (members) {
+        members.push(r);
+      } else {
+        bySite.set(key, [r]);
+      }
+    }
+    return [...bySite.entries()];
+  }, [relais]);
+
   return (
     <MapContainer
       center={AUSTRIA_CENTER}
@@ -63,14 +81,25 @@ export function RelaisMap({
         url={TILE_URL}
       />
       <MapController selectedRelais={selectedRelais} />
-      {relais.map((r) => (
-        <RelaisMarker
-          key={r.id}
-          relais={r}
-          isSelected={selectedRelais?.id === r.id}
-          onClick={() => onSelectRelais(r)}
-        />
-      ))}
+      {sites.map(([key, members]) =>
+        members.length === 1 ? (
+          <RelaisMarker
+            key={key}
+            relais={members[0]}
+            detailChunks={detailChunks}
+            isSelected={selectedRelais?.id === members[0].id}
+            onClick={() => onSelectRelais(members[0])}
+          />
+        ) : (
+          <SiteMarker
+            key={key}
+            members={members}
+            detailChunks={detailChunks}
+            selectedId={selectedRelais?.id ?? null}
+            onSelect={onSelectRelais}
+          />
+        )
+      )}
     </MapContainer>
   );
 }
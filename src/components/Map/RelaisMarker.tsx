@@ -5,6 +5,7 @@ import { RelaisPopup } from './RelaisPopup';
 
 interface RelaisMarkerProps {
   relais: Relais;
+  detailChunks: number;
   isSelected: boolean;
   onClick: () => void;
 }
@@ -32,7 +33,7 @@ function createMarkerIcon(color: string, isSelected: boolean): L.DivIcon {
   });
 }
 
-export function RelaisMarker({ relais, isSelected, onClick }: RelaisMarkerProps) {
+export function RelaisMarker({ relais, detailChunks, isSelected, onClick }: RelaisMarkerProps) {
   const color = TYP_FARBEN[relais.typ];
   const icon = createMarkerIcon(color, isSelected);
 
@@ -45,7 +46,7 @@ export function RelaisMarker({ relais, isSelected, onClick }: RelaisMarkerProps)
       }}
     >
       <Popup>
-        <RelaisPopup relais={relais} />
+        <RelaisPopup relais={relais} detailChunks={detailChunks} />
       </Popup>
     </Marker>
   );
@@ -1,19 +1,25 @@
 import { useI18n } from '../../i18n';
-import { Relais, TYP_FARBEN, BAND_FARBEN } from '../../types/relais';
+import { Relais, RelaisDetails, TYP_FARBEN, BAND_FARBEN } from '../../types/relais';
+import { useRelaisDetails } from '../../hooks/useRelaisDetails';
 import {
   formatFrequency,
   formatShift,
   formatCtcss,
   formatCoordinates,
   formatAltitude,
+  formatDate,
 } from '../../utils/formatters';
 
 interface RelaisPopupProps {
   relais: Relais;
+  detailChunks: number;
 }
 
-export function RelaisPopup({ relais }: RelaisPopupProps) {
+export function RelaisPopup({ relais: indexEntry, detailChunks }: RelaisPopupProps) {
   const { t } = useI18n();
+  // Der Popup-Inhalt wird erst beim Öffnen gerendert, die Details also erst dann geladen
+  const { details, loading } = useRelaisDetails(indexEntry.id, detailChunks);
+  const relais: Relais & Partial<RelaisDetails> = { ...indexEntry, ...details };
 
   return (
     <div className="min-w-[250px]">
@@ -35,7 +41,9 @@ export function RelaisPopup({ relais }: RelaisPopupProps) {
 
       <div className="text-sm text-gray-700 mb-3">
         <div className="font-medium">{relais.standort}</div>
-        <div className="text-gray-500">{relais.bundesland}</div>
+        <div className="text-gray-500">
+          {[relais.gemeinde, relais.bundesland].filter(Boolean).join(', ')}
+        </div>
       </div>
 
       <table className="text-sm w-full">
@@ -44,10 +52,12 @@ export function RelaisPopup({ relais }: RelaisPopupProps) {
             <td className="text-gray-500 pr-3 py-0.5">{t.txLabel}:</td>
             <td className="font-mono">{formatFrequency(relais.txFrequenz)}</td>
           </tr>
-          <tr>
-            <td className="text-gray-500 pr-3 py-0.5">{t.rxLabel}:</td>
-            <td className="font-mono">{formatFrequency(relais.rxFrequenz)}</td>
-          </tr>
+          {relais.rxFrequenz !== undefined && (
+            <tr>
+              <td className="text-gray-500 pr-3 py-0.5">{t.rxLabel}:</td>
+              <td className="font-mono">{formatFrequency(relais.rxFrequenz)}</td>
+            </tr>
+          )}
           <tr>
             <td className="text-gray-500 pr-3 py-0.5">{t.shiftLabel}:</td>
             <td className="font-mono">{formatShift(relais.shift)}</td>
@@ -76,6 +86,12 @@ export function RelaisPopup({ relais }: RelaisPopupProps) {
               <td className="font-mono">{relais.colorCode}</td>
             </tr>
           )}
+          {relais.timeslots && (
+            <tr>
+              <td className="text-gray-500 pr-3 py-0.5">{t.timeslotsLabel}:</td>
+              <td className="font-mono">{relais.timeslots}</td>
+            </tr>
+          )}
           {relais.dstarModule && (
             <tr>
               <td className="text-gray-500 pr-3 py-0.5">{t.dstarModuleLabel}:</td>
@@ -99,7 +115,13 @@ export function RelaisPopup({ relais }: RelaisPopupProps) {
 
       <div className="mt-3 pt-2 border-t border-gray-200 text-xs text-gray-500">
         <div>{formatCoordinates(relais.koordinaten)}</div>
+        {loading && <div className="mt-1">{t.loadingDetails}</div>}
         {relais.betreiber && <div>{t.operatorLabel}: {relais.betreiber}</div>}
+        {relais.veraltet && relais.lastUpdate && (
+          <div className="mt-1 text-amber-700">
+            {t.staleData} {formatDate(relais.lastUpdate)}
+          </div>
+        )}
         {relais.bemerkung && (
           <div className="mt-1 italic">{relais.bemerkung}</div>
         )}
@@ -0,0 +1,103 @@
+import { useState } from 'react';
+import { Marker, Popup } from 'react-leaflet';
+import L from 'leaflet';
+import { useI18n } from '../../i18n';
+import { Relais, TYP_FARBEN, BAND_FARBEN } from '../../types/relais';
+import { formatFrequency } from '../../utils/formatters';
+import { RelaisPopup } from './RelaisPopup';
+
+interface SiteMarkerProps {
+  members: Relais[];
+  detailChunks: number;
+  selectedId: string | null;
+  onSelect: (relais: Relais) => void;
+}
+
+function createSiteIcon(count: number, isSelected: boolean): L.DivIcon {
+  const size = isSelected ? 22 : 18;
+
+  return L.divIcon({
+    className: 'custom-marker',
+    html: `
+      <div style="
+        width: ${size}px;
+        height: ${size}px;
+        background-color: #374151;
+        color: white;
+        border: 2px solid white;
+        border-radius: 50%;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.3);
+        font-size: 11px;
+        font-weight: bold;
+        line-height: ${size}px;
+        text-align: center;
+      ">${count}</div>
+    `,
+    iconSize: [size + 4, size + 4],
+    iconAnchor: [(size + 4) / 2, (size + 4) / 2],
+    popupAnchor: [0, -(size / 2 + 2)],
+  });
+}
+
+// Ein Marker für alle Relais eines Standorts; ein Klick auf ein Relais klappt dessen Details auf
+export function SiteMarker({ members, detailChunks, selectedId, onSelect }: SiteMarkerProps) {
+  const { t } = useI18n();
+  const [expandedId, setExpandedId] = useState<string | null>(null);
+  const isSelected = members.some((r) => r.id === selectedId);
+  const expanded = members.find((r) => r.id === (expandedId ?? selectedId));
+  const first = members[0];
+
+  return (
+    <Marker
+      position={[first.koordinaten.lat, first.koordinaten.lng]}
+      icon={createSiteIcon(members.length, isSelected)}
+    >
+      <Popup>
+        <div className="min-w-[250px]">
+          <div className="font-bold text-lg">{first.rufzeichen.split(' ')[0]}</div>
+          <div className="text-sm text-gray-700">{first.standort}</div>
+          <div className="text-xs text-gray-500 mb-2">
+            {t.siteMembers.replace('{count}', String(members.length))}
+          </div>
+          <ul className="text-sm mb-2">
+            {members.map((r) => (
+              <li key={r.id}>
+                <button
+                  type="button"
+                  className={`flex w-full items-center gap-2 py-0.5 text-left ${
+                    r.id === expanded?.id ? 'font-semibold' : ''
+                  }`}
+                  onClick={() => {
+                    setExpandedId(r.id);
+                    onSelect(r);
+                  }}
+                >
+                  <span
+                    className="px-1.5 text-xs rounded text-white"
+                    style={{ backgroundColor: TYP_FARBEN[r.typ] }}
+                  >
+                    {r.typ}
+                  </span>
+                  <span
+                    className="px-1.5 text-xs rounded text-white"
+                    style={{ backgroundColor: BAND_FARBEN[r.band] }}
+                  >
+                    {r.band}
+                  </span>
+                  <span className="font-mono">{formatFrequency(r.txFrequenz)}</span>
+                </button>
+              </li>
+            ))}
+          </ul>
+          {expanded && (
+            <div className="pt-2 border-t border-gray-200">
+              <RelaisPopup relais={expanded} detailChunks={detailChunks} />
+            </div>
+          )}
+        </div>
+      </Popup>
+    </Marker>
+  );
+}
+
+export default SiteMarker;
@@ -0,0 +1,48 @@
+import { useEffect, useRef } from 'react';
+import { RelaisData, RelaisChanges } from '../types/relais';
+import { invalidateDetailChunks } from './useRelaisDetails';
+
+export function applyChanges(data: RelaisData, changes: RelaisChanges): RelaisData {
+  const removed = new Set(changes.removed);
+  const changed = new Map(changes.changed.map((r) => [r.id, r]));
+  const relais = data.relais
+    .filter((r) => !removed.has(r.id))
+    .map((r) => changed.get(r.id) ?? r)
+    .concat(changes.added);
+  return { ...data, relais, lastUpdate: changes.lastUpdate };
+}
+
+// Abonniert den Änderungs-Feed, sobald Daten geladen sind. Nach einem
+// Verbindungsabbruch setzt EventSource per Last-Event-ID selbst fort;
+// "reset" heißt, der Stand ist zu alt und die Daten müssen neu geladen werden.
+export function useChangeFeed(
+  lastUpdate: string | undefined,
+  onChanges: (changes: RelaisChanges) => void,
+  onReset: () => void
+): void {
+  const since = useRef(lastUpdate);
+  since.current = lastUpdate;
+  const handlers = useRef({ onChanges, onReset });
+  handlers.current = { onChanges, onReset };
+  const loaded = lastUpdate !== undefined;
+
+  useEffect(() => {
+    if (!loaded || typeof EventSource === 'undefined') {
+      return;
+    }
+
+    const source = new EventSource(`/api/changes?since=${encodeURIComponent(since.current ?? '')}`);
+    source.addEventListener('changes', (event) => {
+      const changes: RelaisChanges = JSON.parse((event as MessageEvent<string>).data);
+      invalidateDetailChunks(changes.details);
+      handlers.current.onChanges(changes);
+    });
+    source.addEventListener('reset', () => handlers.current.onReset());
+
+    return () => {
+      source.close();
+    };
+  }, [loaded]);
+}
+
+export default useChangeFeed;
@@ -1,5 +1,7 @@
 import { useState, useEffect, useCallback } from 'react';
-import { RelaisData, Relais, FilterState } from '../types/relais';
+import { RelaisData, Relais, RelaisChanges, FilterState } from '../types/relais';
+import { useChangeFeed, applyChanges } from './useChangeFeed';
+import { setDetailVersion } from './useRelaisDetails';
 
 interface UseRelaisDataResult {
   data: RelaisData | null;
@@ -28,29 +30,51 @@ export function useRelaisData(): UseRelaisDataResult {
   const [filters, setFilters] = useState<FilterState>(initialFilters);
   const [selectedRelais, setSelectedRelais] = useState<Relais | null>(null);
 
-  const fetchData = useCallback(async () => {
-    setLoading(true);
-    setError(null);
+  // silent: im Hintergrund neu laden, die bisherigen Daten bleiben bei Fehlern sichtbar
+  const loadData = useCallback(async (silent: boolean) => {
+    if (!silent) {
+      setLoading(true);
+      setError(null);
+    }
 
     try {
-      const response = await fetch('/data/relais.json');
+      // Nach einem "reset" des Änderungs-Feeds nicht die gecachte Kopie nehmen
+      const response = await fetch('/data/relais-index.json', silent ? { cache: 'no-cache' } : undefined);
       if (!response.ok) {
         throw new Error(`HTTP Error: ${response.status}`);
       }
       const jsonData: RelaisData = await response.json();
       setData(jsonData);
     } catch (err) {
-      const message = err instanceof Error ? err.message : 'Unbekannter Fehler';
-      setError(`Fehler beim Laden der Relaisdaten: ${message}`);
+      if (!silent) {
+        const message = err instanceof Error ? err.message : 'Unbekannter Fehler';
+        setError(`Fehler beim Laden der Relaisdaten: ${message}`);
+      }
     } finally {
-      setLoading(false);
+      if (!silent) {
+        setLoading(false);
+      }
     }
   }, []);
 
+  const fetchData = useCallback(() => loadData(false), [loadData]);
+
   useEffect(() => {
     fetchData();
   }, [fetchData]);
 
+  const handleChanges = useCallback((changes: RelaisChanges) => {
+    setData((prev) => (prev ? applyChanges(prev, changes) : prev));
+  }, []);
+  const handleReset = useCallback(() => loadData(true), [loadData]);
+
+  useChangeFeed(data?.lastUpdate, handleChanges, handleReset);
+
+  // Detail-Chunks passend zum geladenen Index anfordern
+  useEffect(() => {
+    setDetailVersion(data?.lastUpdate);
+  }, [data?.lastUpdate]);
+
   const filteredRelais = filterRelais(data?.relais ?? [], filters);
 
   return {
@@ -79,7 +103,10 @@ function filterRelais(relais: Relais[], filters: FilterState): Relais[] {
     }
 
     // Bundesland Filter
-    if (filters.bundesland.length > 0 && !filters.bundesland.includes(r.bundesland)) {
+    if (
+      filters.bundesland.length > 0 &&
+      (!r.bundesland || !filters.bundesland.includes(r.bundesland))
+    ) {
       return false;
     }
 
@@ -95,8 +122,6 @@ function filterRelais(relais: Relais[], filters: FilterState): Relais[] {
         r.rufzeichen,
         r.standort,
         r.bundesland,
-        r.qth,
-        r.betreiber,
       ]
         .filter(Boolean)
         .join(' ')
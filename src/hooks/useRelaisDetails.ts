@@ -0,0 +1,117 @@
+import { useState, useEffect } from 'react';
+import { RelaisDetails } from '../types/relais';
+
+type DetailChunk = Record<string, RelaisDetails>;
+
+const chunkPromises = new Map<number, Promise<DetailChunk>>();
+// Vom Änderungs-Feed als geändert gemeldet: am Browser-Cache vorbei neu laden
+const staleChunks = new Set<number>();
+// Chunks, die wegen einer fehlenden ID schon einmal neu geladen wurden
+const refetchedChunks = new Set<number>();
+// lastUpdate des Index; Teil der Chunk-URL, damit kein älterer Chunk aus einem Cache kommt
+let detailVersion: string | undefined;
+
+// FNV-1a (32 bit) über die UTF-8 Bytes der ID, wie scripts/detail_chunks.py
+export function detailBucket(id: string, chunkCount: number): number {
+  let hash = 0x811c9dc5;
+  for (const byte of new TextEncoder().encode(id)) {
+    hash ^= byte;
+    hash = Math.imul(hash, 0x01000193) >>> 0;
+  }
+  return hash % chunkCount;
+}
+
+// Neuer Stand des Index: alle Chunks mit der neuen Version laden
+export function setDetailVersion(version: string | undefined): void {
+  if (version !== detailVersion) {
+    detailVersion = version;
+    chunkPromises.clear();
+    refetchedChunks.clear();
+  }
+}
+
+// Geänderte Chunks beim nächsten Öffnen eines Popups neu laden
+export function invalidateDetailChunks(buckets: number[]): void {
+  for (const bucket of buckets) {
+    chunkPromises.delete(bucket);
+    staleChunks.add(bucket);
+    refetchedChunks.delete(bucket);
+  }
+}
+
+function loadChunk(bucket: number): Promise<DetailChunk> {
+  let promise = chunkPromises.get(bucket);
+  if (!promise) {
+    const init: RequestInit | undefined = staleChunks.has(bucket) ? { cache: 'no-cache' } : undefined;
+    staleChunks.delete(bucket);
+    const query = detailVersion ? `?v=${encodeURIComponent(detailVersion)}` : '';
+    promise = fetch(`/data/details/${bucket}.json${query}`, init)
+      .then((response) => {
+        if (!response.ok) {
+          throw new Error(`HTTP Error: ${response.status}`);
+        }
+        return response.json() as Promise<DetailChunk>;
+      })
+      .catch((err) => {
+        // Nicht cachen, damit ein späteres Öffnen erneut lädt
+        chunkPromises.delete(bucket);
+        throw err;
+      });
+    chunkPromises.set(bucket, promise);
+  }
+  return promise;
+}
+
+// Fehlt die ID im Chunk, ist er älter als der Index: einmal am Cache vorbei neu laden
+function loadDetails(id: string, bucket: number): Promise<RelaisDetails | null> {
+  return loadChunk(bucket).then((chunk) => {
+    if (chunk[id] !== undefined || refetchedChunks.has(bucket)) {
+      return chunk[id] ?? null;
+    }
+    refetchedChunks.add(bucket);
+    chunkPromises.delete(bucket);
+    staleChunks.add(bucket);
+    return loadChunk(bucket).then((fresh) => fresh[id] ?? null);
+  });
+}
+
+export function useRelaisDetails(
+  id: string,
+  chunkCount: number
+): { details: RelaisDetails | null; loading: boolean } {
+  const [details, setDetails] = useState<RelaisDetails | null>(null);
+  const [loading, setLoading] = useState(chunkCount > 0);
+
+  useEffect(() => {
+    if (chunkCount <= 0) {
+      setLoading(false);
+      return;
+    }
+
+    let cancelled = false;
+    setLoading(true);
+
+    loadDetails(id, detailBucket(id, chunkCount))
+      .then((result) => {
+        if (!cancelled) {
+          setDetails(result);
+        }
+      })
+      .catch(() => {
+        if (!cancelled) {
+          setDetails(null);
+        }
+      })
+      .finally(() => {
+        if (!cancelled) {
+          setLoading(false);
+        }
+      });
+
+    return () => {
+      cancelled = true;
+    };
+  }, [id, chunkCount]);
+
+  return { details, loading };
+}
@@ -34,13 +34,17 @@ export interface Translations {
   dcsLabel: string;
   dmrIdLabel: string;
   colorCodeLabel: string;
+  timeslotsLabel: string;
   dstarModuleLabel: string;
   echolinkLabel: string;
   altitudeLabel: string;
   operatorLabel: string;
+  staleData: string;
+  siteMembers: string;
 
   // Loading & Error
   loadingData: string;
+  loadingDetails: string;
   loadingError: string;
   retry: string;
 
@@ -129,13 +133,17 @@ export const translations: Record<Language, Translations> = {
     dcsLabel: 'DCS',
     dmrIdLabel: 'DMR ID',
     colorCodeLabel: 'Color Code',
+    timeslotsLabel: 'Zeitschlitze',
     dstarModuleLabel: 'D-STAR Modul',
     echolinkLabel: 'EchoLink',
     altitudeLabel: 'Seehöhe',
     operatorLabel: 'Betreiber',
+    staleData: 'Quelle zuletzt nicht erreichbar, Daten vom',
+    siteMembers: '{count} Relais an diesem Standort',
 
     // Loading & Error
     loadingData: 'Lade Daten...',
+    loadingDetails: 'Lade Details...',
     loadingError: 'Fehler beim Laden',
     retry: 'Erneut versuchen',
 
@@ -222,13 +230,17 @@ export const translations: Record<Language, Translations> = {
     dcsLabel: 'DCS',
     dmrIdLabel: 'DMR ID',
     colorCodeLabel: 'Color Code',
+    timeslotsLabel: 'Time slots',
     dstarModuleLabel: 'D-STAR Module',
     echolinkLabel: 'EchoLink',
     altitudeLabel: 'Altitude',
     operatorLabel: 'Operator',
+    staleData: 'Source unavailable at last update, data from',
+    siteMembers: '{count} repeaters at this site',
 
     // Loading & Error
     loadingData: 'Loading data...',
+    loadingDetails: 'Loading details...',
     loadingError: 'Error loading data',
     retry: 'Try again',
 
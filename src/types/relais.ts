@@ -18,35 +18,61 @@ export type Bundesland =
   | 'Vorarlberg'
   | 'Burgenland';
 
+// Felder für Karte, Liste und Filter (relais-index.json)
 export interface Relais {
   id: string;
   rufzeichen: string;
   standort: string;
-  bundesland: Bundesland;
+  bundesland?: Bundesland; // fehlt, wenn weder Koordinaten noch Rufzeichen eindeutig sind
   koordinaten: Koordinaten;
   typ: RelaisTyp;
   band: Band;
   txFrequenz: number; // in MHz
-  rxFrequenz: number; // in MHz
   shift: number; // in kHz
+  status: 'aktiv' | 'inaktiv' | 'unbekannt';
+  site?: string; // Standort-ID, gleich für alle Relais an einem Standort (sites.json)
+}
+
+// Felder, die erst beim Öffnen des Popups geladen werden (details/<n>.json)
+export interface RelaisDetails {
+  rxFrequenz: number; // in MHz
   ctcss?: number; // CTCSS Ton in Hz
   dcsCode?: string; // DCS Code
   echolink?: number; // Echolink Node Nummer
   dmrId?: number; // DMR ID
   colorCode?: number; // DMR Color Code
+  timeslots?: string; // DMR Zeitschlitze laut RadioID, z.B. "TS1 TS2"
   dstarModule?: string; // D-STAR Modul (A, B, C)
+  network?: string; // DMR/C4FM Netz
+  reflector?: string; // D-STAR Reflektor
   betreiber?: string;
   qth?: string;
+  gemeinde?: string; // aus den Gemeindegrenzen, falls vorhanden
+  ausserhalbAT?: boolean; // Koordinaten liegen außerhalb Österreichs
+  koordinatenGeschaetzt?: boolean; // Keine Position bekannt, Mitte des Bundeslands
+  veraltet?: boolean; // Quelle war nicht erreichbar, Stand des letzten Snapshots
   seehöhe?: number; // in Metern
-  status: 'aktiv' | 'inaktiv' | 'unbekannt';
   bemerkung?: string;
   lastUpdate: string; // ISO Date String
 }
 
+export type RelaisFull = Relais & RelaisDetails;
+
 export interface RelaisData {
   relais: Relais[];
   lastUpdate: string;
   version: string;
+  detailChunks: number; // Anzahl der details/<n>.json Dateien
+  staleSources?: Record<string, string>; // Quelle -> Zeitpunkt des verwendeten Snapshots
+}
+
+// Ein Event des Änderungs-Feeds (scripts/changefeed.py)
+export interface RelaisChanges {
+  lastUpdate: string;
+  added: Relais[];
+  changed: Relais[];
+  removed: string[]; // IDs
+  details: number[]; // geänderte details/<n>.json
 }
 
 export interface FilterState {